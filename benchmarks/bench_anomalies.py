@@ -0,0 +1,83 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import func, select
+from sql import create_app
+from sql.models import db
+from sql.blueprints.vitals.anomalies import AnomalyDetector
+from sql.blueprints.vitals.rollups import VITAL_METRICS
+from population import generate_population
+
+MODELS = list(VITAL_METRICS)
+
+def make_readings(rng, patient_ids, n):
+  # Not written to the database, so they carry no recorded_at and cold starts
+  # keep the history baseline as loaded.
+  readings = []
+  for _ in range(n):
+    model = rng.choice(MODELS)
+    reading = {"patient_id": rng.choice(patient_ids)}
+    for metric in VITAL_METRICS[model][1]:
+      reading[metric] = rng.gauss(100, 15) if rng.random() > 0.001 else 400.0
+    readings.append((model, reading))
+  return readings
+
+def run(detector, readings, batch_size):
+  start = time.perf_counter()
+  for i in range(0, len(readings), batch_size):
+    detector.observe(readings[i:i + batch_size])
+  return time.perf_counter() - start
+
+def main(patients=1000, readings=500_000, batch_size=500, naive_readings=2000):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = random.Random(42)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    population = generate_population(doctors=10, patients=patients, years=1, readings_per_day=1)
+    patient_ids = population["patient_ids"]
+    history = sum(population["counts"].get(model.__tablename__, 0) for model in MODELS)
+    stream = make_readings(rng, patient_ids, readings)
+
+    # Synthetic history is from 2022, so the baseline window has to reach it.
+    detector = AnomalyDetector(baseline_days=3650)
+    tracemalloc.start()
+    cold_seconds = run(detector, stream[:batch_size * 20], batch_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    cold_starts = detector.stats()["cold_starts"]
+    warm_seconds = run(detector, stream, batch_size)
+    single_seconds = run(detector, stream[:50_000], 1)
+    assert detector.stats()["observed"] == batch_size * 20 + readings + 50_000
+
+    # Baseline: recompute the patient's statistics from history for every reading.
+    start = time.perf_counter()
+    for model, reading in stream[:naive_readings]:
+      column = getattr(model, VITAL_METRICS[model][1][0])
+      db.session.execute(
+        select(func.count(column), func.avg(column), func.avg(column * column))
+        .where(model.patient_id == reading["patient_id"])
+      ).one()
+    naive_rate = naive_readings / (time.perf_counter() - start)
+
+  print(f"history rows:                 {history:>10}")
+  print(f"cold start:                   {cold_starts:>10} baselines in {cold_seconds * 1000:.0f} ms "
+        f"({peak / cold_starts:.0f} B/baseline peak)")
+  print(f"warm, batches of {batch_size}:        {readings / warm_seconds:10.0f} readings/sec")
+  print(f"warm, one reading per call:   {50_000 / single_seconds:10.0f} readings/sec")
+  print(f"re-query history per reading: {naive_rate:10.0f} readings/sec")
+
+if __name__ == "__main__":
+  main()
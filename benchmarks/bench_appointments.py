@@ -0,0 +1,155 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import func, insert, select, text
+from sql import create_app
+from sql.models import Appointment, AppointmentStatus, User, UserRole, db
+from sql.blueprints.appointment.scheduling import find_conflicts
+from sql.utils.auth import generate_token
+
+INDEX = "ix_appointments_doctor_id_appointment_time"
+
+def generate_schedule(rng, doctor_id, patient_ids, first_day, days):
+  rows = []
+  for offset in range(days):
+    day = first_day + timedelta(days=offset)
+    if day.weekday() >= 5:
+      continue
+    cursor = day.replace(hour=8)
+    closes = day.replace(hour=18)
+    while True:
+      cursor += timedelta(minutes=rng.choice((0, 0, 15, 30, 60)))
+      duration = rng.choice((15, 15, 30, 45))
+      if cursor + timedelta(minutes=duration) > closes:
+        break
+      rows.append({
+        "doctor_id": doctor_id,
+        "patient_id": rng.choice(patient_ids),
+        "appointment_time": cursor,
+        "duration_minutes": duration,
+        "status": AppointmentStatus.SCHEDULED,
+        "reason": "Follow-up",
+        "notes": ""
+      })
+      cursor += timedelta(minutes=duration)
+  return rows
+
+def median_ms(fn, iterations):
+  samples = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    fn()
+    samples.append((time.perf_counter() - start) * 1000)
+  return statistics.median(samples)
+
+def main(doctors=5, patients=2000, past_days=1100, future_days=120, iterations=200):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = random.Random(42)
+  today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+      {"name": f"Doctor {i}", "email": f"doctor{i}@bench.test", "password": "x", "role": UserRole.DOCTOR}
+      for i in range(doctors)
+    ] + [
+      {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": "x", "role": UserRole.PATIENT}
+      for i in range(patients)
+    ])
+    doctor_ids = db.session.scalars(select(User.id).where(User.role == UserRole.DOCTOR)).all()
+    patient_ids = db.session.scalars(select(User.id).where(User.role == UserRole.PATIENT)).all()
+    for doctor_id in doctor_ids:
+      db.session.execute(
+        insert(Appointment),
+        generate_schedule(rng, doctor_id, patient_ids, today - timedelta(days=past_days), past_days + future_days)
+      )
+    db.session.commit()
+
+    doctor_id = doctor_ids[0]
+    per_doctor = db.session.scalar(select(func.count()).where(Appointment.doctor_id == doctor_id))
+    total = db.session.scalar(select(func.count()).select_from(Appointment))
+    probes = [
+      today + timedelta(days=rng.randrange(1, future_days), hours=rng.randrange(8, 17), minutes=rng.choice((0, 15, 30, 45)))
+      for _ in range(iterations)
+    ]
+    probe = iter(probes * 3)
+
+    def check_indexed():
+      start = next(probe)
+      find_conflicts(doctor_id, patient_ids[0], start, start + timedelta(minutes=30))
+      db.session.rollback()
+
+    def check_by_loading():
+      # What the conflict check costs without a range predicate: every
+      # scheduled appointment of the doctor is loaded and compared in Python.
+      start = next(probe)
+      end = start + timedelta(minutes=30)
+      scheduled = Appointment.query.filter_by(doctor_id=doctor_id, status=AppointmentStatus.SCHEDULED).all()
+      [a.id for a in scheduled if a.appointment_time.replace(tzinfo=timezone.utc) < end
+        and a.appointment_time.replace(tzinfo=timezone.utc) + timedelta(minutes=a.duration_minutes) > start]
+      db.session.rollback()
+
+    plan = db.session.execute(text(
+      "EXPLAIN QUERY PLAN SELECT id FROM appointments WHERE doctor_id = :d AND appointment_time > :s AND appointment_time < :e"
+    ), {"d": doctor_id, "s": today, "e": today + timedelta(hours=1)}).all()
+    indexed_ms = median_ms(check_indexed, iterations)
+    loading_ms = median_ms(check_by_loading, max(iterations // 10, 5))
+
+    db.session.execute(text(f"DROP INDEX {INDEX}"))
+    db.session.commit()
+    unindexed_ms = median_ms(check_indexed, iterations // 4)
+    db.session.execute(text(f"CREATE INDEX {INDEX} ON appointments (doctor_id, appointment_time)"))
+    db.session.commit()
+
+    doctor = db.session.get(User, doctor_id)
+    headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+    busiest_day = db.session.execute(
+      select(func.date(Appointment.appointment_time), func.count())
+      .where(Appointment.doctor_id == doctor_id, Appointment.appointment_time < today)
+      .group_by(func.date(Appointment.appointment_time))
+      .order_by(func.count().desc())
+      .limit(1)
+    ).one()
+
+  client = app.test_client()
+
+  def availability(days):
+    end = (today + timedelta(days=days)).isoformat().replace("+00:00", "Z")
+    response = client.get(f"/appointments/doctors/{doctor_id}/availability?end={end}&duration=30", headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return len(response.get_json()["slots"])
+
+  week_slots = availability(7)
+  month_slots = availability(31)
+  week_ms = median_ms(lambda: availability(7), iterations // 4)
+  month_ms = median_ms(lambda: availability(31), iterations // 4)
+
+  start = time.perf_counter()
+  response = client.post("/appointments/status", json={"status": "no_show", "date": busiest_day[0]}, headers=headers)
+  bulk_ms = (time.perf_counter() - start) * 1000
+  assert response.status_code == 200 and response.get_json()["updated"] == busiest_day[1], (response.get_json(), busiest_day)
+
+  print(f"appointments:                 {total:>10} ({per_doctor} for the measured doctor)")
+  print(f"conflict check plan:          {plan[0][-1]}")
+  print(f"conflict check (indexed):     {indexed_ms:10.3f} ms")
+  print(f"conflict check (no index):    {unindexed_ms:10.3f} ms")
+  print(f"conflict check (load all):    {loading_ms:10.3f} ms")
+  print(f"availability 7 days:          {week_ms:10.3f} ms ({week_slots} slots)")
+  print(f"availability 31 days:         {month_ms:10.3f} ms ({month_slots} slots)")
+  print(f"bulk no-show, busiest day:    {bulk_ms:10.3f} ms ({busiest_day[1]} appointments)")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sql import create_app
+from sql.models import User, UserRole
+from sql.utils.auth import generate_token, get_token_cache, role_required, token_required
+
+@role_required(UserRole.DOCTOR, UserRole.ADMIN)
+def doctor_view(user_id):
+  return user_id
+
+@token_required
+def any_user_view():
+  return None
+
+def time_view(app, view, headers, iterations):
+  with app.test_request_context("/", headers=headers):
+    view()
+    start = time.perf_counter()
+    for _ in range(iterations):
+      view()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main(iterations=20000):
+  for cache_size in (0, 10000):
+    app = create_app("DevelopmentConfig")
+    app.config["TOKEN_CACHE_SIZE"] = cache_size
+
+    with app.app_context():
+      doctor = User(id=1, name="Doctor", email="doctor@bench.test", password="x", role=UserRole.DOCTOR)
+      headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+
+    label = "cached" if cache_size else "uncached"
+    role_us = time_view(app, doctor_view, headers, iterations)
+    token_us = time_view(app, any_user_view, headers, iterations)
+    print(f"{label:>8} role_required:  {role_us:8.1f} us/request")
+    print(f"{label:>8} token_required: {token_us:8.1f} us/request")
+
+    with app.app_context():
+      print(f"{label:>8} cache stats:    {get_token_cache().stats()}")
+
+if __name__ == "__main__":
+  main()
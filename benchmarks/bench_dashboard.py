@@ -0,0 +1,74 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DB_QUERY_STATS_ENABLED"] = "true"
+
+from sqlalchemy import insert
+from sql import create_app
+from sql.models import BloodPressure, Diagnosis, Glucose, Goal, HeartRate, Medication, Temperature, User, UserRole, Weight, db
+from sql.utils.auth import generate_token
+from sql.utils.query_stats import assert_max_queries
+
+SEPARATE_CALLS = ["/goals/{id}", "/medications/patients/{id}", "/bp/{id}?limit=1", "/heartrate/{id}?limit=1",
+                  "/weight/{id}?limit=1", "/glucose/{id}?limit=1", "/temperature/{id}?limit=1"]
+
+def seed(rng, patient_id, doctor_id, readings_per_type):
+  start = datetime(2023, 1, 1)
+  times = [start + timedelta(minutes=5 * i) for i in range(readings_per_type)]
+  db.session.execute(insert(BloodPressure), [{"patient_id": patient_id, "systolic": rng.randint(100, 160), "diastolic": rng.randint(60, 100), "recorded_at": t} for t in times])
+  for model, low, high in ((HeartRate, 50, 150), (Weight, 50, 120), (Glucose, 60, 250)):
+    db.session.execute(insert(model), [{"patient_id": patient_id, "value": rng.randint(low, high), "recorded_at": t} for t in times])
+  db.session.execute(insert(Temperature), [{"patient_id": patient_id, "value": rng.uniform(36, 39), "recorded_at": t} for t in times])
+  db.session.add_all([Medication(patient_id=patient_id, name=f"Med {i}", dosage="10mg", frequency="daily", prescribed_by_id=doctor_id) for i in range(8)])
+  db.session.add_all([Goal(patient_id=patient_id, created_by=doctor_id, title=f"Goal {i}", description="d", target_date=date(2026, 1, 1)) for i in range(6)])
+  db.session.add_all([Diagnosis(patient_id=patient_id, doctor_id=doctor_id, diagnosis_name=f"Condition {i}", diagnosis_code="X00", diagnosis_date=date(2024, 1, 1 + i), notes="n") for i in range(10)])
+  db.session.commit()
+
+def time_requests(client, paths, headers, iterations):
+  samples = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    for path in paths:
+      assert client.get(path, headers=headers).status_code == 200
+    samples.append((time.perf_counter() - start) * 1000)
+  return statistics.median(samples)
+
+def main(readings_per_type=100_000, iterations=200):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  app.config["RESPONSE_CACHE_ENABLED"] = False
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    doctor = User(name="Doctor", email="doctor@bench.test", password="x", role=UserRole.DOCTOR)
+    patient = User(name="Patient", email="patient@bench.test", password="x", role=UserRole.PATIENT)
+    db.session.add_all([doctor, patient])
+    db.session.commit()
+    seed(random.Random(42), patient.id, doctor.id, readings_per_type)
+    headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+    patient_id = patient.id
+
+  client = app.test_client()
+  response = assert_max_queries(client, 5, "GET", f"/dashboard/{patient_id}", headers=headers)
+
+  dashboard = time_requests(client, [f"/dashboard/{patient_id}"], headers, iterations)
+  separate = time_requests(client, [p.format(id=patient_id) for p in SEPARATE_CALLS], headers, iterations)
+
+  print(f"readings per vital:   {readings_per_type}")
+  print(f"dashboard queries:    {response.headers['X-DB-Queries']}")
+  print(f"dashboard p50:        {dashboard:8.2f} ms (1 request)")
+  print(f"separate calls p50:   {separate:8.2f} ms ({len(SEPARATE_CALLS)} requests)")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
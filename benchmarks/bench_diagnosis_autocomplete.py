@@ -0,0 +1,86 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import insert
+from sql import create_app
+from sql.models import Diagnosis, User, UserRole, db, normalize_diagnosis_name
+from sql.utils.auth import generate_token
+
+SYLLABLES = ["hy", "per", "ten", "sion", "dia", "be", "tes", "gly", "ce", "mia", "car", "dio", "neu", "ro", "path", "y", "ar", "thr", "itis", "os", "teo"]
+WORDS = ["elevated", "stable", "follow", "up", "started", "metformin", "insulin", "statin", "recheck", "weeks", "pain", "chronic", "acute", "labs", "normal"]
+
+def make_vocabulary(rng, n_names):
+  names = set()
+  while len(names) < n_names:
+    names.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).capitalize() + f" type {rng.randint(1, 9)}")
+  return sorted(names)
+
+def main(n_diagnoses=1_000_000, n_names=20_000, n_lookups=2000):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = random.Random(42)
+  names = make_vocabulary(rng, n_names)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    doctor = User(name="Doctor", email="doctor@bench.test", password="x", role=UserRole.DOCTOR)
+    patient = User(name="Patient", email="patient@bench.test", password="x", role=UserRole.PATIENT)
+    db.session.add_all([doctor, patient])
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+
+    for offset in range(0, n_diagnoses, 50_000):
+      rows = []
+      for _ in range(min(50_000, n_diagnoses - offset)):
+        name = rng.choice(names)
+        rows.append({
+          "patient_id": patient.id,
+          "doctor_id": doctor.id,
+          "diagnosis_name": name,
+          "diagnosis_name_normalized": normalize_diagnosis_name(name),
+          "diagnosis_code": f"{chr(65 + rng.randint(0, 25))}{rng.randint(0, 99):02d}.{rng.randint(0, 9)}",
+          "diagnosis_date": date(2024, 1, 1),
+          "notes": " ".join(rng.choice(WORDS) for _ in range(8))
+        })
+      db.session.execute(insert(Diagnosis), rows)
+    db.session.commit()
+
+  client = app.test_client()
+  # The first request starts the build in the background and is answered
+  # from the database meanwhile.
+  start = time.perf_counter()
+  client.get("/diagnoses/autocomplete?q=a", headers=headers)
+  first = time.perf_counter() - start
+  app.extensions["diagnosis_index"].ready.wait()
+  build = time.perf_counter() - start
+
+  latencies = []
+  for _ in range(n_lookups):
+    name = rng.choice(names)
+    prefix = name[:rng.randint(1, len(name))]
+    start = time.perf_counter()
+    response = client.get("/diagnoses/autocomplete", query_string={"q": prefix}, headers=headers)
+    latencies.append((time.perf_counter() - start) * 1000)
+    assert response.status_code == 200
+
+  latencies.sort()
+  print(f"diagnoses:          {n_diagnoses}")
+  print(f"first request:      {first * 1000:8.1f} ms (during the build)")
+  print(f"index build:        {build:8.2f} s (background)")
+  print(f"keystroke p50:      {statistics.median(latencies):8.3f} ms (full request)")
+  print(f"keystroke p99:      {latencies[int(len(latencies) * 0.99)]:8.3f} ms (full request)")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,119 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+import numpy as np
+from sqlalchemy import insert, select
+from sql import create_app
+from sql.models import Glucose, User, UserRole, db
+from sql.blueprints.vitals.glucose import AGP_PERCENTILES, fetch_glucose, glucose_metrics
+from sql.utils.auth import generate_token
+
+START = datetime(2024, 1, 1)
+READINGS_PER_DAY = 288
+
+def cgm_values(rng, n):
+  # A daily cycle with post-meal peaks plus noise, clipped to what a sensor reports.
+  minutes = np.arange(n) * 5 % 1440
+  baseline = rng.uniform(100, 170)
+  meals = sum(np.exp(-((minutes - peak) / 60.0) ** 2) for peak in (480, 780, 1140))
+  values = baseline + rng.uniform(30, 90) * meals + rng.normal(0, rng.uniform(15, 35), n)
+  return np.clip(values, 40, 400).round().astype(int)
+
+def python_reference(patient_id, start, end):
+  # Baseline: ORM objects and per-reading Python loops.
+  entries = Glucose.query.filter(Glucose.patient_id == patient_id, Glucose.recorded_at >= start, Glucose.recorded_at < end).all()
+  values = [entry.value for entry in entries]
+  hours = {}
+  for entry in entries:
+    hours.setdefault(entry.recorded_at.hour, []).append(entry.value)
+  return {
+    "mean": statistics.fmean(values),
+    "stddev": statistics.stdev(values),
+    "in_range": 100 * sum(70 <= v <= 180 for v in values) / len(values),
+    "agp": {hour: statistics.quantiles(v, n=100, method="inclusive") for hour, v in hours.items()}
+  }
+
+def main(patients=1000, days=90, requests=200, reference_patients=10):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = np.random.default_rng(42)
+  end = START + timedelta(days=days)
+  n = days * READINGS_PER_DAY
+  timestamps = [START + timedelta(minutes=5 * i) for i in range(n)]
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+      {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": "x", "role": UserRole.PATIENT}
+      for i in range(patients)
+    ] + [{"name": "Doctor", "email": "doctor@bench.test", "password": "x", "role": UserRole.DOCTOR}])
+    patient_ids = db.session.scalars(select(User.id).where(User.role == UserRole.PATIENT).order_by(User.id)).all()
+    doctor = db.session.scalar(select(User).where(User.role == UserRole.DOCTOR))
+    headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+
+    started = time.perf_counter()
+    for patient_id in patient_ids:
+      values = cgm_values(rng, n).tolist()
+      db.session.execute(insert(Glucose), [
+        {"patient_id": patient_id, "value": value, "recorded_at": recorded_at}
+        for value, recorded_at in zip(values, timestamps)
+      ])
+    db.session.commit()
+    load_seconds = time.perf_counter() - started
+
+    fetch_ms, compute_ms = [], []
+    for patient_id in patient_ids:
+      t0 = time.perf_counter()
+      values, recorded_at = fetch_glucose(patient_id, START, end)
+      t1 = time.perf_counter()
+      metrics = glucose_metrics(values, recorded_at, START, end)
+      fetch_ms.append((t1 - t0) * 1000)
+      compute_ms.append((time.perf_counter() - t1) * 1000)
+      assert metrics["readings"] == n
+    db.session.remove()
+
+    reference_ms = []
+    for patient_id in patient_ids[:reference_patients]:
+      t0 = time.perf_counter()
+      reference = python_reference(patient_id, START, end)
+      reference_ms.append((time.perf_counter() - t0) * 1000)
+      metrics = glucose_metrics(*fetch_glucose(patient_id, START, end), START, end)
+      assert abs(reference["mean"] - metrics["mean"]) < 1e-9
+      assert abs(reference["stddev"] - metrics["stddev"]) < 1e-9
+      assert abs(reference["in_range"] - metrics["time_in_ranges"]["in_range"]) < 1e-9
+      for band in metrics["agp"]:
+        cut = reference["agp"][band["hour"]]
+        assert all(abs(cut[p - 1] - band[f"p{p}"]) < 1e-9 for p in AGP_PERCENTILES)
+      db.session.remove()
+
+  client = app.test_client()
+  query = f"from={START.isoformat()}Z&to={end.isoformat()}Z"
+  endpoint_ms = []
+  for patient_id in patient_ids[:requests]:
+    t0 = time.perf_counter()
+    response = client.get(f"/vitals/{patient_id}/glucose-metrics?{query}", headers=headers)
+    endpoint_ms.append((time.perf_counter() - t0) * 1000)
+    assert response.status_code == 200, response.get_json()
+
+  endpoint_ms.sort()
+  print(f"readings:                     {patients * n:>10} ({patients} patients x {days} days, loaded in {load_seconds:.0f} s)")
+  print(f"fetch, per patient:           {statistics.median(fetch_ms):10.1f} ms p50")
+  print(f"compute, per patient:         {statistics.median(compute_ms):10.1f} ms p50")
+  print(f"all patients, fetch+compute:  {(sum(fetch_ms) + sum(compute_ms)) / 1000:10.1f} s")
+  print(f"endpoint:                     {endpoint_ms[len(endpoint_ms) // 2]:10.1f} ms p50, "
+        f"{endpoint_ms[int(len(endpoint_ms) * 0.95)]:.1f} ms p95")
+  print(f"ORM + Python reference:       {statistics.median(reference_ms):10.1f} ms p50")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy.pool import StaticPool
+from sql import create_app
+from sql.models import User, UserRole, db
+from sql.utils.auth import hash_password
+
+def run(hash_limit, n_logins, concurrency, rounds):
+  app = create_app("DevelopmentConfig")
+  app.config["PASSWORD_HASH_CONCURRENCY"] = hash_limit
+  app.config["BCRYPT_LOG_ROUNDS"] = rounds
+  app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+  with app.app_context():
+    db.create_all()
+    db.session.add(User(name="Patient", email="patient@bench.test", password=hash_password("hunter2"), role=UserRole.PATIENT))
+    db.session.commit()
+
+  def login(_):
+    client = app.test_client()
+    response = client.post("/users/login", json={"email": "patient@bench.test", "password": "hunter2"})
+    assert response.status_code == 200, response.get_json()
+
+  start = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    list(pool.map(login, range(n_logins)))
+  return n_logins / (time.perf_counter() - start)
+
+def main(n_logins=200, concurrency=16, rounds=10):
+  print(f"cores: {os.cpu_count()}, bcrypt rounds: {rounds}, concurrent clients: {concurrency}")
+  for label, limit in (("serial", 1), ("uncapped", 0), (f"cap {os.cpu_count()}", os.cpu_count())):
+    print(f"{label:>8}: {run(limit, n_logins, concurrency, rounds):8.1f} logins/sec")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,110 @@
+import os
+import resource
+import selectors
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import insert, select
+from werkzeug.serving import make_server
+from sql import create_app
+from sql.models import User, UserRole, db
+from sql.blueprints.notifications.fanout import notify_users, notifications_committed
+from sql.utils.auth import generate_token
+
+def rss_mb():
+  with open("/proc/self/status") as f:
+    for line in f:
+      if line.startswith("VmRSS:"):
+        return int(line.split()[1]) / 1024
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def open_stream(port, token):
+  sock = socket.create_connection(("127.0.0.1", port))
+  sock.sendall(
+    f"GET /notifications/stream HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n"
+    "Accept: text/event-stream\r\n\r\n".encode()
+  )
+  return sock
+
+def read_until(selector, pending, marker, timeout):
+  # Returns the arrival time of the first chunk containing marker, per socket.
+  arrived = {}
+  buffers = {sock: b"" for sock in pending}
+  deadline = time.monotonic() + timeout
+  while len(arrived) < len(pending) and time.monotonic() < deadline:
+    for key, _ in selector.select(timeout=0.5):
+      data = key.fileobj.recv(65536)
+      buffers[key.fileobj] += data
+      if key.fileobj not in arrived and marker in buffers[key.fileobj]:
+        arrived[key.fileobj] = time.perf_counter()
+  return arrived
+
+def main(n_connections=2000):
+  app = create_app("DevelopmentConfig")
+  app.config.update(DEBUG=False, NOTIFICATIONS_STREAM_HEARTBEAT=300)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+      {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": "x", "role": UserRole.PATIENT}
+      for i in range(n_connections)
+    ])
+    db.session.commit()
+    users = db.session.execute(select(User.id, User.email, User.role)).all()
+    tokens = {user.id: generate_token(user) for user in users}
+
+  server = make_server("127.0.0.1", 0, app, threaded=True)
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  baseline_rss = rss_mb()
+
+  selector = selectors.DefaultSelector()
+  sockets = []
+  start = time.perf_counter()
+  for user_id, token in tokens.items():
+    sock = open_stream(server.server_port, token)
+    selector.register(sock, selectors.EVENT_READ)
+    sockets.append(sock)
+  connected = read_until(selector, sockets, b"retry:", timeout=120)
+  connect_seconds = time.perf_counter() - start
+  assert len(connected) == n_connections, (len(connected), n_connections)
+
+  with app.app_context():
+    hub_stats = app.extensions["notification_hub"].stats()
+  assert hub_stats["connections"] == n_connections, hub_stats
+  idle_rss = rss_mb()
+
+  with app.app_context():
+    sent = time.perf_counter()
+    recipients, events = notify_users(list(tokens), "Clinic closed tomorrow")
+    db.session.commit()
+    notifications_committed(recipients, events)
+  delivered = read_until(selector, sockets, b"Clinic closed tomorrow", timeout=60)
+  assert len(delivered) == n_connections, (len(delivered), n_connections)
+  latencies = sorted((arrival - sent) * 1000 for arrival in delivered.values())
+
+  for sock in sockets:
+    selector.unregister(sock)
+    sock.close()
+  server.shutdown()
+
+  # Every connection holds one server thread, so RSS per connection is mostly thread stack.
+  print(f"open streams:              {n_connections:10d}")
+  print(f"connect + first byte:      {connect_seconds:10.2f} s")
+  print(f"RSS idle (client+server):  {idle_rss:10.1f} MB ({(idle_rss - baseline_rss) * 1024 / n_connections:.1f} KB/stream)")
+  print(f"fan-out delivery p50:      {statistics.median(latencies):10.1f} ms")
+  print(f"fan-out delivery p95:      {latencies[int(len(latencies) * 0.95) - 1]:10.1f} ms")
+  print(f"fan-out delivery max:      {latencies[-1]:10.1f} ms")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,86 @@
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import func, insert, select
+from sql import create_app
+from sql.models import Notifications, User, UserRole, db
+from sql.blueprints.notifications.fanout import notify_users
+from sql.utils.auth import generate_token
+
+def time_get(client, path, headers, iterations):
+  samples = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    assert client.get(path, headers=headers).status_code == 200
+    samples.append((time.perf_counter() - start) * 1000)
+  return statistics.median(samples)
+
+def main(n_users=10_000, fanouts=100, iterations=500):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+      {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": "x", "role": UserRole.PATIENT}
+      for i in range(n_users)
+    ])
+    db.session.commit()
+    user_ids = db.session.scalars(select(User.id)).all()
+
+    # Baseline: one ORM object per notification. It skips the unread counter, so
+    # it targets users other than the reader checked below.
+    start = time.perf_counter()
+    for i in range(20):
+      for user_id in user_ids[-1000:]:
+        db.session.add(Notifications(user_id=user_id, message=f"Row message {i}", is_read=False))
+      db.session.commit()
+    per_row = 20_000 / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(fanouts):
+      notify_users(user_ids, f"Cohort message {i}")
+      db.session.commit()
+    fanout = fanouts * n_users / (time.perf_counter() - start)
+
+    reader = db.session.get(User, user_ids[0])
+    headers = {"Authorization": f"Bearer {generate_token(reader)}"}
+    expected = db.session.scalar(
+      select(func.count()).select_from(Notifications).where(Notifications.user_id == reader.id, Notifications.is_read.is_(False))
+    )
+    total = db.session.scalar(select(func.count()).select_from(Notifications))
+
+    def count_star():
+      return db.session.scalar(
+        select(func.count()).select_from(Notifications).where(Notifications.user_id == reader.id, Notifications.is_read.is_(False))
+      )
+    start = time.perf_counter()
+    for _ in range(iterations):
+      count_star()
+    count_ms = (time.perf_counter() - start) * 1000 / iterations
+
+  client = app.test_client()
+  response = client.get("/notifications/unread-count", headers=headers)
+  assert response.get_json()["unread"] == expected, (response.get_json(), expected)
+  badge_ms = time_get(client, "/notifications/unread-count", headers, iterations)
+  list_ms = time_get(client, "/notifications/?unread=true&limit=20", headers, iterations)
+
+  print(f"notifications stored:      {total:>10}")
+  print(f"per-row ORM inserts:       {per_row:10.0f} notifications/sec")
+  print(f"bulk fan-out:              {fanout:10.0f} notifications/sec")
+  print(f"COUNT(*) unread (SQL only): {count_ms:9.3f} ms")
+  print(f"badge endpoint p50:        {badge_ms:10.3f} ms (cached counter, full request)")
+  print(f"unread page p50:           {list_ms:10.3f} ms")
+
+if __name__ == "__main__":
+  main()
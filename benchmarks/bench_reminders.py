@@ -0,0 +1,120 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import func, insert, select
+from sql import create_app
+from sql.models import Appointment, AppointmentReminder, AppointmentStatus, Notifications, User, UserRole, db
+from sql.blueprints.appointment.reminders import ReminderScheduler, reminder_message
+from sql.blueprints.appointment.scheduling import as_utc
+from sql.blueprints.notifications.fanout import notify_each
+
+def count(model):
+  return db.session.scalar(select(func.count()).select_from(model))
+
+def wait_for(app, predicate, timeout=120):
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    with app.app_context():
+      if predicate():
+        return time.perf_counter()
+    time.sleep(0.005)
+  raise TimeoutError("scheduler did not finish in time")
+
+def main(doctors=50, patients=5000, appointments=200_000, due_now=20_000, days=60):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = random.Random(42)
+  now = datetime.now(timezone.utc)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+      {"name": f"Doctor {i}", "email": f"doctor{i}@bench.test", "password": "x", "role": UserRole.DOCTOR}
+      for i in range(doctors)
+    ] + [
+      {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": "x", "role": UserRole.PATIENT}
+      for i in range(patients)
+    ])
+    doctor_ids = db.session.scalars(select(User.id).where(User.role == UserRole.DOCTOR)).all()
+    patient_ids = db.session.scalars(select(User.id).where(User.role == UserRole.PATIENT)).all()
+
+    def appointment(starts):
+      return {
+        "doctor_id": rng.choice(doctor_ids), "patient_id": rng.choice(patient_ids), "appointment_time": starts,
+        "duration_minutes": 30, "status": AppointmentStatus.SCHEDULED, "reason": "Follow-up", "notes": ""
+      }
+
+    # The bulk of the table is beyond the 24h reminder window; due_now appointments
+    # start in just over an hour, so their 1h reminders are due by the time
+    # the scheduler starts.
+    rows = [appointment(now + timedelta(hours=26, seconds=rng.uniform(0, days * 86400))) for _ in range(appointments - due_now)]
+    rows += [appointment(now + timedelta(minutes=60, seconds=rng.uniform(0, 2))) for _ in range(due_now)]
+    for start in range(0, len(rows), 10_000):
+      db.session.execute(insert(Appointment), rows[start:start + 10_000])
+    db.session.commit()
+
+    # What a cron job polling every minute would do instead: find every
+    # scheduled appointment still owed a reminder and check its due times.
+    start = time.perf_counter()
+    owed = db.session.execute(
+      select(Appointment.id, Appointment.appointment_time).where(
+        Appointment.status == AppointmentStatus.SCHEDULED,
+        ~select(AppointmentReminder.id).where(AppointmentReminder.appointment_id == Appointment.id).exists()
+      )
+    ).all()
+    [row for row in owed if any(as_utc(row.appointment_time) - timedelta(minutes=m) <= now + timedelta(minutes=1) for m in (1440, 60))]
+    scan_ms = (time.perf_counter() - start) * 1000
+
+  time.sleep(max((now + timedelta(seconds=2) - datetime.now(timezone.utc)).total_seconds(), 0))
+  scheduler = ReminderScheduler(app)
+  started = time.perf_counter()
+  scheduler.start()
+  loaded = wait_for(app, lambda: scheduler.stats()["loads"] == 1)
+  queued = scheduler.stats()["queued"]
+  sent = wait_for(app, lambda: scheduler.stats()["sent"] >= due_now)
+  scheduler.close()
+  stats = scheduler.stats()
+
+  with app.app_context():
+    notifications = count(Notifications)
+    assert notifications == due_now, (notifications, due_now)
+
+  restarted = ReminderScheduler(app)
+  restarted.start()
+  wait_for(app, lambda: restarted.stats()["loads"] == 1)
+  time.sleep(2)
+  restarted.close()
+  with app.app_context():
+    assert count(Notifications) == notifications, "reminders were sent twice after a restart"
+
+    # Baseline: the same reminders sent one transaction each.
+    baseline = db.session.execute(
+      select(Appointment.id, Appointment.patient_id, Appointment.appointment_time).limit(2000)
+    ).all()
+    start = time.perf_counter()
+    for row in baseline:
+      db.session.execute(insert(AppointmentReminder), [{"appointment_id": row.id, "offset_minutes": 1440, "sent_at": now}])
+      notify_each([(row.patient_id, reminder_message("Doctor", as_utc(row.appointment_time)))])
+      db.session.commit()
+    per_row = len(baseline) / (time.perf_counter() - start)
+
+  print(f"appointments:                 {appointments:>10}")
+  print(f"cron-style scan:              {scan_ms:10.1f} ms per poll")
+  print(f"initial horizon load:         {(loaded - started) * 1000:10.1f} ms ({queued} reminders queued)")
+  print(f"bulk dispatch:                {due_now / (sent - loaded):10.0f} reminders/sec ({stats['batches']} batches)")
+  print(f"one commit per reminder:      {per_row:10.0f} reminders/sec")
+  print(f"after restart:                {'no duplicates':>10}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,116 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from flask import jsonify
+from sqlalchemy import insert
+from sql import create_app
+from sql.models import BloodPressure, Goal, Medication, Temperature, User, UserRole, Weight, db
+from sql.blueprints.goal.schemas import goals_schema
+from sql.blueprints.medication.schemas import medications_schema
+from sql.blueprints.user.schemas import return_users_schema
+from sql.blueprints.vitals.schemas import bloodpressures_schema, temperatures_schema, weights_schema
+from sql.utils.serializers import dump_list, json_response, list_query
+
+def marshmallow_body(schema, rows):
+  return jsonify({"items": schema.dump(rows), "next_cursor": None}).get_data()
+
+def fast_body(schema, rows):
+  return json_response({"items": dump_list(schema, rows), "next_cursor": None}).get_data()
+
+def seed_fixtures(rng):
+  doctor = User(name="Dr. Zoë Ñúñez", email="doctor@bench.test", password="x", role=UserRole.DOCTOR)
+  patient = User(name="Patient", email="patient@bench.test", password="x", role=UserRole.PATIENT, dob=date(1980, 5, 17))
+  db.session.add_all([doctor, patient])
+  db.session.commit()
+
+  db.session.execute(insert(Medication), [
+    {"patient_id": patient.id, "prescribed_by_id": doctor.id if i % 3 else None, "name": f"Med {i}",
+     "dosage": "10mg", "frequency": "daily", "prescribed_by_name": "Dr. Zoë", "active": i % 4 != 0,
+     "deactivation_reason": None if i % 4 else "Side effects"}
+    for i in range(50)
+  ])
+  db.session.execute(insert(Goal), [
+    {"patient_id": patient.id, "created_by": doctor.id, "title": f"Goal {i}", "description": "Walk\tdaily\x7f",
+     "target_date": date(2025, 1, 1) + timedelta(days=i), "is_complete": bool(i % 2), "created_at": datetime(2024, 1, 1, 8, i)}
+    for i in range(50)
+  ])
+  # Floats the two encoders format differently, stored in both a FLOAT and a
+  # (loosely typed under SQLite) INTEGER column.
+  edge_values = [1e-5, 2.5e-7, 1e16, 1.2345678901234568e17, 0.0, -0.0, 0.0001, 70.25]
+  for model in (Weight, Temperature):
+    db.session.execute(insert(model), [
+      {"patient_id": patient.id, "value": value, "recorded_at": datetime(2024, 1, 1) + timedelta(hours=i)}
+      for i, value in enumerate(edge_values + [round(rng.uniform(35, 150), 2) for _ in range(200)])
+    ])
+  db.session.commit()
+  return patient.id
+
+def check_compatibility(patient_id):
+  checked = []
+  for schema in (return_users_schema, goals_schema, medications_schema, weights_schema, temperatures_schema):
+    model = schema.opts.model
+    filters = [] if model is User else [model.patient_id == patient_id]
+    orm_rows = model.query.filter(*filters).order_by(model.id).all()
+    fast_rows = list_query(schema).filter(*filters).order_by(model.id).all()
+    slow, fast = marshmallow_body(schema, orm_rows), fast_body(schema, fast_rows)
+    assert slow == fast, type(schema).__name__
+    checked.append(model.__tablename__)
+    db.session.expunge_all()
+  print(f"compatible:        {', '.join(checked)}")
+
+def time_paths(patient_id, model, schema, n_rows):
+  t0 = time.perf_counter()
+  orm_rows = model.query.filter(model.patient_id == patient_id).order_by(model.id).limit(n_rows).all()
+  t1 = time.perf_counter()
+  slow = marshmallow_body(schema, orm_rows)
+  orm_times = (t1 - t0, time.perf_counter() - t1)
+  db.session.expunge_all()
+
+  t2 = time.perf_counter()
+  fast_rows = list_query(schema).filter(model.patient_id == patient_id).order_by(model.id).limit(n_rows).all()
+  t3 = time.perf_counter()
+  fast = fast_body(schema, fast_rows)
+  t4 = time.perf_counter()
+
+  assert slow == fast
+  return orm_times, (t3 - t2, t4 - t3), len(fast)
+
+def main(sizes=(10_000, 100_000)):
+  app = create_app("DevelopmentConfig")
+  # Compact output is what production serves.
+  app.debug = False
+  rng = random.Random(42)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    patient_id = seed_fixtures(rng)
+    check_compatibility(patient_id)
+
+    start = datetime(2024, 1, 1)
+    db.session.execute(insert(BloodPressure), [
+      {"patient_id": patient_id, "systolic": rng.randint(95, 170), "diastolic": rng.randint(55, 110), "recorded_at": start + timedelta(minutes=i)}
+      for i in range(max(sizes))
+    ])
+    db.session.commit()
+
+    for n_rows in sizes:
+      (orm_fetch, orm_dump), (row_fetch, row_dump), size = time_paths(patient_id, BloodPressure, bloodpressures_schema, n_rows)
+      orm_total, fast_total = orm_fetch + orm_dump, row_fetch + row_dump
+      print(f"rows {n_rows:>7} ({size / 1e6:.1f} MB)")
+      print(f"  ORM + marshmallow: fetch {orm_fetch * 1000:8.1f} ms  serialize {orm_dump * 1000:8.1f} ms  total {orm_total * 1000:8.1f} ms")
+      print(f"  rows + orjson:     fetch {row_fetch * 1000:8.1f} ms  serialize {row_dump * 1000:8.1f} ms  total {fast_total * 1000:8.1f} ms")
+      print(f"  speedup:           serialize {orm_dump / row_dump:5.1f}x  total {orm_total / fast_total:5.1f}x")
+
+if __name__ == "__main__":
+  main()
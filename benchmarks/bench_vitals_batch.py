@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sql import create_app
+from sql.models import User, UserRole, db
+from sql.utils.auth import generate_token
+
+ROUTES = {
+  "blood_pressure": "/bp",
+  "heart_rate": "/heartrate",
+  "weight": "/weight",
+  "glucose": "/glucose",
+  "temperature": "/temperature",
+}
+
+def make_reading(rng, patient_id):
+  vital_type = rng.choice(list(ROUTES))
+  if vital_type == "blood_pressure":
+    return {"type": vital_type, "patient_id": patient_id, "systolic": rng.randint(100, 160), "diastolic": rng.randint(60, 100)}
+  if vital_type == "temperature":
+    return {"type": vital_type, "patient_id": patient_id, "value": round(rng.uniform(36.0, 39.0), 1)}
+  return {"type": vital_type, "patient_id": patient_id, "value": rng.randint(50, 200)}
+
+def main(n_readings=2000, batch_size=500):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = random.Random(42)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    patients = [
+      User(name=f"Patient {i}", email=f"patient{i}@bench.test", password="x", role=UserRole.PATIENT)
+      for i in range(20)
+    ]
+    db.session.add_all(patients)
+    db.session.commit()
+    patient_ids = [p.id for p in patients]
+    headers = {"Authorization": f"Bearer {generate_token(patients[0])}"}
+
+  readings = [make_reading(rng, rng.choice(patient_ids)) for _ in range(n_readings)]
+  client = app.test_client()
+
+  start = time.perf_counter()
+  for reading in readings:
+    body = {k: v for k, v in reading.items() if k not in ("type", "patient_id")}
+    client.post(f"{ROUTES[reading['type']]}/{reading['patient_id']}", json=body, headers=headers)
+  per_row = time.perf_counter() - start
+
+  start = time.perf_counter()
+  for i in range(0, n_readings, batch_size):
+    response = client.post("/vitals/batch", json=readings[i:i + batch_size], headers=headers)
+    assert response.status_code == 201, response.get_json()
+  batch = time.perf_counter() - start
+
+  print(f"per-row routes: {n_readings / per_row:10.0f} rows/sec")
+  print(f"batch endpoint: {n_readings / batch:10.0f} rows/sec ({batch_size} per request)")
+  print(f"speedup:        {per_row / batch:10.1f}x")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,134 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import insert, select
+from sql import create_app
+from sql.models import BloodPressure, Diagnosis, User, UserRole, Weight, db, normalize_diagnosis_name
+from sql.utils.auth import generate_token
+
+CHUNK_SIZE = 50_000
+
+def insert_chunks(model, rows):
+  for start in range(0, len(rows), CHUNK_SIZE):
+    db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+def loop_baseline(doctor_id, since, threshold):
+  # What the endpoint replaces: one query per patient, aggregated in Python.
+  patient_ids = db.session.scalars(select(Diagnosis.patient_id).where(Diagnosis.doctor_id == doctor_id).distinct()).all()
+  results = []
+  for patient_id in patient_ids:
+    values = db.session.scalars(
+      select(BloodPressure.systolic).where(BloodPressure.patient_id == patient_id, BloodPressure.recorded_at >= since)
+    ).all()
+    if values and statistics.fmean(values) > threshold:
+      results.append((patient_id, statistics.fmean(values)))
+  return sorted(results, key=lambda r: (-r[1], r[0]))
+
+def walk(client, headers, query):
+  pages, items, cursor = 0, [], None
+  while True:
+    url = f"/vitals/cohort?{query}&limit=200" + (f"&cursor={cursor}" if cursor else "")
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    pages += 1
+    items += body["items"]
+    cursor = body["next_cursor"]
+    if cursor is None:
+      return pages, items
+
+def timed(fn, iterations):
+  samples = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    result = fn()
+    samples.append((time.perf_counter() - start) * 1000)
+  samples.sort()
+  return result, samples[len(samples) // 2]
+
+def main(patients=50_000, doctors=20, days=60, iterations=20):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+  rng = random.Random(42)
+  now = datetime.now(timezone.utc)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+      {"name": f"Doctor {i}", "email": f"doctor{i}@bench.test", "password": "x", "role": UserRole.DOCTOR}
+      for i in range(doctors)
+    ] + [
+      {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": "x", "role": UserRole.PATIENT}
+      for i in range(patients)
+    ])
+    doctor_ids = db.session.scalars(select(User.id).where(User.role == UserRole.DOCTOR).order_by(User.id)).all()
+    patient_ids = db.session.scalars(select(User.id).where(User.role == UserRole.PATIENT)).all()
+
+    # Every patient has a primary doctor, and a third also see a second one.
+    diagnoses = []
+    for i, patient_id in enumerate(patient_ids):
+      assigned = {doctor_ids[i % doctors]}
+      if rng.random() < 0.33:
+        assigned.add(rng.choice(doctor_ids))
+      for doctor_id in assigned:
+        diagnoses.append({"patient_id": patient_id, "doctor_id": doctor_id, "diagnosis_name": "Essential Hypertension",
+                          "diagnosis_name_normalized": normalize_diagnosis_name("Essential Hypertension"),
+                          "diagnosis_code": "I10", "diagnosis_date": date(2024, 1, 1), "notes": ""})
+    insert_chunks(Diagnosis, diagnoses)
+
+    started = time.perf_counter()
+    pressures, weights = [], []
+    for patient_id in patient_ids:
+      systolic, weight, trend = rng.gauss(130, 12), rng.uniform(55, 120), rng.gauss(0, 0.05)
+      for day in range(days):
+        recorded_at = now - timedelta(days=day, minutes=rng.randint(0, 600))
+        pressures.append({"patient_id": patient_id, "systolic": round(systolic + rng.gauss(0, 8)),
+                          "diastolic": rng.randint(70, 95), "recorded_at": recorded_at})
+        if day % 2 == 0:
+          weights.append({"patient_id": patient_id, "value": round(weight - trend * day + rng.gauss(0, 0.5)), "recorded_at": recorded_at})
+    insert_chunks(BloodPressure, pressures)
+    insert_chunks(Weight, weights)
+    db.session.commit()
+    load_seconds = time.perf_counter() - started
+
+    doctor = db.session.get(User, doctor_ids[0])
+    headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+    panel = len(set(db.session.scalars(select(Diagnosis.patient_id).where(Diagnosis.doctor_id == doctor.id))))
+    since = now - timedelta(days=7)
+    baseline, loop_ms = timed(lambda: loop_baseline(doctor.id, since, 140), 3)
+    db.session.remove()
+
+  client = app.test_client()
+  systolic = "type=blood_pressure&metric=systolic&statistic=mean&days=7&above=140"
+  weight = "type=weight&statistic=change&days=30&above=2"
+  (pages, items), walk_ms = timed(lambda: walk(client, headers, systolic), iterations)
+  _, first_ms = timed(lambda: client.get(f"/vitals/cohort?{systolic}", headers=headers), iterations)
+  (weight_pages, weight_items), weight_ms = timed(lambda: walk(client, headers, weight), iterations)
+
+  # The loop ran a moment earlier, so a reading right on the 7-day edge can differ.
+  matched = {row[0] for row in baseline} & {item["patient_id"] for item in items}
+  assert len(matched) >= 0.99 * len(baseline), (len(matched), len(baseline))
+  assert [item["rank"] for item in items] == sorted(item["rank"] for item in items)
+
+  print(f"patients:                     {patients:>10} ({len(pressures) + len(weights)} readings, loaded in {load_seconds:.0f} s)")
+  print(f"doctor's panel:               {panel:>10} patients")
+  print(f"mean systolic > 140, 7 days:  {len(items):>10} patients")
+  print(f"  first page:                 {first_ms:10.1f} ms p50")
+  print(f"  all {pages} pages of 200:       {walk_ms:10.1f} ms p50")
+  print(f"  query per patient:          {loop_ms:10.1f} ms p50")
+  print(f"weight up > 2 kg, 30 days:    {len(weight_items):>10} patients, {weight_pages} pages in {weight_ms:.1f} ms p50")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,74 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy import insert
+from sql import create_app
+from sql.models import HeartRate, User, UserRole, db
+from sql.blueprints.vitals.schemas import heartrates_schema
+from sql.blueprints.vitals.stats import summarize_vital
+
+def orm_baseline(patient_id):
+  entries = HeartRate.query.filter_by(patient_id=patient_id).all()
+  values = [entry["value"] for entry in heartrates_schema.dump(entries)]
+  cut = statistics.quantiles(values, n=100, method="inclusive")
+  return {
+    "count": len(values),
+    "mean": statistics.fmean(values),
+    "min": min(values),
+    "max": max(values),
+    "stddev": statistics.stdev(values),
+    "p5": cut[4],
+    "p50": cut[49],
+    "p95": cut[94]
+  }
+
+def main(n_rows=1_000_000):
+  app = create_app("DevelopmentConfig")
+  rng = random.Random(42)
+  start = datetime(2024, 1, 1)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    patient = User(name="Patient", email="patient@bench.test", password="x", role=UserRole.PATIENT)
+    db.session.add(patient)
+    db.session.commit()
+
+    for offset in range(0, n_rows, 50_000):
+      rows = [
+        {"patient_id": patient.id, "value": rng.randint(45, 180), "recorded_at": start + timedelta(minutes=i)}
+        for i in range(offset, min(offset + 50_000, n_rows))
+      ]
+      db.session.execute(insert(HeartRate), rows)
+    db.session.commit()
+
+    t0 = time.perf_counter()
+    baseline = orm_baseline(patient.id)
+    orm_time = time.perf_counter() - t0
+    db.session.expunge_all()
+
+    t0 = time.perf_counter()
+    summary = summarize_vital(HeartRate, patient.id)["value"]
+    numpy_time = time.perf_counter() - t0
+
+    assert baseline["count"] == summary["count"]
+    assert abs(baseline["p50"] - summary["p50"]) < 1e-9
+
+  print(f"rows:              {n_rows:>10}")
+  print(f"ORM + marshmallow: {orm_time:10.2f} s")
+  print(f"column + NumPy:    {numpy_time:10.2f} s")
+  print(f"speedup:           {orm_time / numpy_time:10.1f}x")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(_db_dir, 'bench.db')}")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sql import create_app
+from sql.models import HeartRate, User, UserRole, db
+from sql.utils.auth import generate_token
+
+def post_readings(app, headers, patient_id, n_readings, expected_status):
+  rng = random.Random(42)
+  client = app.test_client()
+  start = time.perf_counter()
+  for _ in range(n_readings):
+    response = client.post(f"/heartrate/{patient_id}", json={"value": rng.randint(50, 150)}, headers=headers)
+    assert response.status_code == expected_status, response.get_json()
+  return time.perf_counter() - start
+
+def main(n_readings=5000):
+  app = create_app("DevelopmentConfig")
+  app.config["DEBUG"] = False
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    patient = User(name="Patient", email="patient@bench.test", password="x", role=UserRole.PATIENT)
+    db.session.add(patient)
+    db.session.commit()
+    patient_id = patient.id
+    headers = {"Authorization": f"Bearer {generate_token(patient)}"}
+
+  sync_time = post_readings(app, headers, patient_id, n_readings, 201)
+
+  app.config["VITALS_WRITE_BEHIND"] = True
+  queued_time = post_readings(app, headers, patient_id, n_readings, 202)
+  writer = app.extensions["vitals_writer"]
+  start = time.perf_counter()
+  writer.close()
+  drain_time = time.perf_counter() - start
+
+  with app.app_context():
+    stored = db.session.query(HeartRate).count()
+  stats = writer.stats()
+  # Everything acknowledged with 202 must be on disk once close() returns.
+  assert stored == 2 * n_readings and stats["written"] == n_readings, (stored, stats)
+
+  print(f"readings per mode:    {n_readings}")
+  print(f"synchronous commits:  {n_readings / sync_time:10.1f} readings/sec")
+  print(f"write-behind (ack):   {n_readings / queued_time:10.1f} readings/sec")
+  print(f"drain on close:       {drain_time * 1000:10.1f} ms")
+  print(f"writer batches:       {stats['batches']:10d}")
+
+if __name__ == "__main__":
+  main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
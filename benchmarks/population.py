@@ -0,0 +1,131 @@
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert
+from sql.models import BloodPressure, Diagnosis, Glucose, Goal, HeartRate, Medication, Temperature, User, UserRole, Weight, db, normalize_diagnosis_name
+from sql.utils.auth import hash_password
+
+START = datetime(2022, 1, 1)
+CHUNK_SIZE = 20_000
+
+CONDITIONS = [
+  ("Type 2 Diabetes", "E11.9"), ("Essential Hypertension", "I10"), ("Hyperlipidemia", "E78.5"),
+  ("Asthma", "J45.909"), ("Chronic Kidney Disease", "N18.3"), ("Hypothyroidism", "E03.9"),
+  ("Atrial Fibrillation", "I48.91"), ("Obesity", "E66.9"), ("Major Depressive Disorder", "F32.9"),
+  ("Osteoarthritis", "M19.90"), ("COPD", "J44.9"), ("Heart Failure", "I50.9"),
+  ("Migraine", "G43.909"), ("Gout", "M10.9"), ("Anemia", "D64.9"), ("Sleep Apnea", "G47.33")
+]
+
+MEDICATIONS = [
+  ("Metformin", "500mg"), ("Lisinopril", "10mg"), ("Atorvastatin", "20mg"), ("Levothyroxine", "50mcg"),
+  ("Amlodipine", "5mg"), ("Albuterol", "90mcg"), ("Sertraline", "50mg"), ("Apixaban", "5mg"),
+  ("Allopurinol", "100mg"), ("Omeprazole", "20mg")
+]
+
+FREQUENCIES = ["once daily", "twice daily", "every 8 hours", "as needed"]
+
+PASSWORD = "benchmark-password"
+
+def _insert_chunks(model, rows):
+  rows = iter(rows)
+  total = 0
+  while True:
+    chunk = [row for _, row in zip(range(CHUNK_SIZE), rows)]
+    if not chunk:
+      return total
+    db.session.execute(insert(model), chunk)
+    total += len(chunk)
+
+def _vital_rows(rng, patient_ids, days, readings_per_day):
+  # Each patient gets a stable baseline so series look like one person over time.
+  step = timedelta(days=1) / readings_per_day
+  for patient_id in patient_ids:
+    systolic, diastolic = rng.randint(105, 150), rng.randint(65, 95)
+    heart_rate, weight = rng.randint(58, 90), rng.randint(55, 130)
+    glucose, temperature = rng.randint(85, 170), rng.uniform(36.4, 37.0)
+    drift = rng.uniform(-0.01, 0.01)
+
+    for i in range(days * readings_per_day):
+      recorded_at = START + step * i + timedelta(minutes=rng.randint(0, 30))
+      yield BloodPressure, {"patient_id": patient_id, "systolic": systolic + rng.randint(-12, 12),
+                            "diastolic": diastolic + rng.randint(-8, 8), "recorded_at": recorded_at}
+      yield HeartRate, {"patient_id": patient_id, "value": heart_rate + rng.randint(-10, 20), "recorded_at": recorded_at}
+      yield Weight, {"patient_id": patient_id, "value": round(weight + drift * i / readings_per_day), "recorded_at": recorded_at}
+      yield Glucose, {"patient_id": patient_id, "value": max(40, glucose + rng.randint(-35, 60)), "recorded_at": recorded_at}
+      yield Temperature, {"patient_id": patient_id, "value": round(temperature + rng.uniform(-0.4, 0.6), 1), "recorded_at": recorded_at}
+
+def generate_population(doctors=10, patients=200, years=1, readings_per_day=1, seed=42):
+  rng = random.Random(seed)
+  # One hash for everyone: hashing per user would dominate setup time.
+  password = hash_password(PASSWORD)
+
+  db.session.execute(insert(User), [
+    {"name": f"Doctor {i}", "email": f"doctor{i}@bench.test", "password": password, "role": UserRole.DOCTOR, "is_active": True}
+    for i in range(doctors)
+  ])
+  db.session.execute(insert(User), [
+    {"name": f"Patient {i}", "email": f"patient{i}@bench.test", "password": password, "role": UserRole.PATIENT,
+     "dob": date(1940, 1, 1) + timedelta(days=rng.randint(0, 365 * 60)), "is_active": rng.random() > 0.03}
+    for i in range(patients)
+  ])
+  db.session.commit()
+
+  doctor_ids = db.session.scalars(db.select(User.id).where(User.role == UserRole.DOCTOR).order_by(User.id)).all()
+  patient_ids = db.session.scalars(db.select(User.id).where(User.role == UserRole.PATIENT).order_by(User.id)).all()
+  primary_doctor = {patient_id: doctor_ids[i % len(doctor_ids)] for i, patient_id in enumerate(patient_ids)}
+  doctor_names = {doctor_id: f"Doctor {i}" for i, doctor_id in enumerate(doctor_ids)}
+
+  diagnoses, medications, goals = [], [], []
+  for patient_id in patient_ids:
+    doctor_id = primary_doctor[patient_id]
+    for name, code in rng.sample(CONDITIONS, rng.randint(1, 4)):
+      diagnoses.append({
+        "patient_id": patient_id, "doctor_id": doctor_id, "diagnosis_name": name, "diagnosis_code": code,
+        "diagnosis_date": (START + timedelta(days=rng.randint(0, 365 * years))).date(),
+        "notes": f"{name} follow-up, reviewed {rng.choice(['labs', 'symptoms', 'medication adherence', 'vitals'])}"
+      })
+    for name, dosage in rng.sample(MEDICATIONS, rng.randint(1, 6)):
+      active = rng.random() > 0.2
+      medications.append({
+        "patient_id": patient_id, "prescribed_by_id": doctor_id, "prescribed_by_name": doctor_names[doctor_id],
+        "name": name, "dosage": dosage, "frequency": rng.choice(FREQUENCIES), "active": active,
+        "deactivation_reason": None if active else "Discontinued"
+      })
+    for i in range(rng.randint(0, 4)):
+      goals.append({
+        "patient_id": patient_id, "created_by": doctor_id, "title": f"Goal {i + 1}",
+        "description": rng.choice(["Walk 30 minutes daily", "Reduce sodium intake", "Check glucose before meals"]),
+        "target_date": (START + timedelta(days=365 * years + rng.randint(30, 365))).date(),
+        "is_complete": rng.random() < 0.3, "created_at": START + timedelta(days=rng.randint(0, 365 * years))
+      })
+
+  counts = {
+    "doctors": len(doctor_ids),
+    "patients": len(patient_ids),
+    "diagnoses": _insert_chunks(Diagnosis, (
+      dict(row, diagnosis_name_normalized=normalize_diagnosis_name(row["diagnosis_name"])) for row in diagnoses
+    )),
+    "medications": _insert_chunks(Medication, medications),
+    "goals": _insert_chunks(Goal, goals)
+  }
+
+  buffers = {}
+  for model, row in _vital_rows(rng, patient_ids, 365 * years, readings_per_day):
+    buffer = buffers.setdefault(model, [])
+    buffer.append(row)
+    if len(buffer) >= CHUNK_SIZE:
+      db.session.execute(insert(model), buffer)
+      counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(buffer)
+      buffer.clear()
+  for model, buffer in buffers.items():
+    if buffer:
+      db.session.execute(insert(model), buffer)
+      counts[model.__tablename__] = counts.get(model.__tablename__, 0) + len(buffer)
+  db.session.commit()
+
+  return {
+    "doctor_ids": doctor_ids,
+    "patient_ids": patient_ids,
+    "primary_doctor": primary_doctor,
+    "conditions": [name for name, _ in CONDITIONS],
+    "counts": counts
+  }
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+BACKENDS = ("memory", "file")
+RUN_ARGS = ("doctors", "patients", "years", "readings_per_day", "seed", "iterations", "login_iterations", "batch_size", "bcrypt_rounds")
+VITAL_TYPES = ("blood_pressure", "heart_rate", "weight", "glucose", "temperature")
+
+def parse_args(argv=None):
+  parser = argparse.ArgumentParser(description="Run the performance suite against a synthetic patient population.")
+  parser.add_argument("--backend", choices=BACKENDS + ("all",), default="all")
+  parser.add_argument("--doctors", type=int, default=10)
+  parser.add_argument("--patients", type=int, default=200)
+  parser.add_argument("--years", type=int, default=1)
+  parser.add_argument("--readings-per-day", type=int, default=2)
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--iterations", type=int, default=200)
+  parser.add_argument("--login-iterations", type=int, default=20)
+  parser.add_argument("--batch-size", type=int, default=500)
+  parser.add_argument("--bcrypt-rounds", type=int, default=12)
+  parser.add_argument("--output", default="benchmark-results.json")
+  parser.add_argument("--compare", help="Previous results file; report p50 changes against it")
+  parser.add_argument("--threshold", type=float, default=0.2, help="Relative p50 slowdown that counts as a regression")
+  parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+  return parser.parse_args(argv)
+
+def measure(fn, iterations, warmup=3, units=1):
+  for _ in range(warmup):
+    fn()
+
+  samples = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    fn()
+    samples.append((time.perf_counter() - start) * 1000)
+
+  samples.sort()
+  mean = sum(samples) / len(samples)
+  return {
+    "iterations": iterations,
+    "p50_ms": round(samples[len(samples) // 2], 3),
+    "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+    "max_ms": round(samples[-1], 3),
+    "mean_ms": round(mean, 3),
+    "ops_per_sec": round(units * 1000 / mean, 1)
+  }
+
+def expect(response, *statuses):
+  assert response.status_code in statuses, (response.status_code, response.get_data(as_text=True)[:200])
+  return response
+
+def make_reading(rng, patient_id, recorded_at):
+  vital_type = rng.choice(VITAL_TYPES)
+  reading = {"type": vital_type, "patient_id": patient_id, "recorded_at": recorded_at.isoformat()}
+  if vital_type == "blood_pressure":
+    reading.update(systolic=rng.randint(100, 160), diastolic=rng.randint(60, 100))
+  elif vital_type == "temperature":
+    reading["value"] = round(rng.uniform(36.0, 39.0), 1)
+  else:
+    reading["value"] = rng.randint(50, 200)
+  return reading
+
+def run_backend(args):
+  from sql import create_app
+  from sql.models import Diagnosis, Goal, User, db
+  from sql.utils.auth import generate_token
+  from population import PASSWORD, generate_population
+
+  app = create_app("DevelopmentConfig")
+  app.config.update(DEBUG=False, RESPONSE_CACHE_ENABLED=False, BCRYPT_LOG_ROUNDS=args.bcrypt_rounds)
+
+  with app.app_context():
+    db.drop_all()
+    db.create_all()
+    start = time.perf_counter()
+    population = generate_population(args.doctors, args.patients, args.years, args.readings_per_day, args.seed)
+    setup_seconds = time.perf_counter() - start
+
+    patient_id = population["patient_ids"][0]
+    goal_patient_id = db.session.scalars(db.select(Goal.patient_id).order_by(Goal.id).limit(1)).first()
+    cohort = db.session.execute(db.select(Diagnosis.doctor_id, Diagnosis.diagnosis_name).order_by(Diagnosis.id).limit(1)).one()
+    patient = db.session.get(User, patient_id)
+    doctor = db.session.get(User, cohort.doctor_id)
+    patient_email = patient.email
+    doctor_headers = {"Authorization": f"Bearer {generate_token(doctor)}"}
+    patient_headers = {"Authorization": f"Bearer {generate_token(patient)}"}
+
+  client = app.test_client()
+  rng = random.Random(args.seed)
+  clock = iter(datetime(2030, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=i) for i in range(10 ** 9))
+
+  def post_batch():
+    readings = [make_reading(rng, rng.choice(population["patient_ids"]), next(clock)) for _ in range(args.batch_size)]
+    expect(client.post("/vitals/batch", json=readings, headers=patient_headers), 201)
+
+  def post_row():
+    expect(client.post(f"/heartrate/{patient_id}", json={"value": rng.randint(50, 150)}, headers=patient_headers), 201)
+
+  list_endpoints = {
+    "list_blood_pressure": (f"/bp/{patient_id}?limit=100", patient_headers),
+    "list_users": ("/users/?limit=100", doctor_headers),
+    "list_goals": (f"/goals/{goal_patient_id}", doctor_headers),
+    "list_medications": (f"/medications/patients/{patient_id}", doctor_headers),
+    "cohort_lookup": (f"/diagnoses/patients/{quote(cohort.diagnosis_name)}?limit=100", doctor_headers)
+  }
+
+  benchmarks = {
+    "login": measure(
+      lambda: expect(client.post("/users/login", json={"email": patient_email, "password": PASSWORD}), 200),
+      args.login_iterations, warmup=1
+    ),
+    # ops_per_sec counts readings here, so it compares directly with ingest_row.
+    "ingest_batch": measure(post_batch, max(args.iterations // 10, 5), units=args.batch_size),
+    "ingest_row": measure(post_row, args.iterations)
+  }
+  for name, (path, headers) in list_endpoints.items():
+    benchmarks[name] = measure(lambda: expect(client.get(path, headers=headers), 200), args.iterations)
+
+  return {
+    "database_uri": app.config["SQLALCHEMY_DATABASE_URI"],
+    "setup_seconds": round(setup_seconds, 2),
+    "population": population["counts"],
+    "benchmarks": benchmarks
+  }
+
+def run_child(args, backend, work_dir):
+  uri = "sqlite://" if backend == "memory" else f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+  output = os.path.join(work_dir, f"{backend}.json")
+  argv = [f"--{name.replace('_', '-')}={getattr(args, name)}" for name in RUN_ARGS]
+  env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri, SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark-secret"))
+
+  # The database URI is read when config is imported, so each backend runs in
+  # its own interpreter.
+  subprocess.run(
+    [sys.executable, os.path.abspath(__file__), "--child", "--backend", backend, "--output", output] + argv,
+    env=env, check=True
+  )
+  with open(output) as f:
+    return json.load(f)
+
+def git_revision():
+  try:
+    return subprocess.run(
+      ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+      capture_output=True, text=True, check=True
+    ).stdout.strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def compare(results, baseline, threshold):
+  regressions = []
+  for backend, current in results["backends"].items():
+    previous = baseline.get("backends", {}).get(backend)
+    if previous is None:
+      continue
+    for name, stats in current["benchmarks"].items():
+      before = previous["benchmarks"].get(name)
+      if before is None:
+        continue
+      change = (stats["p50_ms"] - before["p50_ms"]) / before["p50_ms"]
+      flag = "REGRESSION" if change > threshold else ""
+      print(f"{backend:>7} {name:<22} {before['p50_ms']:10.3f} -> {stats['p50_ms']:10.3f} ms  {change:+7.1%} {flag}")
+      if flag:
+        regressions.append(f"{backend}/{name}")
+  return regressions
+
+def print_summary(results):
+  for backend, result in results["backends"].items():
+    print(f"\n{backend} ({result['setup_seconds']} s setup, {result['population']})")
+    for name, stats in result["benchmarks"].items():
+      print(f"  {name:<22} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  {stats['ops_per_sec']:10.1f} ops/s")
+
+def main(argv=None):
+  args = parse_args(argv)
+
+  if args.child:
+    with open(args.output, "w") as f:
+      json.dump(run_backend(args), f)
+    return 0
+
+  backends = BACKENDS if args.backend == "all" else (args.backend,)
+  with tempfile.TemporaryDirectory() as work_dir:
+    per_backend = {backend: run_child(args, backend, work_dir) for backend in backends}
+
+  results = {
+    "created_at": datetime.now(timezone.utc).isoformat(),
+    "git_revision": git_revision(),
+    "python": platform.python_version(),
+    "sqlite": sqlite3.sqlite_version,
+    "platform": platform.platform(),
+    "parameters": {name: getattr(args, name) for name in RUN_ARGS},
+    "backends": per_backend
+  }
+  with open(args.output, "w") as f:
+    json.dump(results, f, indent=2, sort_keys=True)
+
+  print_summary(results)
+  print(f"\nresults written to {args.output}")
+
+  if args.compare:
+    with open(args.compare) as f:
+      regressions = compare(results, json.load(f), args.threshold)
+    if regressions:
+      print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+      return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
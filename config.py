@@ -1,8 +1,34 @@
 import os
 
-class DevelopmentConfig():
+class BaseConfig():
   SQLALCHEMY_DATABASE_URI = os.environ.get("SQLALCHEMY_DATABASE_URI")
   SECRET_KEY = os.environ.get("SECRET_KEY")
   SQLALCHEMY_TRACK_MODIFICATIONS = False
-  CACHE_TYPE = "SimpleCache"
-  DEBUG = True
\ No newline at end of file
+  CACHE_TYPE = os.environ.get("CACHE_TYPE", "SimpleCache")
+  CACHE_DIR = os.environ.get("CACHE_DIR")
+  CACHE_DEFAULT_TIMEOUT = int(os.environ.get("CACHE_DEFAULT_TIMEOUT", 300))
+  DEBUG = False
+  DB_QUERY_STATS_ENABLED = os.environ.get("DB_QUERY_STATS_ENABLED", "false").lower() == "true"
+  SLOW_QUERY_LOG_ENABLED = os.environ.get("SLOW_QUERY_LOG_ENABLED", "false").lower() == "true"
+  SLOW_QUERY_THRESHOLD_MS = int(os.environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
+
+
+class DevelopmentConfig(BaseConfig):
+  DEBUG = True
+
+
+class ProductionConfig(BaseConfig):
+  # Swapped for the instrumented QueuePool in create_app, so this module
+  # does not import the app.
+  DB_POOL_INSTRUMENTED = True
+  # Cache versions must be seen by every worker, so create_app refuses a
+  # per-process backend such as SimpleCache.
+  CACHE_REQUIRE_SHARED = True
+  CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL")
+  SQLALCHEMY_ENGINE_OPTIONS = {
+    "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 20)),
+    "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),
+  }
@@ -1,10 +1,11 @@
+import os
 from dotenv import load_dotenv
 from sql import create_app
 from sql.models import db
 
 load_dotenv()
 
-app = create_app("DevelopmentConfig")
+app = create_app(os.environ.get("FLASK_CONFIG", "DevelopmentConfig"))
 
 with app.app_context():
   db.create_all()
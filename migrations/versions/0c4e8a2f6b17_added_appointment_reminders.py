@@ -0,0 +1,38 @@
+"""Added appointment reminders
+
+Revision ID: 0c4e8a2f6b17
+Revises: f5a1c7e9b3d6
+Create Date: 2026-10-18 19:12:08.664021
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c4e8a2f6b17'
+down_revision: Union[str, None] = 'f5a1c7e9b3d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('appointment_reminders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('appointment_id', sa.Integer(), nullable=False),
+    sa.Column('offset_minutes', sa.Integer(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['appointment_id'], ['appointments.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('appointment_id', 'offset_minutes', name='uq_appointment_reminders_offset')
+    )
+    op.create_index('ix_appointments_status_appointment_time', 'appointments', ['status', 'appointment_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_status_appointment_time', table_name='appointments')
+    op.drop_table('appointment_reminders')
@@ -0,0 +1,36 @@
+"""Added (patient_id, recorded_at) indexes to vitals tables
+
+Revision ID: 3f1a7c2d9e4b
+Revises: 6983e108c617
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a7c2d9e4b'
+down_revision: Union[str, None] = '6983e108c617'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_blood_pressures_patient_id_recorded_at', 'blood_pressures', ['patient_id', 'recorded_at'], unique=False)
+    op.create_index('ix_heart_rates_patient_id_recorded_at', 'heart_rates', ['patient_id', 'recorded_at'], unique=False)
+    op.create_index('ix_weights_patient_id_recorded_at', 'weights', ['patient_id', 'recorded_at'], unique=False)
+    op.create_index('ix_glucose_patient_id_recorded_at', 'glucose', ['patient_id', 'recorded_at'], unique=False)
+    op.create_index('ix_temperatures_patient_id_recorded_at', 'temperatures', ['patient_id', 'recorded_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_temperatures_patient_id_recorded_at', table_name='temperatures')
+    op.drop_index('ix_glucose_patient_id_recorded_at', table_name='glucose')
+    op.drop_index('ix_weights_patient_id_recorded_at', table_name='weights')
+    op.drop_index('ix_heart_rates_patient_id_recorded_at', table_name='heart_rates')
+    op.drop_index('ix_blood_pressures_patient_id_recorded_at', table_name='blood_pressures')
@@ -0,0 +1,30 @@
+"""Added listing indexes to users
+
+Revision ID: 8b2e5d1f6a90
+Revises: 3f1a7c2d9e4b
+Create Date: 2026-10-18 10:03:17.552981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e5d1f6a90'
+down_revision: Union[str, None] = '3f1a7c2d9e4b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_role_is_active_id', 'users', ['role', 'is_active', 'id'], unique=False)
+    op.create_index('ix_users_is_active_id', 'users', ['is_active', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_is_active_id', table_name='users')
+    op.drop_index('ix_users_role_is_active_id', table_name='users')
@@ -0,0 +1,48 @@
+"""Added vital rollup tables
+
+Revision ID: a4c93e7b1d25
+Revises: 8b2e5d1f6a90
+Create Date: 2026-10-18 11:26:05.304718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c93e7b1d25'
+down_revision: Union[str, None] = '8b2e5d1f6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('vital_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('vital_type', sa.String(length=30), nullable=False),
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('resolution', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('minimum', sa.Float(), nullable=False),
+    sa.Column('maximum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('patient_id', 'vital_type', 'resolution', 'bucket_start', 'metric', name='uq_vital_rollups_bucket')
+    )
+    op.create_table('vital_rollup_watermarks',
+    sa.Column('vital_type', sa.String(length=30), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('vital_type')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('vital_rollup_watermarks')
+    op.drop_table('vital_rollups')
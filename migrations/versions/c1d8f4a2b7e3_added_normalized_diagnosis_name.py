@@ -0,0 +1,68 @@
+"""Added normalized diagnosis name
+
+Revision ID: c1d8f4a2b7e3
+Revises: a4c93e7b1d25
+Create Date: 2026-10-18 13:41:52.907316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1d8f4a2b7e3'
+down_revision: Union[str, None] = 'a4c93e7b1d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+diagnosis = sa.table(
+    'diagnosis',
+    sa.column('id', sa.Integer),
+    sa.column('diagnosis_name', sa.String),
+    sa.column('diagnosis_name_normalized', sa.String),
+)
+
+
+def normalize_diagnosis_name(name):
+    # Frozen copy of sql.models.normalize_diagnosis_name as of this revision.
+    return " ".join(name.split()).lower()
+
+
+def backfill_normalized_names(bind, batch_size=BACKFILL_BATCH_SIZE):
+    # SQL has no portable way to collapse inner whitespace, so the names are
+    # normalized in Python, walking the table by id one batch at a time.
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(diagnosis.c.id, diagnosis.c.diagnosis_name)
+            .where(diagnosis.c.id > last_id)
+            .order_by(diagnosis.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        bind.execute(
+            diagnosis.update()
+            .where(diagnosis.c.id == sa.bindparam('row_id'))
+            .values(diagnosis_name_normalized=sa.bindparam('normalized')),
+            [{'row_id': row.id, 'normalized': normalize_diagnosis_name(row.diagnosis_name)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('diagnosis', sa.Column('diagnosis_name_normalized', sa.String(length=150), nullable=True))
+    backfill_normalized_names(op.get_bind())
+    op.alter_column('diagnosis', 'diagnosis_name_normalized', existing_type=sa.String(length=150), nullable=False)
+    op.create_index('ix_diagnosis_doctor_name_patient', 'diagnosis', ['doctor_id', 'diagnosis_name_normalized', 'patient_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_diagnosis_doctor_name_patient', table_name='diagnosis')
+    op.drop_column('diagnosis', 'diagnosis_name_normalized')
@@ -0,0 +1,30 @@
+"""Added fulltext index to diagnosis notes
+
+Revision ID: d7e2a9c5f1b8
+Revises: c1d8f4a2b7e3
+Create Date: 2026-10-18 14:20:33.615402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e2a9c5f1b8'
+down_revision: Union[str, None] = 'c1d8f4a2b7e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ix_diagnosis_notes_fulltext', 'diagnosis', ['notes'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_diagnosis_notes_fulltext', table_name='diagnosis')
@@ -0,0 +1,37 @@
+"""Added notification index and unread counter
+
+Revision ID: e3b6f0a8c4d2
+Revises: d7e2a9c5f1b8
+Create Date: 2026-10-18 15:42:17.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b6f0a8c4d2'
+down_revision: Union[str, None] = 'd7e2a9c5f1b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('unread_notifications', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_notifications_user_id_is_read_created_at', 'notifications', ['user_id', 'is_read', 'created_at'], unique=False)
+
+    # One-time backfill; afterwards the counter is maintained incrementally.
+    op.execute(
+        "UPDATE users SET unread_notifications = ("
+        "SELECT COUNT(*) FROM notifications "
+        "WHERE notifications.user_id = users.id AND notifications.is_read = false)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notifications_user_id_is_read_created_at', table_name='notifications')
+    op.drop_column('users', 'unread_notifications')
@@ -0,0 +1,32 @@
+"""Added appointment duration and indexes
+
+Revision ID: f5a1c7e9b3d6
+Revises: e3b6f0a8c4d2
+Create Date: 2026-10-18 17:05:41.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a1c7e9b3d6'
+down_revision: Union[str, None] = 'e3b6f0a8c4d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('appointments', sa.Column('duration_minutes', sa.Integer(), server_default='30', nullable=False))
+    op.create_index('ix_appointments_doctor_id_appointment_time', 'appointments', ['doctor_id', 'appointment_time'], unique=False)
+    op.create_index('ix_appointments_patient_id_appointment_time', 'appointments', ['patient_id', 'appointment_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_appointments_patient_id_appointment_time', table_name='appointments')
+    op.drop_index('ix_appointments_doctor_id_appointment_time', table_name='appointments')
+    op.drop_column('appointments', 'duration_minutes')
@@ -1,11 +1,18 @@
 from flask import Flask
 from sql.models import db
-from sql.extensions import ma, migrate
+from sql.extensions import ma, migrate, cache
+from sql.utils.cache import init_response_cache
+from sql.utils.db_pool import init_db_pool
+from sql.utils.query_stats import init_query_stats
 from sql.blueprints.user import user_bp
 from sql.blueprints.diagnosis import diagnoses_bp
 from sql.blueprints.medication import medication_bp
 from sql.blueprints.goal import goal_bp
-from sql.blueprints.vitals import blood_pressure_bp, heart_rate_bp, weight_bp, glucose_bp, temperature_bp
+from sql.blueprints.vitals import blood_pressure_bp, heart_rate_bp, weight_bp, glucose_bp, temperature_bp, vitals_bp
+from sql.blueprints.monitoring import monitoring_bp
+from sql.blueprints.dashboard import dashboard_bp
+from sql.blueprints.notifications import notifications_bp
+from sql.blueprints.appointment import appointment_bp
 from flask_swagger_ui import get_swaggerui_blueprint
 
 SWAGGER_URL = "/api/docs"
@@ -22,10 +29,14 @@ swaggerui_blueprint = get_swaggerui_blueprint(
 def create_app(config_name):
   app = Flask(__name__)
   app.config.from_object(f"config.{config_name}")
+  init_db_pool(app)
+  init_response_cache(app)
   
   db.init_app(app)
   ma.init_app(app)
   migrate.init_app(app, db)
+  cache.init_app(app)
+  init_query_stats(app)
   
   app.register_blueprint(user_bp, url_prefix="/users")
   app.register_blueprint(diagnoses_bp, url_prefix="/diagnoses")
@@ -36,6 +47,11 @@ def create_app(config_name):
   app.register_blueprint(weight_bp, url_prefix="/weight")
   app.register_blueprint(glucose_bp, url_prefix="/glucose")
   app.register_blueprint(temperature_bp, url_prefix="/temperature")
+  app.register_blueprint(vitals_bp, url_prefix="/vitals")
+  app.register_blueprint(monitoring_bp, url_prefix="/monitoring")
+  app.register_blueprint(dashboard_bp, url_prefix="/dashboard")
+  app.register_blueprint(notifications_bp, url_prefix="/notifications")
+  app.register_blueprint(appointment_bp, url_prefix="/appointments")
   app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
   
   return app
\ No newline at end of file
@@ -0,0 +1,5 @@
+from flask import Blueprint
+
+appointment_bp = Blueprint("appointment_bp", __name__, cli_group="appointments")
+
+from . import routes
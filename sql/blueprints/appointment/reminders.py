@@ -0,0 +1,271 @@
+import atexit
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sql.models import Appointment, AppointmentReminder, AppointmentStatus, User, db
+from sql.blueprints.appointment.scheduling import as_utc
+from sql.blueprints.notifications.fanout import notifications_committed, notify_each
+
+logger = logging.getLogger(__name__)
+
+# Reminders due this close together go out in one batch.
+COALESCE = timedelta(seconds=1)
+
+# The scheduler runs in one dedicated process, started with
+# `flask appointments send-reminders`, never inside web workers or other CLI
+# commands. Reminders live in a min-heap keyed by due time. The heap only
+# holds reminders due before loaded_until; every poll_interval seconds an
+# indexed range query on (status, appointment_time) reloads the window from
+# grace ago to a full horizon ahead, which also picks up appointments booked
+# by the web workers since the last poll. Cancellation is lazy: a reminder is
+# sent only if its appointment is still scheduled when it fires.
+#
+# Every sent reminder has a row in appointment_reminders, written in the same
+# transaction as its notification. A restart reloads everything not yet sent,
+# and the unique (appointment_id, offset_minutes) constraint keeps two
+# processes from sending the same reminder. Reminders that fell due while no
+# scheduler was running are still sent up to
+# APPOINTMENT_REMINDER_GRACE_MINUTES late, unless a later reminder for the
+# same appointment is already due.
+#
+# The notifications are written from this process, whose hub has no
+# subscribers; open streams on the web workers pick them up from the database
+# at their next heartbeat (NOTIFICATIONS_STREAM_HEARTBEAT).
+
+def reminder_message(doctor_name, starts):
+  return f"Reminder: appointment with {doctor_name} on {starts:%Y-%m-%d} at {starts:%H:%M} UTC"
+
+
+class ReminderScheduler():
+  def __init__(self, app, offsets=(1440, 60), horizon=3600, grace=30, batch_size=1000, retry_interval=30, poll_interval=60):
+    self.app = app
+    self.offsets = sorted(offsets, reverse=True)
+    self.horizon = timedelta(seconds=horizon)
+    self.poll_interval = timedelta(seconds=min(poll_interval, horizon / 2))
+    self.grace = timedelta(minutes=grace)
+    self.batch_size = batch_size
+    self.retry_interval = retry_interval
+    self.loaded_until = None
+    self._next_load = None
+    self.loads = 0
+    self.sent = 0
+    self.skipped = 0
+    self.batches = 0
+    self._heap = []
+    self._queued = set()
+    # Reminders already popped, by due time, so a reload does not queue them
+    # again; pruned once they fall out of the grace window.
+    self._handled = {}
+    self._closed = False
+    self._cond = threading.Condition()
+    self._thread = threading.Thread(target=self._run, name="appointment-reminders", daemon=True)
+
+  def start(self):
+    self._thread.start()
+    atexit.register(self.close)
+
+  def join(self, timeout=None):
+    self._thread.join(timeout)
+    return not self._thread.is_alive()
+
+  def close(self, timeout=30):
+    with self._cond:
+      if self._closed:
+        return
+      self._closed = True
+      self._cond.notify_all()
+    if self._thread.is_alive():
+      self._thread.join(timeout)
+
+  def stats(self):
+    with self._cond:
+      return {
+        "queued": len(self._queued),
+        "loaded_until": self.loaded_until.isoformat() if self.loaded_until else None,
+        "loads": self.loads,
+        "sent": self.sent,
+        "skipped": self.skipped,
+        "batches": self.batches
+      }
+
+  def _push(self, due, appointment_id, offset):
+    if (appointment_id, offset) not in self._queued and (appointment_id, offset) not in self._handled:
+      self._queued.add((appointment_id, offset))
+      heapq.heappush(self._heap, (due, appointment_id, offset))
+
+  def _pop_due(self, now):
+    batch = []
+    while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+      due, appointment_id, offset = heapq.heappop(self._heap)
+      # Entries discarded since they were pushed are dropped here.
+      if (appointment_id, offset) in self._queued:
+        self._queued.discard((appointment_id, offset))
+        self._handled[(appointment_id, offset)] = due
+        batch.append((due, appointment_id, offset))
+    return batch
+
+  def _run(self):
+    while True:
+      with self._cond:
+        if self._closed:
+          return
+        now = datetime.now(timezone.utc)
+        previous = self.loaded_until
+        refill = self._next_load is None or now >= self._next_load
+        if refill:
+          # Appointments booked while the query runs are picked up by the
+          # next poll, whose window overlaps this one.
+          self.loaded_until = now + self.horizon
+          self._next_load = now + self.poll_interval
+        else:
+          batch = self._pop_due(now + COALESCE)
+          if not batch:
+            wake = self._next_load
+            if self._heap:
+              wake = min(wake, self._heap[0][0] - COALESCE)
+            self._cond.wait(max((wake - now).total_seconds(), 0.01))
+            continue
+
+      try:
+        if refill:
+          self._load(self.loaded_until, now)
+        else:
+          self._send(batch)
+      except Exception:
+        logger.exception("Appointment reminder %s failed, retrying in %ss", "load" if refill else "batch", self.retry_interval)
+        with self._cond:
+          if refill:
+            self.loaded_until = previous
+            self._next_load = None
+          else:
+            for (due, appointment_id, offset) in batch:
+              self._handled.pop((appointment_id, offset), None)
+              self._push(due, appointment_id, offset)
+          self._cond.wait(self.retry_interval)
+
+  def _load(self, until, now):
+    entries = []
+    with self.app.app_context():
+      for offset in self.offsets:
+        delta = timedelta(minutes=offset)
+        lower = now - self.grace + delta
+        sent = exists().where(
+          AppointmentReminder.appointment_id == Appointment.id,
+          AppointmentReminder.offset_minutes == offset
+        )
+        rows = db.session.execute(
+          select(Appointment.id, Appointment.appointment_time).where(
+            Appointment.status == AppointmentStatus.SCHEDULED,
+            Appointment.appointment_time >= lower,
+            Appointment.appointment_time < until + delta,
+            ~sent
+          )
+        )
+        entries += [(as_utc(starts) - delta, appointment_id, offset) for appointment_id, starts in rows]
+      db.session.close()
+
+    with self._cond:
+      cutoff = now - self.grace
+      self._handled = {key: due for key, due in self._handled.items() if due >= cutoff}
+      for entry in entries:
+        self._push(*entry)
+      self.loads += 1
+      self._cond.notify_all()
+
+  def _stale(self, starts, offset, now):
+    due = starts - timedelta(minutes=offset)
+    if now - due > self.grace or now >= starts:
+      return True
+    return any(now >= starts - timedelta(minutes=later) for later in self.offsets if later < offset)
+
+  def _send(self, batch):
+    with self.app.app_context():
+      now = datetime.now(timezone.utc)
+      rows = db.session.execute(
+        select(Appointment.id, Appointment.patient_id, Appointment.appointment_time, User.name)
+        .join(User, User.id == Appointment.doctor_id)
+        .where(Appointment.id.in_({appointment_id for _, appointment_id, _ in batch}), Appointment.status == AppointmentStatus.SCHEDULED)
+      )
+      appointments = {row.id: row for row in rows}
+
+      reminders = []
+      for _, appointment_id, offset in batch:
+        row = appointments.get(appointment_id)
+        if row is not None and not self._stale(as_utc(row.appointment_time), offset, now):
+          reminders.append((row, offset))
+
+      try:
+        recipients, events = self._record(reminders, now)
+      except IntegrityError:
+        # Another process sent some of these first; send the rest.
+        db.session.rollback()
+        already = set(db.session.execute(
+          select(AppointmentReminder.appointment_id, AppointmentReminder.offset_minutes)
+          .where(AppointmentReminder.appointment_id.in_({row.id for row, _ in reminders}))
+        ).all())
+        reminders = [(row, offset) for row, offset in reminders if (row.id, offset) not in already]
+        recipients, events = self._record(reminders, now)
+      if recipients:
+        notifications_committed(recipients, events)
+
+    with self._cond:
+      self.sent += len(reminders)
+      self.skipped += len(batch) - len(reminders)
+      self.batches += 1
+
+  def _record(self, reminders, now):
+    if not reminders:
+      db.session.rollback()
+      return [], []
+    db.session.execute(insert(AppointmentReminder), [
+      {"appointment_id": row.id, "offset_minutes": offset, "sent_at": now}
+      for row, offset in reminders
+    ])
+    result = notify_each(
+      [(row.patient_id, reminder_message(row.name, as_utc(row.appointment_time))) for row, _ in reminders],
+      created_at=now
+    )
+    db.session.commit()
+    return result
+
+
+def create_reminder_scheduler(app):
+  return ReminderScheduler(
+    app,
+    offsets=app.config.get("APPOINTMENT_REMINDER_OFFSETS", (1440, 60)),
+    horizon=app.config.get("APPOINTMENT_REMINDER_HORIZON", 3600),
+    grace=app.config.get("APPOINTMENT_REMINDER_GRACE_MINUTES", 30),
+    batch_size=app.config.get("APPOINTMENT_REMINDER_BATCH_SIZE", 1000),
+    poll_interval=app.config.get("APPOINTMENT_REMINDER_POLL_SECONDS", 60)
+  )
+
+def reminder_backlog():
+  # What the web workers can report about a scheduler running elsewhere: when
+  # it last sent, and how many reminders are due but unsent. A growing
+  # overdue count means no scheduler process is running.
+  now = datetime.now(timezone.utc)
+  grace = timedelta(minutes=current_app.config.get("APPOINTMENT_REMINDER_GRACE_MINUTES", 30))
+  overdue = 0
+  for offset in current_app.config.get("APPOINTMENT_REMINDER_OFFSETS", (1440, 60)):
+    delta = timedelta(minutes=offset)
+    sent = exists().where(
+      AppointmentReminder.appointment_id == Appointment.id,
+      AppointmentReminder.offset_minutes == offset
+    )
+    overdue += db.session.scalar(
+      select(func.count()).select_from(Appointment).where(
+        Appointment.status == AppointmentStatus.SCHEDULED,
+        Appointment.appointment_time >= now - grace + delta,
+        Appointment.appointment_time < now - COALESCE + delta,
+        ~sent
+      )
+    )
+  last_sent_at = db.session.scalar(select(func.max(AppointmentReminder.sent_at)))
+  return {
+    "overdue": overdue,
+    "last_sent_at": as_utc(last_sent_at).isoformat() if last_sent_at else None
+  }
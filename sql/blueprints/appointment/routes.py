@@ -0,0 +1,218 @@
+import signal
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app, jsonify, request
+from marshmallow import ValidationError
+from sql.blueprints.appointment import appointment_bp
+from sql.blueprints.appointment.reminders import create_reminder_scheduler
+from sql.blueprints.appointment.scheduling import as_utc, bulk_set_status, find_conflicts, free_slots
+from sql.blueprints.appointment.schemas import appointment_schema, appointments_schema, bulk_status_schema, status_update_schema
+from sql.models import Appointment, AppointmentStatus, User, UserRole, db
+from sql.utils.auth import role_required, token_required
+from sql.utils.pagination import InvalidCursor, keyset_page, parse_datetime
+from sql.utils.serializers import dump_list, json_response, list_query
+
+def time_arg(name, default=None):
+  value = request.args.get(name)
+  if value is None:
+    return default
+  return as_utc(parse_datetime(value))
+
+
+@appointment_bp.route("/", methods=["POST"])
+@token_required
+def create_appointment(user_id):
+  json_data = request.get_json()
+  if not json_data:
+    return jsonify({"message": "No input data provided"}), 400
+
+  try:
+    data = appointment_schema.load(json_data)
+  except ValidationError as e:
+    return jsonify({"message": e.messages}), 400
+
+  caller = db.session.get(User, int(user_id))
+  if caller is None:
+    return jsonify({"message": "User not found"}), 404
+  if caller.role == UserRole.PATIENT:
+    data["patient_id"] = caller.id
+  elif caller.role == UserRole.DOCTOR and data["doctor_id"] != caller.id:
+    return jsonify({"message": "Doctors can only book their own appointments"}), 403
+  if "patient_id" not in data:
+    return jsonify({"message": {"patient_id": ["Missing data for required field."]}}), 400
+
+  doctor = db.session.get(User, data["doctor_id"])
+  if not doctor or doctor.role != UserRole.DOCTOR or not doctor.is_active:
+    return jsonify({"message": "Doctor not found"}), 404
+  patient = db.session.get(User, data["patient_id"])
+  if not patient or patient.role != UserRole.PATIENT:
+    return jsonify({"message": "Patient not found"}), 404
+
+  start = as_utc(data["appointment_time"])
+  if start <= datetime.now(timezone.utc):
+    return jsonify({"message": "Appointments must be in the future"}), 400
+  end = start + timedelta(minutes=data.get("duration_minutes", 30))
+
+  try:
+    conflicts = find_conflicts(doctor.id, patient.id, start, end)
+    if conflicts:
+      db.session.rollback()
+      return jsonify({"message": "Appointment overlaps an existing appointment", "conflicts": conflicts}), 409
+
+    appointment = Appointment(**{**data, "appointment_time": start})
+    db.session.add(appointment)
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"message": "Internal server error", "details": str(e)}), 500
+
+  return jsonify(appointment_schema.dump(appointment)), 201
+
+
+@appointment_bp.route("/", methods=["GET"])
+@token_required
+def list_appointments(user_id):
+  caller = db.session.get(User, int(user_id))
+  if caller is None:
+    return jsonify({"message": "User not found"}), 404
+  owner = Appointment.doctor_id if caller.role == UserRole.DOCTOR else Appointment.patient_id
+
+  max_limit = current_app.config.get("APPOINTMENTS_PAGE_MAX_SIZE", 100)
+  limit = request.args.get("limit", 50, type=int)
+  if limit < 1:
+    return jsonify({"message": "'limit' must be a positive integer"}), 400
+  limit = min(limit, max_limit)
+
+  query = list_query(appointments_schema).filter(owner == caller.id)
+  try:
+    status = request.args.get("status")
+    if status is not None:
+      query = query.filter(Appointment.status == AppointmentStatus(status.lower()))
+    since = time_arg("from")
+    if since is not None:
+      query = query.filter(Appointment.appointment_time >= since)
+    until = time_arg("to")
+    if until is not None:
+      query = query.filter(Appointment.appointment_time < until)
+  except ValueError as e:
+    return jsonify({"message": str(e)}), 400
+
+  try:
+    items, next_cursor = keyset_page(
+      query, (Appointment.appointment_time, Appointment.id), request.args.get("cursor"), limit, descending=False
+    )
+  except InvalidCursor as e:
+    return jsonify({"message": str(e)}), 400
+
+  return json_response({
+    "items": dump_list(appointments_schema, items),
+    "next_cursor": next_cursor
+  }), 200
+
+
+@appointment_bp.route("/doctors/<int:doctor_id>/availability", methods=["GET"])
+@token_required
+def get_availability(doctor_id):
+  doctor = db.session.get(User, doctor_id)
+  if not doctor or doctor.role != UserRole.DOCTOR or not doctor.is_active:
+    return jsonify({"message": "Doctor not found"}), 404
+
+  now = datetime.now(timezone.utc)
+  try:
+    start = max(time_arg("start", now), now)
+    end = time_arg("end", start + timedelta(days=7))
+  except ValueError as e:
+    return jsonify({"message": str(e)}), 400
+
+  max_days = current_app.config.get("APPOINTMENT_AVAILABILITY_MAX_DAYS", 31)
+  if end <= start:
+    return jsonify({"message": "'end' must be after 'start'"}), 400
+  if end - start > timedelta(days=max_days):
+    return jsonify({"message": f"Availability can span at most {max_days} days"}), 400
+
+  duration = request.args.get("duration", 30, type=int)
+  step = request.args.get("step", current_app.config.get("APPOINTMENT_SLOT_MINUTES", 15), type=int)
+  max_duration = current_app.config.get("APPOINTMENT_MAX_DURATION_MINUTES", 240)
+  if not 5 <= duration <= max_duration or step < 5:
+    return jsonify({"message": f"'duration' must be 5-{max_duration} minutes and 'step' at least 5"}), 400
+
+  slots = free_slots(doctor.id, start, end, timedelta(minutes=duration), timedelta(minutes=step))
+  return json_response({
+    "doctor_id": doctor.id,
+    "duration_minutes": duration,
+    "slots": [{"start": begins.isoformat(), "end": ends.isoformat()} for begins, ends in slots]
+  }), 200
+
+
+@appointment_bp.route("/<int:appointment_id>/status", methods=["PATCH"])
+@token_required
+def update_appointment_status(appointment_id, user_id):
+  try:
+    data = status_update_schema.load(request.get_json() or {})
+  except ValidationError as e:
+    return jsonify({"message": e.messages}), 400
+
+  caller_id = int(user_id)
+  appointment = db.session.get(Appointment, appointment_id)
+  if not appointment or caller_id not in (appointment.doctor_id, appointment.patient_id):
+    return jsonify({"message": "Appointment not found"}), 404
+  if caller_id == appointment.patient_id and data["status"] != AppointmentStatus.CANCELLED:
+    return jsonify({"message": "Patients can only cancel appointments"}), 403
+  if appointment.status != AppointmentStatus.SCHEDULED or data["status"] == AppointmentStatus.SCHEDULED:
+    return jsonify({"message": f"Cannot change a {appointment.status.value} appointment to {data['status'].value}"}), 409
+
+  try:
+    appointment.status = data["status"]
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"message": "Internal server error", "details": str(e)}), 500
+
+  return jsonify(appointment_schema.dump(appointment)), 200
+
+
+@appointment_bp.route("/status", methods=["POST"])
+@role_required(UserRole.DOCTOR)
+def bulk_update_status(user_id):
+  json_data = request.get_json()
+  if not json_data:
+    return jsonify({"message": "No input data provided"}), 400
+
+  try:
+    data = bulk_status_schema.load(json_data)
+  except ValidationError as e:
+    return jsonify({"message": e.messages}), 400
+
+  before = data.get("before")
+  if data["status"] == AppointmentStatus.NO_SHOW:
+    # Only appointments that have already started can be missed.
+    now = datetime.now(timezone.utc)
+    before = min(as_utc(before), now) if before is not None else now
+
+  try:
+    updated = bulk_set_status(int(user_id), data["status"], ids=data.get("ids"), day=data.get("date"), before=before)
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"message": "Internal server error", "details": str(e)}), 500
+
+  return jsonify({"updated": updated, "status": data["status"].value}), 200
+
+
+@appointment_bp.cli.command("send-reminders")
+def send_reminders_command():
+  # Run as exactly one long-lived process next to the web workers; the unique
+  # reminder rows keep a second one from double-sending, but it would only
+  # add load.
+  scheduler = create_reminder_scheduler(current_app._get_current_object())
+  signal.signal(signal.SIGTERM, lambda *_: scheduler.close())
+  scheduler.start()
+  click.echo("Sending appointment reminders, press Ctrl+C to stop")
+  try:
+    while not scheduler.join(1):
+      pass
+  except KeyboardInterrupt:
+    pass
+  finally:
+    scheduler.close()
+  click.echo(f"Stopped after sending {scheduler.stats()['sent']} reminders")
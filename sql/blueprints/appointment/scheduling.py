@@ -0,0 +1,135 @@
+from datetime import datetime, time, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, update
+from sql.models import Appointment, AppointmentStatus, User, db
+
+# All scheduling runs in UTC, including the working day
+# (APPOINTMENT_DAY_START to APPOINTMENT_DAY_END) and the day boundaries of
+# bulk transitions.
+
+def as_utc(value):
+  # SQLite hands DateTime(timezone=True) columns back naive.
+  if value.tzinfo is None:
+    return value.replace(tzinfo=timezone.utc)
+  return value.astimezone(timezone.utc)
+
+def max_duration():
+  return timedelta(minutes=current_app.config.get("APPOINTMENT_MAX_DURATION_MINUTES", 240))
+
+def busy_intervals(column, owner_id, start, end, exclude_id=None):
+  # Anything overlapping [start, end) begins before end and no earlier than
+  # start minus the longest allowed duration, so this is one bounded range
+  # scan on the (owner, appointment_time) index however long the history is.
+  query = (
+    select(Appointment.id, Appointment.appointment_time, Appointment.duration_minutes)
+    .where(
+      column == owner_id,
+      Appointment.appointment_time > start - max_duration(),
+      Appointment.appointment_time < end,
+      Appointment.status == AppointmentStatus.SCHEDULED
+    )
+    .order_by(Appointment.appointment_time)
+  )
+  if exclude_id is not None:
+    query = query.where(Appointment.id != exclude_id)
+
+  intervals = []
+  for appointment_id, begins, minutes in db.session.execute(query):
+    begins = as_utc(begins)
+    intervals.append((begins, begins + timedelta(minutes=minutes), appointment_id))
+  return intervals
+
+def find_conflicts(doctor_id, patient_id, start, end, exclude_id=None):
+  # Locking both users' rows, in id order, serializes bookings that could
+  # collide on databases with SELECT ... FOR UPDATE; SQLite already
+  # serializes writers.
+  db.session.execute(
+    select(User.id).where(User.id.in_((doctor_id, patient_id))).order_by(User.id).with_for_update()
+  )
+
+  conflicts = {}
+  for role, column, owner_id in (
+    ("doctor", Appointment.doctor_id, doctor_id),
+    ("patient", Appointment.patient_id, patient_id)
+  ):
+    overlapping = [
+      appointment_id for _, ends, appointment_id in busy_intervals(column, owner_id, start, end, exclude_id)
+      if ends > start
+    ]
+    if overlapping:
+      conflicts[role] = overlapping
+  return conflicts
+
+def working_windows(start, end):
+  day_start = time.fromisoformat(current_app.config.get("APPOINTMENT_DAY_START", "09:00"))
+  day_end = time.fromisoformat(current_app.config.get("APPOINTMENT_DAY_END", "17:00"))
+  working_days = current_app.config.get("APPOINTMENT_WORKING_DAYS", (0, 1, 2, 3, 4))
+
+  day = start.date()
+  while day <= end.date():
+    if day.weekday() in working_days:
+      origin = datetime.combine(day, day_start, tzinfo=timezone.utc)
+      opens = max(start, origin)
+      closes = min(end, datetime.combine(day, day_end, tzinfo=timezone.utc))
+      if opens < closes:
+        yield origin, opens, closes
+    day += timedelta(days=1)
+
+def merge_intervals(intervals):
+  merged = []
+  for begins, ends, _ in intervals:
+    if merged and begins <= merged[-1][1]:
+      merged[-1][1] = max(merged[-1][1], ends)
+    else:
+      merged.append([begins, ends])
+  return merged
+
+def free_slots(doctor_id, start, end, duration, step):
+  # One query for the whole range, then a sweep: busy time is merged into
+  # disjoint intervals and each working window is walked once, emitting
+  # grid-aligned starts that fit in the gaps between them.
+  busy = merge_intervals(busy_intervals(Appointment.doctor_id, doctor_id, start, end))
+  slots = []
+  first = 0
+
+  for origin, opens, closes in working_windows(start, end):
+    while first < len(busy) and busy[first][1] <= opens:
+      first += 1
+
+    free_from = opens
+    index = first
+    while free_from < closes:
+      if index < len(busy) and busy[index][0] < closes:
+        gap_end, next_free = min(busy[index][0], closes), busy[index][1]
+        index += 1
+      else:
+        gap_end, next_free = closes, closes
+
+      steps = -((origin - free_from) // step)
+      candidate = origin + steps * step
+      while candidate + duration <= gap_end:
+        slots.append((candidate, candidate + duration))
+        candidate += step
+      free_from = max(free_from, next_free)
+  return slots
+
+def bulk_set_status(doctor_id, status, ids=None, day=None, before=None):
+  # One UPDATE guarded on SCHEDULED: appointments already completed or
+  # cancelled are left alone and not counted.
+  query = (
+    update(Appointment)
+    .where(Appointment.doctor_id == doctor_id, Appointment.status == AppointmentStatus.SCHEDULED)
+    .values(status=status)
+    .execution_options(synchronize_session=False)
+  )
+  if ids is not None:
+    query = query.where(Appointment.id.in_(ids))
+  else:
+    day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    query = query.where(
+      Appointment.appointment_time >= day_start,
+      Appointment.appointment_time < day_start + timedelta(days=1)
+    )
+  if before is not None:
+    query = query.where(Appointment.appointment_time < as_utc(before))
+  return db.session.execute(query).rowcount
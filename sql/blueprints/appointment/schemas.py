@@ -0,0 +1,48 @@
+from flask import current_app
+from marshmallow import ValidationError, fields, validate, validates, validates_schema
+from marshmallow_sqlalchemy import auto_field
+from sql.extensions import ma
+from sql.models import Appointment, AppointmentStatus
+from sql.blueprints.user.schemas import LowercaseEnumField
+
+class AppointmentSchema(ma.SQLAlchemySchema):
+  class Meta:
+    model = Appointment
+    include_fk = True
+  
+  id = auto_field(dump_only=True)
+  doctor_id = auto_field(required=True)
+  patient_id = auto_field(required=False)
+  appointment_time = auto_field(required=True)
+  duration_minutes = auto_field()
+  status = LowercaseEnumField(AppointmentStatus, dump_only=True)
+  reason = auto_field(required=True, validate=validate.Length(min=1, max=250))
+  notes = auto_field(required=False, load_default="", validate=validate.Length(max=1000))
+  
+  @validates("duration_minutes")
+  def validate_duration(self, value, **kwargs):
+    # Conflict checks only look back this far, so nothing longer may be booked.
+    maximum = current_app.config.get("APPOINTMENT_MAX_DURATION_MINUTES", 240)
+    if not 5 <= value <= maximum:
+      raise ValidationError(f"Must be between 5 and {maximum} minutes.")
+
+class StatusUpdateSchema(ma.Schema):
+  status = LowercaseEnumField(AppointmentStatus, required=True)
+
+class BulkStatusSchema(ma.Schema):
+  status = LowercaseEnumField(AppointmentStatus, required=True)
+  ids = fields.List(fields.Integer(), validate=validate.Length(min=1, max=10000))
+  date = fields.Date()
+  before = fields.DateTime()
+  
+  @validates_schema
+  def validate_target(self, data, **kwargs):
+    if ("ids" in data) == ("date" in data):
+      raise ValidationError({"_schema": ["Provide exactly one of 'ids' or 'date'"]})
+    if data["status"] == AppointmentStatus.SCHEDULED:
+      raise ValidationError({"status": ["Appointments can only move out of 'scheduled'"]})
+
+appointment_schema = AppointmentSchema()
+appointments_schema = AppointmentSchema(many=True)
+status_update_schema = StatusUpdateSchema()
+bulk_status_schema = BulkStatusSchema()
@@ -0,0 +1,95 @@
+from flask import current_app, jsonify
+from sqlalchemy import Float, cast, literal, null, select, union_all
+from sqlalchemy.orm import joinedload
+from sql.blueprints.dashboard import dashboard_bp
+from sql.blueprints.diagnosis.schemas import diagnoses_schema
+from sql.blueprints.goal.schemas import goals_schema
+from sql.blueprints.medication.schemas import medications_schema
+from sql.blueprints.user.schemas import return_user_schema
+from sql.blueprints.vitals.rollups import VITAL_METRICS
+from sql.models import Diagnosis, Goal, Medication, User, UserRole, db
+from sql.utils.auth import role_required, token_required
+
+def latest_vitals(patient_id):
+  # One LIMIT 1 branch per vitals table, each an index seek on
+  # (patient_id, recorded_at), combined into a single round trip.
+  branches = []
+  for model, (vital_type, metrics) in VITAL_METRICS.items():
+    secondary = getattr(model, metrics[1]) if len(metrics) > 1 else null()
+    branch = (
+      select(
+        literal(vital_type).label("vital_type"),
+        model.id.label("id"),
+        model.recorded_at.label("recorded_at"),
+        cast(getattr(model, metrics[0]), Float).label("primary_value"),
+        cast(secondary, Float).label("secondary_value")
+      )
+      .where(model.patient_id == patient_id)
+      .order_by(model.recorded_at.desc(), model.id.desc())
+      .limit(1)
+      .subquery()
+    )
+    branches.append(select(branch))
+
+  latest = {vital_type: None for vital_type, _ in VITAL_METRICS.values()}
+  models = {vital_type: (model, metrics) for model, (vital_type, metrics) in VITAL_METRICS.items()}
+  for row in db.session.execute(union_all(*branches)):
+    model, metrics = models[row.vital_type]
+    entry = {"id": row.id, "recorded_at": row.recorded_at.isoformat()}
+    for metric, value in zip(metrics, (row.primary_value, row.secondary_value)):
+      entry[metric] = getattr(model, metric).type.python_type(value)
+    latest[row.vital_type] = entry
+  return latest
+
+def build_dashboard(patient):
+  recent_limit = current_app.config.get("DASHBOARD_RECENT_DIAGNOSES", 5)
+
+  medications = (
+    Medication.query
+    .options(joinedload(Medication.prescriber))
+    .filter(Medication.patient_id == patient.id, Medication.active.is_(True))
+    .order_by(Medication.id)
+    .all()
+  )
+  goals = (
+    Goal.query
+    .filter(Goal.patient_id == patient.id, Goal.is_complete.is_(False))
+    .order_by(Goal.target_date, Goal.id)
+    .all()
+  )
+  diagnoses = (
+    Diagnosis.query
+    .options(joinedload(Diagnosis.doctor))
+    .filter(Diagnosis.patient_id == patient.id)
+    .order_by(Diagnosis.diagnosis_date.desc(), Diagnosis.id.desc())
+    .limit(recent_limit)
+    .all()
+  )
+
+  return {
+    "patient": return_user_schema.dump(patient),
+    "latest_vitals": latest_vitals(patient.id),
+    "active_medications": medications_schema.dump(medications),
+    "open_goals": goals_schema.dump(goals),
+    "recent_diagnoses": diagnoses_schema.dump(diagnoses)
+  }
+
+
+@dashboard_bp.route("/<int:patient_id>", methods=["GET"])
+@role_required(UserRole.DOCTOR)
+def get_patient_dashboard(patient_id, user_id):
+  patient = db.session.get(User, patient_id)
+  if not patient or patient.role != UserRole.PATIENT:
+    return jsonify({"message": "Patient not found"}), 404
+  
+  return jsonify(build_dashboard(patient)), 200
+
+
+@dashboard_bp.route("/me", methods=["GET"])
+@token_required
+def get_my_dashboard(user_id):
+  patient = db.session.get(User, int(user_id))
+  if not patient or patient.role != UserRole.PATIENT:
+    return jsonify({"message": "Patient not found"}), 404
+  
+  return jsonify(build_dashboard(patient)), 200
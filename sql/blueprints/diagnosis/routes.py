@@ -1,11 +1,17 @@
-from flask import jsonify, request
+import logging
+from flask import current_app, jsonify, request
 from marshmallow import ValidationError
-from sqlalchemy import func
+from sqlalchemy import select
 from sql.blueprints.diagnosis import diagnoses_bp
-from sql.models import UserRole, db, Diagnosis, User
-from sql.blueprints.diagnosis.schemas import diagnosis_schema
+from sql.models import UserRole, db, Diagnosis, User, normalize_diagnosis_name
+from sql.blueprints.diagnosis.schemas import diagnosis_schema, diagnoses_schema
+from sql.blueprints.diagnosis.search import get_diagnosis_index, search_notes
 from sql.blueprints.user.schemas import return_users_schema
 from sql.utils.auth import role_required
+from sql.utils.cache import invalidate_patient
+from sql.utils.pagination import InvalidCursor, keyset_page, parse_count
+
+logger = logging.getLogger(__name__)
 
 @diagnoses_bp.route("/<int:patient_id>", methods=["POST"])
 @role_required(UserRole.DOCTOR)
@@ -46,21 +52,67 @@ def create_diagnosis(patient_id, user_id):
   
   db.session.add(diagnosis)
   db.session.commit()
+  invalidate_patient(patient_id, "diagnoses")
+  
+  # The diagnosis is committed; a failure to index it must not turn that into
+  # a 500. The next refresh picks it up.
+  try:
+    index = get_diagnosis_index()
+    if index.ready.is_set():
+      index.catch_up(force=True)
+  except Exception:
+    db.session.rollback()
+    logger.exception("Failed to add diagnosis %s to the search index", diagnosis.id)
   
   return jsonify(diagnosis_schema.dump(diagnosis)), 201
 
 @diagnoses_bp.route("/patients/<diagnosis_name>", methods=["GET"])
 @role_required(UserRole.DOCTOR)
 def get_patients_with_diagnosis(diagnosis_name, user_id):
-  diagnoses = Diagnosis.query.filter(func.lower(Diagnosis.diagnosis_name) == diagnosis_name.lower(), Diagnosis.doctor_id == user_id).all()
+  max_limit = current_app.config.get("DIAGNOSIS_PATIENTS_PAGE_MAX_SIZE", 200)
+  limit = parse_count(request.args.get("limit"), 50)
+  if limit is None or limit < 1:
+    return jsonify({"message": "'limit' must be a positive integer"}), 400
+  limit = min(limit, max_limit)
+  
+  cohort = select(Diagnosis.patient_id).where(
+    Diagnosis.doctor_id == user_id,
+    Diagnosis.diagnosis_name_normalized == normalize_diagnosis_name(diagnosis_name)
+  )
+  query = db.session.query(User).filter(User.id.in_(cohort), User.is_active.is_(True))
+  
+  try:
+    cursor = request.args.get("cursor")
+    patients, next_cursor = keyset_page(query, (User.id,), cursor, limit, descending=False)
+  except InvalidCursor as e:
+    return jsonify({"message": str(e)}), 400
   
-  if not diagnoses:
+  if not patients and not cursor:
     return jsonify({"message": "No patients found with this diagnosis"}), 404
   
-  patients = [diagnosis.patient for diagnosis in diagnoses if diagnosis.patient and diagnosis.patient.is_active]
-  unique_patients = list({p.id: p for p in patients}.values())
+  return jsonify({
+    "items": return_users_schema.dump(patients),
+    "next_cursor": next_cursor
+  }), 200
+
+
+@diagnoses_bp.route("/autocomplete", methods=["GET"])
+@role_required(UserRole.DOCTOR)
+def autocomplete_diagnoses(user_id):
+  prefix = request.args.get("q", "").strip()
+  if not prefix:
+    return jsonify({"message": "Query parameter 'q' is required"}), 400
   
-  if not unique_patients:
-    return jsonify({"message": "No patients found"}), 404
+  limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+  return jsonify(get_diagnosis_index().autocomplete(prefix, int(user_id), limit)), 200
+
+
+@diagnoses_bp.route("/search", methods=["GET"])
+@role_required(UserRole.DOCTOR)
+def search_diagnosis_notes(user_id):
+  query = request.args.get("q", "").strip()
+  if not query:
+    return jsonify({"message": "Query parameter 'q' is required"}), 400
   
-  return jsonify(return_users_schema.dump(unique_patients)), 200
\ No newline at end of file
+  limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+  return jsonify(diagnoses_schema.dump(search_notes(query, int(user_id), limit))), 200
\ No newline at end of file
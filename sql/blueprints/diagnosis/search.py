@@ -0,0 +1,236 @@
+import bisect
+import logging
+import re
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+from sql.models import Diagnosis, db, normalize_diagnosis_name
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+  return set(TOKEN_PATTERN.findall(text.lower()))
+
+def uses_database_fulltext():
+  return db.session.get_bind().dialect.name == "mysql"
+
+
+class PrefixIndex():
+  def __init__(self):
+    self._keys = []
+    self._entries = {}
+
+  def add_many(self, pairs):
+    new_keys = []
+    for key, display in pairs:
+      entry = self._entries.get(key)
+      if entry is None:
+        self._entries[key] = [display, 1]
+        new_keys.append(key)
+      else:
+        entry[1] += 1
+
+    if len(new_keys) > 16:
+      self._keys = sorted(self._keys + new_keys)
+    else:
+      for key in new_keys:
+        bisect.insort(self._keys, key)
+
+  def search(self, prefix, limit):
+    results = []
+    position = bisect.bisect_left(self._keys, prefix)
+    while position < len(self._keys) and len(results) < limit:
+      key = self._keys[position]
+      if not key.startswith(prefix):
+        break
+      display, count = self._entries[key]
+      results.append({"value": display, "count": count})
+      position += 1
+    return results
+
+  def __len__(self):
+    return len(self._keys)
+
+
+class DiagnosisSearchIndex():
+  def __init__(self, refresh_seconds=5, index_notes=False, chunk_size=50000, overlap=1000):
+    # Everything is kept per doctor, so a lookup only ever sees the caller's
+    # own diagnoses and never has to filter someone else's out.
+    self.names = {}
+    self.codes = {}
+    self.notes = {} if index_notes else None
+    self.last_id = 0
+    self.refresh_seconds = refresh_seconds
+    self.chunk_size = chunk_size
+    self.overlap = overlap
+    self._recent_ids = set()
+    self._refreshed_at = None
+    self._lock = threading.Lock()
+    # Set once the first full scan is done. Until then lookups are answered
+    # by indexed queries, so no request waits for the build.
+    self.ready = threading.Event()
+    self._building = False
+    self._build_lock = threading.Lock()
+
+  def start_build(self, app):
+    # Not self._lock, which the build holds for the whole scan.
+    with self._build_lock:
+      if self.ready.is_set() or self._building:
+        return
+      self._building = True
+    threading.Thread(target=self._build, args=(app,), name="diagnosis-index", daemon=True).start()
+
+  def _build(self, app):
+    started = time.perf_counter()
+    with app.app_context():
+      try:
+        self.catch_up(force=True)
+        self.ready.set()
+        logger.info("Diagnosis index built in %.1fs", time.perf_counter() - started)
+      except Exception:
+        logger.exception("Diagnosis index build failed; lookups stay on the database until it is retried")
+      finally:
+        db.session.remove()
+        self._building = False
+
+  def catch_up(self, force=False):
+    # Other workers insert diagnoses too, so new rows are picked up by id
+    # rather than trusting only this process's own inserts. Ids are handed
+    # out before commit, so a row can become visible after a higher id has
+    # been read; the last `overlap` ids are rescanned to catch it.
+    if not force and self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+      return
+
+    columns = [Diagnosis.id, Diagnosis.doctor_id, Diagnosis.diagnosis_name, Diagnosis.diagnosis_code]
+    if self.notes is not None:
+      columns.append(Diagnosis.notes)
+
+    with self._lock:
+      after = max(self.last_id - self.overlap, 0)
+      while True:
+        rows = db.session.execute(
+          select(*columns).where(Diagnosis.id > after).order_by(Diagnosis.id).limit(self.chunk_size)
+        ).all()
+        if not rows:
+          break
+        self._add_rows([row for row in rows if row.id not in self._recent_ids])
+        after = rows[-1].id
+        self.last_id = max(self.last_id, after)
+        self._recent_ids.update(row.id for row in rows if row.id > self.last_id - self.overlap)
+      self._recent_ids = {i for i in self._recent_ids if i > self.last_id - self.overlap}
+      self._refreshed_at = time.monotonic()
+
+  def _add_rows(self, rows):
+    by_doctor = {}
+    for row in rows:
+      by_doctor.setdefault(row.doctor_id, []).append(row)
+
+    for doctor_id, doctor_rows in by_doctor.items():
+      self.names.setdefault(doctor_id, PrefixIndex()).add_many(
+        (normalize_diagnosis_name(row.diagnosis_name), row.diagnosis_name) for row in doctor_rows
+      )
+      self.codes.setdefault(doctor_id, PrefixIndex()).add_many(
+        (row.diagnosis_code.lower(), row.diagnosis_code) for row in doctor_rows if row.diagnosis_code
+      )
+
+      if self.notes is not None:
+        postings = self.notes.setdefault(doctor_id, {})
+        for row in doctor_rows:
+          for token in tokenize(row.notes):
+            postings.setdefault(token, set()).add(row.id)
+
+  def autocomplete(self, prefix, doctor_id, limit=10):
+    prefix = normalize_diagnosis_name(prefix)
+    if not self.ready.is_set():
+      return {
+        "names": _prefix_counts(Diagnosis.diagnosis_name_normalized, Diagnosis.diagnosis_name, prefix, doctor_id, limit),
+        "codes": _prefix_counts(func.lower(Diagnosis.diagnosis_code), Diagnosis.diagnosis_code, prefix, doctor_id, limit)
+      }
+    self.catch_up()
+    names = self.names.get(doctor_id)
+    codes = self.codes.get(doctor_id)
+    return {
+      "names": names.search(prefix, limit) if names else [],
+      "codes": codes.search(prefix, limit) if codes else []
+    }
+
+  def matching_note_ids(self, query, doctor_id):
+    tokens = tokenize(query)
+    if not self.ready.is_set():
+      return _matching_note_ids(tokens, doctor_id)
+    self.catch_up()
+    doctor_postings = self.notes.get(doctor_id)
+    if not tokens or not doctor_postings:
+      return []
+
+    postings = sorted((doctor_postings.get(token, set()) for token in tokens), key=len)
+    return sorted(postings[0].intersection(*postings[1:]), reverse=True)
+
+
+def _prefix_counts(key, display, prefix, doctor_id, limit):
+  rows = db.session.execute(
+    select(key, func.min(display), func.count())
+    .where(Diagnosis.doctor_id == doctor_id, key.startswith(prefix, autoescape=True))
+    .group_by(key)
+    .order_by(key)
+    .limit(limit)
+  )
+  return [{"value": value, "count": count} for _, value, count in rows]
+
+def _matching_note_ids(tokens, doctor_id):
+  if not tokens:
+    return []
+  # LIKE narrows to rows containing every token; tokenizing their notes
+  # keeps the index's whole-word semantics.
+  rows = db.session.execute(
+    select(Diagnosis.id, Diagnosis.notes)
+    .where(Diagnosis.doctor_id == doctor_id, *(Diagnosis.notes.icontains(token) for token in tokens))
+    .order_by(Diagnosis.id.desc())
+  )
+  return [row.id for row in rows if tokens <= tokenize(row.notes)]
+
+def get_diagnosis_index():
+  index = current_app.extensions.get("diagnosis_index")
+  if index is None:
+    index = current_app.extensions.setdefault("diagnosis_index", DiagnosisSearchIndex(
+      refresh_seconds=current_app.config.get("DIAGNOSIS_INDEX_REFRESH_SECONDS", 5),
+      index_notes=not uses_database_fulltext()
+    ))
+  # The first full scan runs in the background; a failed one is retried by
+  # the next lookup.
+  if not index.ready.is_set():
+    index.start_build(current_app._get_current_object())
+  return index
+
+def search_notes(query, doctor_id, limit=20):
+  options = (selectinload(Diagnosis.patient), selectinload(Diagnosis.doctor))
+  if uses_database_fulltext():
+    return (
+      Diagnosis.query
+      .options(*options)
+      .filter(Diagnosis.doctor_id == doctor_id, Diagnosis.notes.match(query))
+      .order_by(Diagnosis.id.desc())
+      .limit(limit)
+      .all()
+    )
+
+  # Candidates are already the caller's own, so the first `limit` ids are the
+  # answer unless some were deleted since they were indexed.
+  candidate_ids = get_diagnosis_index().matching_note_ids(query, doctor_id)
+  results = []
+  position = 0
+  while position < len(candidate_ids) and len(results) < limit:
+    chunk = candidate_ids[position:position + limit - len(results)]
+    position += len(chunk)
+    results += (
+      Diagnosis.query
+      .options(*options)
+      .filter(Diagnosis.id.in_(chunk), Diagnosis.doctor_id == doctor_id)
+      .order_by(Diagnosis.id.desc())
+      .all()
+    )
+  return results
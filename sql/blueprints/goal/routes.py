@@ -5,6 +5,8 @@ from sql.blueprints.goal import goal_bp
 from sql.models import db, Goal, UserRole, User
 from sql.blueprints.goal.schemas import goal_schema, goals_schema
 from sql.utils.auth import role_required
+from sql.utils.cache import cached_patient_resource, invalidate_patient
+from sql.utils.serializers import dump_list, json_response, list_query
 
 @goal_bp.route("/<int:patient_id>", methods=["POST"])
 @role_required(UserRole.DOCTOR)
@@ -36,6 +38,7 @@ def create_goal(patient_id, user_id):
     
     db.session.add(new_goal)
     db.session.commit()
+    invalidate_patient(patient_id, "goals")
     
     return goal_schema.jsonify(new_goal), 201
   
@@ -46,17 +49,18 @@ def create_goal(patient_id, user_id):
 
 @goal_bp.route("/<int:patient_id>", methods=["GET"])
 @role_required(UserRole.DOCTOR)
+@cached_patient_resource("goals")
 def get_all_goals(patient_id, user_id):
   patient = db.session.get(User, patient_id)
   if not patient:
     return jsonify({"message": "Patient not found"}), 404
   
-  goals = Goal.query.filter_by(patient_id=patient_id).all()
+  goals = list_query(goals_schema).filter(Goal.patient_id == patient_id).order_by(Goal.id).all()
   
   if not goals:
     return jsonify({"message": "No goals found for this user"}), 404
   
-  return jsonify(goals_schema.dump(goals)), 200
+  return json_response(dump_list(goals_schema, goals)), 200
 
 
 # Create logic to automate changing is_complete to true when goal is completed
\ No newline at end of file
@@ -4,6 +4,8 @@ from sql.models import Medication, User, UserRole, db
 from sql.blueprints.medication import medication_bp
 from sql.blueprints.medication.schemas import medication_schema, medications_schema
 from sql.utils.auth import role_required
+from sql.utils.cache import USERS_SCOPE, cached_patient_resource, invalidate_patient
+from sql.utils.serializers import dump_list, json_response, list_query
 
 @medication_bp.route("/<int:patient_id>", methods=["POST"])
 @role_required(UserRole.DOCTOR)
@@ -22,6 +24,7 @@ def create_medication(patient_id, user_id):
     new_medication.patient_id = patient_id
     db.session.add(new_medication)
     db.session.commit()
+    invalidate_patient(patient_id, "medications")
     return jsonify(medication_schema.dump(new_medication)), 201
   
   except ValidationError as e:
@@ -36,18 +39,19 @@ def create_medication(patient_id, user_id):
 
 @medication_bp.route("/patients/<int:patient_id>", methods=["GET"])
 @role_required(UserRole.DOCTOR)
+@cached_patient_resource("medications", depends_on=(USERS_SCOPE,))
 def get_meds_for_user(patient_id, user_id):
   try:
     patient = User.query.get(patient_id)
     if not patient or patient.role != UserRole.PATIENT:
       return jsonify({"message": "Patient not found"}), 404
     
-    medications = Medication.query.filter_by(patient_id=patient_id).all()
+    medications = list_query(medications_schema).filter(Medication.patient_id == patient_id).order_by(Medication.id).all()
     
     if not medications:
       return jsonify({"message": "No medications found for this patient"}), 200
     
-    return jsonify(medications_schema.dump(medications)), 200
+    return json_response(dump_list(medications_schema, medications)), 200
   
   except Exception as e:
     return jsonify({
@@ -79,6 +83,7 @@ def deactivate_medication(patient_id, medication_id, user_id):
     medication.active = False
     medication.deactivation_reason = reason
     db.session.commit()
+    invalidate_patient(patient_id, "medications")
     return jsonify({
       "message": "Mediaction successfully deactivated"
       }), 200
@@ -0,0 +1,52 @@
+from flask import jsonify
+from sql.blueprints.monitoring import monitoring_bp
+from sql.blueprints.appointment.reminders import reminder_backlog
+from sql.blueprints.notifications.hub import get_notification_hub
+from sql.blueprints.vitals.anomalies import anomaly_detection_enabled, get_anomaly_detector
+from sql.blueprints.vitals.writer import get_vitals_writer, write_behind_enabled
+from sql.models import UserRole, db
+from sql.utils.auth import get_token_cache, role_required
+from sql.utils.cache import get_cache_stats
+from sql.utils.db_pool import pool_stats
+
+@monitoring_bp.route("/db-pool", methods=["GET"])
+@role_required(UserRole.ADMIN)
+def get_db_pool_stats(user_id):
+  return jsonify(pool_stats(db.engine)), 200
+
+
+@monitoring_bp.route("/cache", methods=["GET"])
+@role_required(UserRole.ADMIN)
+def get_cache_stats_route(user_id):
+  return jsonify({
+    "responses": get_cache_stats().as_dict(),
+    "tokens": get_token_cache().stats()
+  }), 200
+
+
+@monitoring_bp.route("/vitals-writer", methods=["GET"])
+@role_required(UserRole.ADMIN)
+def get_vitals_writer_stats(user_id):
+  if not write_behind_enabled():
+    return jsonify({"enabled": False}), 200
+  return jsonify({"enabled": True, **get_vitals_writer().stats()}), 200
+
+
+@monitoring_bp.route("/notification-streams", methods=["GET"])
+@role_required(UserRole.ADMIN)
+def get_notification_stream_stats(user_id):
+  return jsonify(get_notification_hub().stats()), 200
+
+
+@monitoring_bp.route("/appointment-reminders", methods=["GET"])
+@role_required(UserRole.ADMIN)
+def get_reminder_stats(user_id):
+  return jsonify(reminder_backlog()), 200
+
+
+@monitoring_bp.route("/anomaly-detector", methods=["GET"])
+@role_required(UserRole.ADMIN)
+def get_anomaly_detector_stats(user_id):
+  if not anomaly_detection_enabled():
+    return jsonify({"enabled": False}), 200
+  return jsonify({"enabled": True, **get_anomaly_detector().stats()}), 200
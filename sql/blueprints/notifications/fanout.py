@@ -0,0 +1,79 @@
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import func, insert, select, update
+from sql.models import Notifications, User, db
+from sql.blueprints.notifications.hub import get_notification_hub
+from sql.blueprints.notifications.schemas import notification_schema
+from sql.utils.cache import invalidate, patient_scope
+
+def notify_users(user_ids, message, created_at=None, chunk_size=1000):
+  # Writes only; the caller commits, then passes the result to
+  # notifications_committed() so badge counts and streams never run ahead of
+  # the database.
+  user_ids = sorted(set(user_ids))
+  _, events = notify_each([(user_id, message) for user_id in user_ids], created_at, chunk_size)
+  return user_ids, events
+
+def notify_each(messages, created_at=None, chunk_size=1000):
+  # Like notify_users, for (user_id, message) pairs; a user may appear more
+  # than once.
+  created_at = created_at or datetime.now(timezone.utc)
+  hub = get_notification_hub()
+  events = []
+
+  for start in range(0, len(messages), chunk_size):
+    chunk = messages[start:start + chunk_size]
+    counts = Counter(user_id for user_id, _ in chunk)
+    live = hub.subscribed(counts)
+    if live:
+      watermark = db.session.scalar(select(func.max(Notifications.id))) or 0
+    db.session.execute(insert(Notifications), [
+      {"user_id": user_id, "message": message, "is_read": False, "created_at": created_at}
+      for user_id, message in chunk
+    ])
+    by_increment = defaultdict(list)
+    for user_id, count in counts.items():
+      by_increment[count].append(user_id)
+    for increment, user_ids in by_increment.items():
+      db.session.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(unread_notifications=User.unread_notifications + increment)
+        .execution_options(synchronize_session=False)
+      )
+    # Ids are only read back for recipients with an open stream, so fan-out
+    # costs nothing extra when nobody is listening.
+    if live:
+      created = Notifications.query.filter(Notifications.user_id.in_(live), Notifications.id > watermark).order_by(Notifications.id)
+      events += [(notification.user_id, notification_schema.dump(notification)) for notification in created]
+  return sorted({user_id for user_id, _ in messages}), events
+
+def mark_read(user_id, notification_ids=None):
+  query = (
+    update(Notifications)
+    .where(Notifications.user_id == user_id, Notifications.is_read.is_(False))
+    .values(is_read=True)
+    .execution_options(synchronize_session=False)
+  )
+  if notification_ids is not None:
+    query = query.where(Notifications.id.in_(notification_ids))
+
+  # Only rows this statement flipped are counted, so concurrent mark-reads
+  # of the same notifications cannot decrement the counter twice.
+  changed = db.session.execute(query).rowcount
+  if changed:
+    db.session.execute(
+      update(User)
+      .where(User.id == user_id)
+      .values(unread_notifications=User.unread_notifications - changed)
+      .execution_options(synchronize_session=False)
+    )
+  return changed
+
+def unread_count(user_id):
+  return db.session.execute(db.select(User.unread_notifications).where(User.id == user_id)).scalar()
+
+def notifications_committed(user_ids, events=()):
+  invalidate(*(patient_scope(user_id, "notifications") for user_id in user_ids))
+  if events:
+    get_notification_hub().publish(events)
@@ -0,0 +1,109 @@
+import threading
+from collections import deque
+from flask import current_app
+
+# The hub is per process: it only pushes notifications committed by the same
+# process. Everything else, from other web workers or the reminder scheduler
+# process, reaches a stream when it resyncs from the database: on reconnect
+# (Last-Event-ID), after its queue overflows, and on every idle heartbeat. A
+# notification the hub cannot push is delayed by up to one heartbeat.
+
+class Subscription():
+  def __init__(self, user_id, max_queue):
+    self.user_id = user_id
+    self.max_queue = max_queue
+    self._events = deque()
+    self._overflowed = False
+    self._ready = threading.Event()
+    self._lock = threading.Lock()
+
+  def push(self, event):
+    # True when queued, False when this push overflowed the queue, None while
+    # the stream is already due a resync and the event will be read back then.
+    with self._lock:
+      if self._overflowed:
+        return None
+      # A slow consumer loses its queued events, not the publisher's time; the
+      # stream refetches everything after the last id it sent.
+      if len(self._events) >= self.max_queue:
+        self._events.clear()
+        self._overflowed = True
+        self._ready.set()
+        return False
+      self._events.append(event)
+      self._ready.set()
+      return True
+
+  def wait(self, timeout):
+    self._ready.wait(timeout)
+    with self._lock:
+      events = list(self._events)
+      overflowed = self._overflowed
+      self._events.clear()
+      self._overflowed = False
+      self._ready.clear()
+    return events, overflowed
+
+
+class NotificationHub():
+  def __init__(self, max_queue=100):
+    self.max_queue = max_queue
+    self.published = 0
+    self.overflows = 0
+    self._subscribers = {}
+    self._lock = threading.Lock()
+
+  def subscribe(self, user_id):
+    subscription = Subscription(int(user_id), self.max_queue)
+    with self._lock:
+      self._subscribers.setdefault(subscription.user_id, set()).add(subscription)
+    return subscription
+
+  def unsubscribe(self, subscription):
+    with self._lock:
+      subscriptions = self._subscribers.get(subscription.user_id)
+      if subscriptions is not None:
+        subscriptions.discard(subscription)
+        if not subscriptions:
+          del self._subscribers[subscription.user_id]
+
+  def subscribed(self, user_ids):
+    with self._lock:
+      return [user_id for user_id in user_ids if user_id in self._subscribers]
+
+  def publish(self, events):
+    # events: (user_id, payload) pairs, published only after their commit.
+    delivered = 0
+    overflows = 0
+    for user_id, payload in events:
+      with self._lock:
+        subscriptions = list(self._subscribers.get(user_id, ()))
+      for subscription in subscriptions:
+        pushed = subscription.push(payload)
+        if pushed:
+          delivered += 1
+        elif pushed is False:
+          overflows += 1
+    with self._lock:
+      self.published += delivered
+      self.overflows += overflows
+    return delivered
+
+  def stats(self):
+    with self._lock:
+      return {
+        "users": len(self._subscribers),
+        "connections": sum(len(subscriptions) for subscriptions in self._subscribers.values()),
+        "published": self.published,
+        "overflows": self.overflows
+      }
+
+
+def get_notification_hub():
+  hub = current_app.extensions.get("notification_hub")
+  if hub is None:
+    hub = current_app.extensions.setdefault(
+      "notification_hub",
+      NotificationHub(max_queue=current_app.config.get("NOTIFICATIONS_STREAM_QUEUE_SIZE", 100))
+    )
+  return hub
@@ -0,0 +1,209 @@
+import json
+from collections import deque
+from flask import Response, current_app, jsonify, request, stream_with_context
+from marshmallow import ValidationError
+from sqlalchemy import func, select
+from sql.blueprints.notifications import notifications_bp
+from sql.blueprints.notifications.fanout import mark_read, notifications_committed, notify_users, unread_count
+from sql.blueprints.notifications.hub import get_notification_hub
+from sql.blueprints.notifications.schemas import mark_read_schema, notifications_schema, send_notification_schema
+from sql.models import Diagnosis, Notifications, User, UserRole, db, normalize_diagnosis_name
+from sql.utils.auth import role_required, token_required
+from sql.utils.cache import cached_patient_resource
+from sql.utils.pagination import InvalidCursor, keyset_page
+from sql.utils.serializers import dump_list, json_response, list_query
+
+@notifications_bp.route("/", methods=["POST"])
+@role_required(UserRole.DOCTOR, UserRole.ADMIN)
+def send_notification(user_id):
+  json_data = request.get_json()
+  if not json_data:
+    return jsonify({"message": "No input data provided"}), 400
+  
+  try:
+    data = send_notification_schema.load(json_data)
+  except ValidationError as e:
+    return jsonify({"message": e.messages}), 400
+  
+  if "diagnosis_name" in data:
+    cohort = select(Diagnosis.patient_id).where(
+      Diagnosis.doctor_id == user_id,
+      Diagnosis.diagnosis_name_normalized == normalize_diagnosis_name(data["diagnosis_name"])
+    )
+    recipients = db.session.scalars(select(User.id).where(User.id.in_(cohort), User.is_active.is_(True))).all()
+    if not recipients:
+      return jsonify({"message": "No patients found with this diagnosis"}), 404
+  else:
+    max_recipients = current_app.config.get("NOTIFICATIONS_MAX_RECIPIENTS", 10000)
+    requested = set(data["user_ids"])
+    if len(requested) > max_recipients:
+      return jsonify({"message": f"Cannot notify more than {max_recipients} users at once"}), 413
+    
+    recipients = set(db.session.scalars(select(User.id).where(User.id.in_(requested))))
+    missing = requested - recipients
+    if missing:
+      return jsonify({"message": f"Users not found: {sorted(missing)[:20]}"}), 404
+    
+    # Doctors reach only the patients they have diagnosed, as with cohort sends.
+    caller = db.session.get(User, int(user_id))
+    if caller.role == UserRole.DOCTOR:
+      care_team = select(Diagnosis.patient_id).where(Diagnosis.doctor_id == caller.id, Diagnosis.patient_id.in_(recipients))
+      outside = recipients - set(db.session.scalars(care_team))
+      if outside:
+        return jsonify({"message": f"Not your patients: {sorted(outside)[:20]}"}), 403
+  
+  try:
+    recipients, events = notify_users(recipients, data["message"])
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"message": str(e)}), 500
+  
+  notifications_committed(recipients, events)
+  return jsonify({"sent": len(recipients)}), 201
+
+
+@notifications_bp.route("/", methods=["GET"])
+@token_required
+def list_notifications(user_id):
+  unread = request.args.get("unread")
+  if unread is not None and unread.lower() not in ("true", "false"):
+    return jsonify({"message": "'unread' must be 'true' or 'false'"}), 400
+  
+  max_limit = current_app.config.get("NOTIFICATIONS_PAGE_MAX_SIZE", 100)
+  limit = request.args.get("limit", 20, type=int)
+  if limit < 1:
+    return jsonify({"message": "'limit' must be a positive integer"}), 400
+  limit = min(limit, max_limit)
+  
+  query = list_query(notifications_schema).filter(Notifications.user_id == user_id)
+  if unread is not None:
+    query = query.filter(Notifications.is_read.is_(unread.lower() == "false"))
+  
+  try:
+    items, next_cursor = keyset_page(query, (Notifications.created_at, Notifications.id), request.args.get("cursor"), limit)
+  except InvalidCursor as e:
+    return jsonify({"message": str(e)}), 400
+  
+  return json_response({
+    "items": dump_list(notifications_schema, items),
+    "next_cursor": next_cursor
+  }), 200
+
+
+@notifications_bp.route("/unread-count", methods=["GET"])
+@token_required
+@cached_patient_resource("notifications", id_arg="user_id")
+def get_unread_count(user_id):
+  return jsonify({"unread": unread_count(user_id)}), 200
+
+
+@notifications_bp.route("/read", methods=["POST"])
+@token_required
+def mark_notifications_read(user_id):
+  json_data = request.get_json()
+  if not json_data:
+    return jsonify({"message": "No input data provided"}), 400
+  
+  try:
+    data = mark_read_schema.load(json_data)
+  except ValidationError as e:
+    return jsonify({"message": e.messages}), 400
+  
+  try:
+    updated = mark_read(user_id, data.get("ids"))
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"message": str(e)}), 500
+  
+  if updated:
+    notifications_committed([user_id])
+  return jsonify({"updated": updated, "unread": unread_count(user_id)}), 200
+
+
+def fetch_notifications_after(user_id, after_id, limit):
+  rows = (
+    list_query(notifications_schema)
+    .filter(Notifications.user_id == user_id, Notifications.id > after_id)
+    .order_by(Notifications.id)
+    .limit(limit)
+    .all()
+  )
+  items = dump_list(notifications_schema, rows)
+  # A stream lives for minutes or hours; it must not pin a pooled connection.
+  db.session.close()
+  return items
+
+def format_event(event):
+  return f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event, separators=(',', ':'), sort_keys=True)}\n\n"
+
+@notifications_bp.route("/stream", methods=["GET"])
+@token_required
+def stream_notifications(user_id):
+  last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+  if last_event_id is not None:
+    try:
+      last_event_id = int(last_event_id)
+    except ValueError:
+      return jsonify({"message": "'Last-Event-ID' must be a notification id"}), 400
+  
+  user_id = int(user_id)
+  hub = get_notification_hub()
+  heartbeat = current_app.config.get("NOTIFICATIONS_STREAM_HEARTBEAT", 15)
+  page_size = current_app.config.get("NOTIFICATIONS_STREAM_BACKLOG", 500)
+  retry_ms = current_app.config.get("NOTIFICATIONS_STREAM_RETRY_MS", 5000)
+  
+  def generate():
+    subscription = hub.subscribe(user_id)
+    recent = deque(maxlen=1024)
+    last_id = last_event_id
+    
+    def emit(events):
+      nonlocal last_id
+      for event in events:
+        # Live pushes can overlap a database resync; ids already sent are skipped.
+        if event["id"] in recent:
+          continue
+        recent.append(event["id"])
+        last_id = max(last_id, event["id"])
+        yield format_event(event)
+    
+    def resync():
+      sent = 0
+      while True:
+        events = fetch_notifications_after(user_id, last_id, page_size)
+        for chunk in emit(events):
+          sent += 1
+          yield chunk
+        if len(events) < page_size:
+          return sent
+    
+    try:
+      yield f"retry: {retry_ms}\n\n"
+      # Subscribed before reading the backlog, so nothing committed in between is lost.
+      if last_id is None:
+        last_id = db.session.scalar(select(func.max(Notifications.id)).where(Notifications.user_id == user_id)) or 0
+        db.session.close()
+      else:
+        yield from resync()
+      
+      while True:
+        events, overflowed = subscription.wait(heartbeat)
+        if events:
+          yield from emit(events)
+          continue
+        # After an overflow, and on every idle heartbeat, catch up from the
+        # database: the hub only hears this process's commits, not those of
+        # other workers or the reminder scheduler.
+        sent = yield from resync()
+        if not sent:
+          yield ": keep-alive\n\n"
+    finally:
+      hub.unsubscribe(subscription)
+  
+  return Response(
+    stream_with_context(generate()),
+    mimetype="text/event-stream",
+    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+  )
@@ -0,0 +1,31 @@
+from marshmallow import ValidationError, fields, validate, validates_schema
+from sql.extensions import ma
+from sql.models import Notifications
+
+class NotificationSchema(ma.SQLAlchemyAutoSchema):
+  class Meta:
+    model = Notifications
+
+class SendNotificationSchema(ma.Schema):
+  message = fields.String(required=True, validate=validate.Length(min=1, max=1000))
+  user_ids = fields.List(fields.Integer(), validate=validate.Length(min=1))
+  diagnosis_name = fields.String(validate=validate.Length(min=1))
+  
+  @validates_schema
+  def validate_recipients(self, data, **kwargs):
+    if ("user_ids" in data) == ("diagnosis_name" in data):
+      raise ValidationError({"_schema": ["Provide exactly one of 'user_ids' or 'diagnosis_name'"]})
+
+class MarkReadSchema(ma.Schema):
+  ids = fields.List(fields.Integer(), validate=validate.Length(min=1))
+  all = fields.Boolean()
+  
+  @validates_schema
+  def validate_target(self, data, **kwargs):
+    if ("ids" in data) == bool(data.get("all")):
+      raise ValidationError({"_schema": ["Provide either 'ids' or 'all': true"]})
+
+notification_schema = NotificationSchema()
+notifications_schema = NotificationSchema(many=True)
+send_notification_schema = SendNotificationSchema()
+mark_read_schema = MarkReadSchema()
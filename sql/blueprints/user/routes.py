@@ -1,11 +1,14 @@
 import traceback
-from flask import request, jsonify
+from flask import current_app, request, jsonify
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sql.models import db, User
+from sql.models import db, User, UserRole
 from sql.blueprints.user import user_bp
-from sql.blueprints.user.schemas import user_schema, return_user_schema, return_users_schema
-from sql.utils.auth import hash_password, check_password, generate_token, token_required
+from sql.blueprints.user.schemas import user_schema, return_user_schema, return_users_schema, update_user_schema
+from sql.utils.auth import hash_password, check_password, password_needs_rehash, generate_token, token_required
+from sql.utils.pagination import InvalidCursor, keyset_page, parse_count
+from sql.utils.cache import USERS_SCOPE, cached_patient_resource, invalidate, invalidate_patient
+from sql.utils.serializers import dump_list, json_response, list_query
 
 @user_bp.route("/login", methods=["POST"])
 def login_user():
@@ -19,6 +22,13 @@ def login_user():
   if not user or not check_password(data["password"], user.password):
     return jsonify({"message": "Invalid email or password"}), 401
   
+  if password_needs_rehash(user.password):
+    try:
+      user.password = hash_password(data["password"])
+      db.session.commit()
+    except SQLAlchemyError:
+      db.session.rollback()
+  
   token = generate_token(user)
   
   return jsonify({
@@ -76,13 +86,42 @@ def create_user():
 
 @user_bp.route("/", methods=["GET"])
 def get_users():
-  try: 
-    users = db.session.query(User).all()
+  role = request.args.get("role")
+  is_active = request.args.get("is_active")
+  
+  max_limit = current_app.config.get("USERS_PAGE_MAX_SIZE", 200)
+  limit = parse_count(request.args.get("limit"), 50)
+  if limit is None or limit < 1:
+    return jsonify({"message": "'limit' must be a positive integer"}), 400
+  limit = min(limit, max_limit)
+  
+  query = list_query(return_users_schema)
+  
+  if role is not None:
+    try:
+      query = query.filter(User.role == UserRole(role.lower()))
+    except ValueError:
+      return jsonify({"message": f"Invalid role '{role}'. Must be one of: {[r.value for r in UserRole]}"}), 400
+  
+  if is_active is not None:
+    if is_active.lower() not in ("true", "false"):
+      return jsonify({"message": "'is_active' must be 'true' or 'false'"}), 400
+    query = query.filter(User.is_active == (is_active.lower() == "true"))
+  
+  try:
+    cursor = request.args.get("cursor")
+    users, next_cursor = keyset_page(query, (User.id,), cursor, limit, descending=False)
     
-    if not users:
+    if not users and not cursor:
       return jsonify({"message": "No users found"}), 404
     
-    return jsonify(return_users_schema.dump(users)), 200
+    return json_response({
+      "items": dump_list(return_users_schema, users),
+      "next_cursor": next_cursor
+    }), 200
+  
+  except InvalidCursor as e:
+    return jsonify({"message": str(e)}), 400
   
   except Exception as e:
     return jsonify({
@@ -93,6 +132,7 @@ def get_users():
 
 @user_bp.route("/me", methods=["GET"])
 @token_required
+@cached_patient_resource("user", id_arg="user_id")
 def get_user(user_id):
   query = db.session.query(User).where(User.id == user_id)
   user = db.session.execute(query).scalars().first()
@@ -115,16 +155,14 @@ def update_user(user_id):
   
   try:
     
-    updated_data = user_schema.load(data, partial=True)
-    
     if "password" in data:
       return jsonify({"message": "Password updates are not allowed on this route, please use /me/password"}), 400
     
-    for key, value in updated_data.items():
-      if key != "password":
-        setattr(user, key, value)
+    update_user_schema.load(data, instance=user)
     
     db.session.commit()
+    invalidate_patient(user_id, "user")
+    invalidate(USERS_SCOPE)
     return jsonify(return_user_schema.dump(user)), 200
 
   except ValidationError as err:
@@ -29,6 +29,7 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
     model = User
     load_instance = True
     include_fk = True
+    exclude = ("unread_notifications",)
     
   password = fields.String(load_only=True, required=True)
     
@@ -39,4 +40,6 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
 
 user_schema = UserSchema()
 return_user_schema = UserSchema(exclude=("password",))
-return_users_schema = UserSchema(many=True, exclude=("password",))
\ No newline at end of file
+return_users_schema = UserSchema(many=True, exclude=("password",))
+# Self-service updates; role, activation and archival stay with admins.
+update_user_schema = UserSchema(only=("name", "email", "dob"), partial=True)
\ No newline at end of file
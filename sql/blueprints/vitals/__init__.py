@@ -5,5 +5,6 @@ heart_rate_bp = Blueprint("heart_rate_bp", __name__)
 weight_bp = Blueprint("weight_bp", __name__)
 glucose_bp = Blueprint("glucose_bp", __name__)
 temperature_bp = Blueprint("temperature_bp", __name__)
+vitals_bp = Blueprint("vitals_bp", __name__, cli_group="vitals")
 
 from . import routes
\ No newline at end of file
@@ -0,0 +1,260 @@
+import logging
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import func, select
+from sql.models import Diagnosis, User, db
+from sql.blueprints.vitals.rollups import VITAL_METRICS
+from sql.blueprints.notifications.fanout import notifications_committed, notify_each
+
+logger = logging.getLogger(__name__)
+
+# Per-patient baselines are kept per (patient, vital type) in a bounded LRU.
+# Each metric carries a Welford running mean/variance over the patient's
+# history and an EWMA of recent readings. A reading is anomalous when it sits
+# more than ANOMALY_Z_THRESHOLD standard deviations from the EWMA, so a slow
+# drift is followed while a sudden jump is flagged. Readings are observed
+# only after their commit. A baseline missing from the LRU is rebuilt with a
+# two-pass grouped aggregate (mean, then squared deviations from it) over the
+# last ANOMALY_BASELINE_DAYS of readings, which by then include the batch
+# itself; the batch is taken back out before it is scored, and the EWMA
+# starts at the remaining mean.
+
+# Floors on the standard deviation, so a patient whose readings barely vary
+# is not alerted on by rounding noise.
+MIN_STDDEV = {
+  ("blood_pressure", "systolic"): 4.0,
+  ("blood_pressure", "diastolic"): 3.0,
+  ("heart_rate", "value"): 4.0,
+  ("weight", "value"): 0.5,
+  ("glucose", "value"): 8.0,
+  ("temperature", "value"): 0.2,
+}
+
+
+class MetricBaseline():
+  __slots__ = ("count", "mean", "m2", "ewma", "alerted_at")
+
+  def __init__(self, count=0, mean=0.0, m2=0.0):
+    self.count = count
+    self.mean = mean
+    self.m2 = m2
+    self.ewma = mean
+    self.alerted_at = None
+
+  def stddev(self):
+    return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+  def update(self, value, alpha):
+    self.count += 1
+    delta = value - self.mean
+    self.mean += delta / self.count
+    self.m2 += delta * (value - self.mean)
+    self.ewma = value if self.count == 1 else alpha * value + (1 - alpha) * self.ewma
+
+  def remove(self, value):
+    # The inverse of update() for count, mean and m2.
+    if self.count <= 1:
+      self.count, self.mean, self.m2 = 0, 0.0, 0.0
+    else:
+      mean = (self.count * self.mean - value) / (self.count - 1)
+      self.m2 = max(self.m2 - (value - mean) * (value - self.mean), 0.0)
+      self.mean = mean
+      self.count -= 1
+    self.ewma = self.mean
+
+
+class AnomalyDetector():
+  def __init__(self, maxsize=100000, z_threshold=4.0, min_samples=10, alpha=0.2, baseline_days=90, cooldown=3600):
+    self.maxsize = maxsize
+    self.z_threshold = z_threshold
+    self.min_samples = min_samples
+    self.alpha = alpha
+    self.baseline = timedelta(days=baseline_days)
+    self.cooldown = timedelta(seconds=cooldown)
+    self.observed = 0
+    self.cold_starts = 0
+    self.alerts = 0
+    self._states = OrderedDict()
+    self._lock = threading.Lock()
+
+  def observe(self, readings):
+    # readings: (model, row) pairs, the shape insert_readings() takes, all
+    # already committed.
+    missing = {}
+    with self._lock:
+      for model, reading in readings:
+        key = (reading["patient_id"], model)
+        if key not in self._states:
+          missing.setdefault(model, []).append(reading)
+
+    loaded = {}
+    for model, model_readings in missing.items():
+      loaded.update(self._cold_start(model, model_readings))
+
+    alerts = []
+    now = datetime.now(timezone.utc)
+    with self._lock:
+      for key, state in loaded.items():
+        self._states.setdefault(key, state)
+      self.cold_starts += len(loaded)
+
+      for model, reading in readings:
+        key = (reading["patient_id"], model)
+        vital_type, metrics = VITAL_METRICS[model]
+        states = self._states.get(key)
+        if states is None:
+          # Evicted by a concurrent batch since the cold start.
+          states = self._states[key] = [MetricBaseline() for _ in metrics]
+        self._states.move_to_end(key)
+        for metric, state in zip(metrics, states):
+          value = reading[metric]
+          if value is None:
+            continue
+          alert = self._score(vital_type, metric, state, value, now)
+          if alert is not None:
+            alerts.append((reading["patient_id"], *alert))
+          state.update(value, self.alpha)
+
+      self.observed += len(readings)
+      self.alerts += len(alerts)
+      while len(self._states) > self.maxsize:
+        self._states.popitem(last=False)
+    return alerts
+
+  def _score(self, vital_type, metric, state, value, now):
+    if state.count < self.min_samples:
+      return None
+    stddev = max(state.stddev(), MIN_STDDEV.get((vital_type, metric), 0.0))
+    if abs(value - state.ewma) <= self.z_threshold * stddev:
+      return None
+    if state.alerted_at is not None and now - state.alerted_at < self.cooldown:
+      return None
+    state.alerted_at = now
+    return vital_type, metric, value, state.mean, stddev
+
+  def _cold_start(self, model, readings):
+    _, metrics = VITAL_METRICS[model]
+    patient_ids = {reading["patient_id"] for reading in readings}
+    since = datetime.now(timezone.utc) - self.baseline
+    window = [model.patient_id.in_(patient_ids), model.recorded_at >= since]
+
+    means = select(
+      model.patient_id,
+      *[func.count(getattr(model, metric)).label(f"count_{i}") for i, metric in enumerate(metrics)],
+      *[func.avg(getattr(model, metric)).label(f"mean_{i}") for i, metric in enumerate(metrics)]
+    ).where(*window).group_by(model.patient_id).subquery()
+    # Summing squared deviations from the mean, rather than subtracting
+    # avg(x)**2 from avg(x*x), keeps the variance exact for large readings
+    # with a small spread.
+    deviations = []
+    for i, metric in enumerate(metrics):
+      deviation = getattr(model, metric) - means.c[f"mean_{i}"]
+      deviations.append(func.sum(deviation * deviation))
+    rows = db.session.execute(
+      select(*means.c, *deviations)
+      .join(means, means.c.patient_id == model.patient_id)
+      .where(*window)
+      .group_by(*means.c)
+    )
+
+    n = len(metrics)
+    states = {(patient_id, model): [MetricBaseline() for _ in metrics] for patient_id in patient_ids}
+    for patient_id, *aggregates in rows:
+      baselines = []
+      for count, mean, m2 in zip(aggregates[:n], aggregates[n:2 * n], aggregates[2 * n:]):
+        if not count:
+          baselines.append(MetricBaseline())
+          continue
+        baselines.append(MetricBaseline(count, float(mean), float(m2 or 0.0)))
+      states[(patient_id, model)] = baselines
+
+    # Take the batch back out of the baselines it was just counted in. Rows
+    # always carry the recorded_at entry_row() stamped; one without it was
+    # never written.
+    for reading in readings:
+      recorded_at = reading.get("recorded_at")
+      if recorded_at is None:
+        continue
+      if recorded_at.tzinfo is None:
+        recorded_at = recorded_at.replace(tzinfo=timezone.utc)
+      if recorded_at < since:
+        continue
+      for metric, state in zip(metrics, states[(reading["patient_id"], model)]):
+        if reading[metric] is not None and state.count:
+          state.remove(reading[metric])
+    return states
+
+  def stats(self):
+    with self._lock:
+      return {
+        "patients": len(self._states),
+        "maxsize": self.maxsize,
+        "observed": self.observed,
+        "cold_starts": self.cold_starts,
+        "alerts": self.alerts
+      }
+
+
+def anomaly_detection_enabled():
+  return current_app.config.get("ANOMALY_DETECTION_ENABLED", True)
+
+def get_anomaly_detector():
+  detector = current_app.extensions.get("anomaly_detector")
+  if detector is None:
+    detector = current_app.extensions.setdefault("anomaly_detector", AnomalyDetector(
+      maxsize=current_app.config.get("ANOMALY_DETECTOR_MAX_PATIENTS", 100000),
+      z_threshold=current_app.config.get("ANOMALY_Z_THRESHOLD", 4.0),
+      min_samples=current_app.config.get("ANOMALY_MIN_SAMPLES", 10),
+      alpha=current_app.config.get("ANOMALY_EWMA_ALPHA", 0.2),
+      baseline_days=current_app.config.get("ANOMALY_BASELINE_DAYS", 90),
+      cooldown=current_app.config.get("ANOMALY_ALERT_COOLDOWN", 3600)
+    ))
+  return detector
+
+def detect_anomalies(readings):
+  # Runs after the readings are committed, so a failure here is logged and
+  # never fails the request that carried them.
+  if not readings or not anomaly_detection_enabled():
+    return []
+  try:
+    return get_anomaly_detector().observe(readings)
+  except Exception:
+    db.session.rollback()
+    logger.exception("Anomaly detection failed for %d vitals readings", len(readings))
+    return []
+
+def alert_message(name, vital_type, metric, value, mean, stddev):
+  label = vital_type.replace("_", " ") if metric == "value" else f"{vital_type.replace('_', ' ')} ({metric})"
+  return f"Vitals alert: {name}'s {label} reading of {value:g} is far from their baseline of {mean:.1f} ± {stddev:.1f}"
+
+def send_vital_alerts(alerts):
+  # Runs after the readings are committed and never fails the request that
+  # carried them; alerts go to every doctor with a diagnosis for the patient.
+  if not alerts:
+    return
+  patient_ids = {alert[0] for alert in alerts}
+  try:
+    names = dict(db.session.execute(select(User.id, User.name).where(User.id.in_(patient_ids))).all())
+    care_teams = {}
+    for patient_id, doctor_id in db.session.execute(
+      select(Diagnosis.patient_id, Diagnosis.doctor_id).where(Diagnosis.patient_id.in_(patient_ids)).distinct()
+    ):
+      care_teams.setdefault(patient_id, []).append(doctor_id)
+
+    messages = [
+      (doctor_id, alert_message(names.get(patient_id, f"Patient {patient_id}"), *details))
+      for patient_id, *details in alerts
+      for doctor_id in care_teams.get(patient_id, ())
+    ]
+    if not messages:
+      return
+    recipients, events = notify_each(messages)
+    db.session.commit()
+  except Exception:
+    db.session.rollback()
+    logger.exception("Failed to send %d vitals alerts", len(alerts))
+    return
+  notifications_committed(recipients, events)
@@ -0,0 +1,70 @@
+from sqlalchemy import Float, cast, func, select
+from sql.models import Diagnosis, User, db
+
+COHORT_STATISTICS = ("mean", "min", "max", "change")
+
+AGGREGATES = {"mean": func.avg, "min": func.min, "max": func.max}
+
+def _change(model, column, patients, since):
+  # Last reading minus first in the window. Both ends come from one window
+  # over each patient's series, so the readings are sorted once.
+  window = {
+    "partition_by": model.patient_id,
+    "order_by": (model.recorded_at, model.id),
+    "rows": (None, None)
+  }
+  readings = (
+    select(
+      model.patient_id,
+      func.first_value(column).over(**window).label("earliest"),
+      func.last_value(column).over(**window).label("latest")
+    )
+    .where(model.patient_id.in_(patients), model.recorded_at >= since)
+    .subquery()
+  )
+  return (
+    select(
+      readings.c.patient_id,
+      cast(func.max(readings.c.latest) - func.max(readings.c.earliest), Float).label("value"),
+      func.count().label("readings")
+    )
+    .group_by(readings.c.patient_id)
+    .having(func.count() > 1)
+  )
+
+def cohort_query(doctor_id, model, metric, statistic, since, above=None, below=None, descending=True):
+  patients = (
+    select(Diagnosis.patient_id)
+    .join(User, User.id == Diagnosis.patient_id)
+    .where(Diagnosis.doctor_id == doctor_id, User.is_active.is_(True))
+  )
+  column = getattr(model, metric)
+  if statistic == "change":
+    grouped = _change(model, column, patients, since)
+  else:
+    grouped = (
+      select(model.patient_id, cast(AGGREGATES[statistic](column), Float).label("value"), func.count().label("readings"))
+      .where(model.patient_id.in_(patients), model.recorded_at >= since)
+      .group_by(model.patient_id)
+    )
+
+  stats = grouped.subquery()
+  conditions = []
+  if above is not None:
+    conditions.append(stats.c.value > above)
+  if below is not None:
+    conditions.append(stats.c.value < below)
+
+  # Ranks are computed over the whole filtered cohort, so they stay stable
+  # across pages; (rank, patient_id) is the keyset.
+  order = stats.c.value.desc() if descending else stats.c.value.asc()
+  ranked = (
+    select(stats, func.rank().over(order_by=order).label("rank"))
+    .where(*conditions)
+    .subquery()
+  )
+  query = (
+    db.session.query(ranked.c.rank, ranked.c.patient_id, User.name, ranked.c.value, ranked.c.readings)
+    .join(User, User.id == ranked.c.patient_id)
+  )
+  return query, (ranked.c.rank, ranked.c.patient_id)
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import String, select, type_coerce
+from sql.models import Glucose, db
+
+# mg/dL bands from the international consensus on CGM time in ranges; values
+# are integers, so each edge is the first value of the next band.
+RANGE_EDGES = (54, 70, 181, 251)
+RANGE_NAMES = ("very_low", "low", "in_range", "high", "very_high")
+AGP_PERCENTILES = (5, 25, 50, 75, 95)
+
+def _as_datetime64(values):
+  # SQLite hands back the stored ISO strings, which NumPy parses in one pass;
+  # drivers that return datetimes are normalized to naive UTC first.
+  if values and isinstance(values[0], datetime):
+    values = [v.astimezone(timezone.utc).replace(tzinfo=None) if v.tzinfo else v for v in values]
+  return np.array(values, dtype="datetime64[us]")
+
+def fetch_glucose(patient_id, start=None, end=None):
+  table = Glucose.__table__
+  query = select(table.c.value, type_coerce(table.c.recorded_at, String)).where(table.c.patient_id == patient_id)
+  if start is not None:
+    query = query.where(table.c.recorded_at >= start)
+  if end is not None:
+    query = query.where(table.c.recorded_at < end)
+
+  # Neither column has a result processor, so the DBAPI rows are already the
+  # final values; reading them off the cursor skips building a Row for each of
+  # the ~26k readings in a 90-day window.
+  result = db.session.connection().execute(query)
+  try:
+    rows = result.cursor.fetchall()
+  finally:
+    result.close()
+  values, recorded_at = list(zip(*rows)) or ((), ())
+  return np.array(values, dtype=float), _as_datetime64(list(recorded_at))
+
+def hourly_percentiles(hours, values, percentiles=AGP_PERCENTILES):
+  # Percentiles for all 24 hours at once: sort by (hour, value), then
+  # interpolate inside each hour's slice the way np.percentile does.
+  counts = np.bincount(hours, minlength=24)
+  result = np.full((24, len(percentiles)), np.nan)
+  if values.size == 0:
+    return counts, result
+
+  ordered = values[np.lexsort((values, hours))]
+  starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+  last = np.maximum(counts - 1, 0)
+  positions = starts[:, None] + np.asarray(percentiles, dtype=float)[None, :] / 100 * last[:, None]
+  # Empty hours index past the end; they are masked out below.
+  lower = np.minimum(np.floor(positions).astype(np.int64), values.size - 1)
+  upper = np.minimum(np.minimum(lower + 1, (starts + last)[:, None]), values.size - 1)
+  fraction = positions - lower
+  result = ordered[lower] * (1 - fraction) + ordered[upper] * fraction
+  result[counts == 0] = np.nan
+  return counts, result
+
+def glucose_metrics(values, recorded_at, start=None, end=None, utc_offset_minutes=0, interval_minutes=5):
+  n = int(values.size)
+  if start is not None and end is not None:
+    span_minutes = (end - start).total_seconds() / 60
+  elif n:
+    span_minutes = float((recorded_at.max() - recorded_at.min()) / np.timedelta64(1, "m")) + interval_minutes
+  else:
+    span_minutes = 0
+  expected = span_minutes / interval_minutes
+
+  minutes = recorded_at.astype("datetime64[m]").astype(np.int64) + utc_offset_minutes
+  counts, bands = hourly_percentiles((minutes % 1440) // 60, values)
+  agp = [
+    {"hour": hour, "count": int(counts[hour]),
+     **{f"p{p}": None if np.isnan(v) else float(v) for p, v in zip(AGP_PERCENTILES, bands[hour])}}
+    for hour in range(24)
+  ]
+
+  if n == 0:
+    return {
+      "readings": 0, "cgm_active_percent": 0.0, "mean": None, "stddev": None, "cv_percent": None,
+      "gmi_percent": None, "time_in_ranges": {name: None for name in RANGE_NAMES}, "agp": agp
+    }
+
+  mean = float(values.mean())
+  stddev = float(values.std(ddof=1)) if n > 1 else 0.0
+  in_bands = np.bincount(np.digitize(values, RANGE_EDGES), minlength=len(RANGE_NAMES))
+  return {
+    "readings": n,
+    "cgm_active_percent": min(100.0, 100 * n / expected) if expected else None,
+    "mean": mean,
+    "stddev": stddev,
+    # Undefined without a positive mean, which only bad data can produce.
+    "cv_percent": 100 * stddev / mean if mean > 0 else None,
+    "gmi_percent": 3.31 + 0.02392 * mean,
+    "time_in_ranges": {name: 100 * float(count) / n for name, count in zip(RANGE_NAMES, in_bands)},
+    "agp": agp
+  }
@@ -0,0 +1,128 @@
+import json
+from datetime import datetime, timezone
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from sql.models import User, db
+from sql.blueprints.vitals.anomalies import detect_anomalies, send_vital_alerts
+from sql.blueprints.vitals.schemas import reading_schemas
+from sql.blueprints.vitals.rollups import refresh_rollups_on_write
+from sql.utils.cache import invalidate_patient
+
+class IngestAborted(Exception):
+  def __init__(self, message, summary):
+    super().__init__(message)
+    self.summary = summary
+
+def validate_reading(item):
+  if not isinstance(item, dict):
+    raise ValidationError({"_schema": ["Reading must be an object"]})
+
+  vital_type = item.get("type")
+  schema = reading_schemas.get(vital_type) if isinstance(vital_type, str) else None
+  if schema is None:
+    raise ValidationError({"type": [f"Must be one of: {list(reading_schemas)}"]})
+
+  reading = schema.load(item)
+  recorded_at = reading.get("recorded_at")
+  if recorded_at is None:
+    reading["recorded_at"] = datetime.now(timezone.utc)
+  elif recorded_at.tzinfo is not None:
+    reading["recorded_at"] = recorded_at.astimezone(timezone.utc)
+  return schema.opts.model, reading
+
+def existing_patient_ids(patient_ids):
+  if not patient_ids:
+    return set()
+
+  query = select(User.id).where(User.id.in_(patient_ids))
+  return set(db.session.execute(query).scalars())
+
+def insert_readings(readings):
+  rows_by_model = {}
+  for model, row in readings:
+    rows_by_model.setdefault(model, []).append(row)
+
+  for model, rows in rows_by_model.items():
+    db.session.execute(insert(model), rows)
+
+  refresh_rollups_on_write(readings)
+
+def ingest_ndjson(lines, chunk_size=500, max_errors=100):
+  created = 0
+  failed = 0
+  errors = []
+  known_patient_ids = set()
+  chunk = []
+  # Every line up to here has been handled and its readings committed, so
+  # a client whose stream aborts can resend from the line after it.
+  committed_through = 0
+
+  def record_error(line_number, messages):
+    nonlocal failed
+    failed += 1
+    if len(errors) < max_errors:
+      errors.append({"line": line_number, "errors": messages})
+
+  def flush(line_number):
+    nonlocal created, committed_through
+    unchecked_ids = {reading["patient_id"] for _, _, reading in chunk} - known_patient_ids
+    known_patient_ids.update(existing_patient_ids(unchecked_ids))
+    accepted = []
+    for chunk_line, model, reading in chunk:
+      if reading["patient_id"] not in known_patient_ids:
+        record_error(chunk_line, {"patient_id": [f"Patient with ID {reading['patient_id']} not found"]})
+        continue
+      accepted.append((model, reading))
+
+    insert_readings(accepted)
+    db.session.commit()
+    created += len(accepted)
+    committed_through = line_number
+    chunk.clear()
+    for patient_id in {reading["patient_id"] for _, reading in accepted}:
+      invalidate_patient(patient_id, "vitals")
+    send_vital_alerts(detect_anomalies(accepted))
+
+  def summary():
+    return {
+      "created": created,
+      "failed": failed,
+      "errors": errors,
+      "errors_truncated": failed > len(errors)
+    }
+
+  line_number = 0
+  try:
+    for line_number, line in enumerate(lines, start=1):
+      if not line.strip():
+        continue
+
+      try:
+        item = json.loads(line)
+      except ValueError:
+        record_error(line_number, {"_schema": ["Invalid JSON"]})
+        continue
+
+      try:
+        model, reading = validate_reading(item)
+      except ValidationError as e:
+        record_error(line_number, e.messages)
+        continue
+
+      chunk.append((line_number, model, reading))
+      if len(chunk) >= chunk_size:
+        flush(line_number)
+
+    if chunk:
+      flush(line_number)
+  except Exception as e:
+    db.session.rollback()
+    failed_line = chunk[0][0] if chunk else line_number + 1
+    raise IngestAborted(str(e), {
+      **summary(),
+      "committed_through_line": committed_through,
+      "failed_at_line": failed_line,
+      "message": str(e)
+    }) from e
+
+  return summary()
@@ -0,0 +1,295 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sql.models import BloodPressure, HeartRate, Weight, Glucose, Temperature, VitalRollup, VitalRollupWatermark, db
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+EPOCH = datetime(1970, 1, 1)
+
+VITAL_METRICS = {
+  BloodPressure: ("blood_pressure", ("systolic", "diastolic")),
+  HeartRate: ("heart_rate", ("value",)),
+  Weight: ("weight", ("value",)),
+  Glucose: ("glucose", ("value",)),
+  Temperature: ("temperature", ("value",)),
+}
+VITAL_MODELS = {vital_type: model for model, (vital_type, _) in VITAL_METRICS.items()}
+
+ROLLUP_KEY = ("patient_id", "vital_type", "resolution", "bucket_start", "metric")
+
+ROLLUP_COLUMNS = (
+  VitalRollup.metric,
+  VitalRollup.bucket_start,
+  VitalRollup.count,
+  VitalRollup.total,
+  VitalRollup.minimum,
+  VitalRollup.maximum,
+)
+
+def _utc_naive(value):
+  if value.tzinfo is not None:
+    value = value.astimezone(timezone.utc).replace(tzinfo=None)
+  return value
+
+def _floor(value, step):
+  return EPOCH + ((value - EPOCH) // step) * step
+
+def _runs(buckets, step, max_gap=DAY):
+  # Group sorted buckets into contiguous ranges so a sparse backfill does not
+  # rescan every raw row between its oldest and newest reading.
+  ordered = sorted(buckets)
+  start = end = ordered[0]
+  for bucket in ordered[1:]:
+    if bucket - end > max_gap:
+      yield start, end + step
+      start = bucket
+    end = bucket
+  yield start, end + step
+
+def _hour_bucket(column):
+  dialect = db.session.get_bind().dialect.name
+  if dialect == "sqlite":
+    return func.strftime("%Y-%m-%d %H:00:00", column)
+  if dialect == "postgresql":
+    return func.to_char(column, "YYYY-MM-DD HH24:00:00")
+  return func.date_format(column, "%Y-%m-%d %H:00:00")
+
+def _as_datetime(value):
+  return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+def _upsert_buckets(rows, increment):
+  # Writers racing on the same bucket merge into it instead of tripping the
+  # unique constraint: increment adds the rows' count/total and widens
+  # min/max, otherwise the rows replace the stored values.
+  if not rows:
+    return
+  dialect = db.session.get_bind().dialect.name
+  table = VitalRollup.__table__
+  if dialect == "mysql":
+    stmt = mysql.insert(table)
+    new = stmt.inserted
+  else:
+    stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+    new = stmt.excluded
+
+  if increment:
+    least, greatest = (func.min, func.max) if dialect == "sqlite" else (func.least, func.greatest)
+    values = {
+      "count": table.c.count + new.count,
+      "total": table.c.total + new.total,
+      "minimum": least(table.c.minimum, new.minimum),
+      "maximum": greatest(table.c.maximum, new.maximum)
+    }
+  else:
+    values = {name: new[name] for name in ("count", "total", "minimum", "maximum")}
+
+  if dialect == "mysql":
+    stmt = stmt.on_duplicate_key_update(**values)
+  else:
+    stmt = stmt.on_conflict_do_update(index_elements=ROLLUP_KEY, set_=values)
+  db.session.execute(stmt, rows)
+
+def _replace_buckets(patient_id, vital_type, resolution, start, end, rows):
+  db.session.execute(
+    delete(VitalRollup).where(
+      VitalRollup.patient_id == patient_id,
+      VitalRollup.vital_type == vital_type,
+      VitalRollup.resolution == resolution,
+      VitalRollup.bucket_start >= start,
+      VitalRollup.bucket_start < end
+    )
+  )
+  _upsert_buckets(rows, increment=False)
+
+def _refresh_hours(model, patient_id, start, end):
+  vital_type, metrics = VITAL_METRICS[model]
+  bucket = _hour_bucket(model.recorded_at).label("bucket")
+  columns = [bucket, func.count()]
+  for metric in metrics:
+    column = getattr(model, metric)
+    columns += [func.sum(column), func.min(column), func.max(column)]
+
+  query = (
+    select(*columns)
+    .where(model.patient_id == patient_id, model.recorded_at >= start, model.recorded_at < end)
+    .group_by(bucket)
+  )
+
+  rows = []
+  for result in db.session.execute(query):
+    for i, metric in enumerate(metrics):
+      total, minimum, maximum = result[2 + i * 3:5 + i * 3]
+      rows.append({
+        "patient_id": patient_id,
+        "vital_type": vital_type,
+        "metric": metric,
+        "resolution": "hour",
+        "bucket_start": _as_datetime(result[0]),
+        "count": result[1],
+        "total": total,
+        "minimum": minimum,
+        "maximum": maximum
+      })
+
+  _replace_buckets(patient_id, vital_type, "hour", start, end, rows)
+
+def _refresh_days(vital_type, patient_id, start, end):
+  hourly = db.session.execute(
+    select(*ROLLUP_COLUMNS).where(
+      VitalRollup.patient_id == patient_id,
+      VitalRollup.vital_type == vital_type,
+      VitalRollup.resolution == "hour",
+      VitalRollup.bucket_start >= start,
+      VitalRollup.bucket_start < end
+    )
+  )
+
+  merged = {}
+  for rollup in hourly:
+    key = (rollup.metric, _floor(_utc_naive(rollup.bucket_start), DAY))
+    _merge(merged, key, rollup.count, rollup.total, rollup.minimum, rollup.maximum)
+
+  rows = [
+    {
+      "patient_id": patient_id,
+      "vital_type": vital_type,
+      "metric": metric,
+      "resolution": "day",
+      "bucket_start": day,
+      **values
+    }
+    for (metric, day), values in merged.items()
+  ]
+  _replace_buckets(patient_id, vital_type, "day", start, end, rows)
+
+def _merge(merged, key, count, total, minimum, maximum):
+  current = merged.get(key)
+  if current is None:
+    merged[key] = {"count": count, "total": total, "minimum": minimum, "maximum": maximum}
+    return
+  current["count"] += count
+  current["total"] += total
+  current["minimum"] = min(current["minimum"], minimum)
+  current["maximum"] = max(current["maximum"], maximum)
+
+def refresh_rollups(touched):
+  hours_by_series = {}
+  for model, patient_id, recorded_at in touched:
+    hour = _floor(_utc_naive(recorded_at), HOUR)
+    hours_by_series.setdefault((model, patient_id), set()).add(hour)
+
+  for (model, patient_id), hours in hours_by_series.items():
+    for start, end in _runs(hours, HOUR):
+      _refresh_hours(model, patient_id, start, end)
+
+    days = {_floor(hour, DAY) for hour in hours}
+    for start, end in _runs(days, DAY):
+      _refresh_days(VITAL_METRICS[model][0], patient_id, start, end)
+
+def apply_readings(readings):
+  # Folds new readings into their hour and day buckets without rescanning
+  # the raw table; readings are (model, row) pairs.
+  merged = {}
+  for model, row in readings:
+    vital_type, metrics = VITAL_METRICS[model]
+    hour = _floor(_utc_naive(row["recorded_at"]), HOUR)
+    for metric in metrics:
+      value = row.get(metric)
+      if value is None:
+        continue
+      for resolution, bucket in (("hour", hour), ("day", _floor(hour, DAY))):
+        _merge(merged, (row["patient_id"], vital_type, resolution, bucket, metric), 1, value, value, value)
+
+  _upsert_buckets([
+    {**dict(zip(ROLLUP_KEY, key)), **values}
+    for key, values in merged.items()
+  ], increment=True)
+
+def refresh_rollups_on_write(readings):
+  # Rollups are derived data and must never fail the write that carries the
+  # readings: on error the savepoint is dropped and the refresh-rollups job
+  # rebuilds the buckets from the raw rows.
+  if not current_app.config.get("VITALS_ROLLUPS_ON_WRITE", True):
+    return
+  readings = list(readings)
+  try:
+    with db.session.begin_nested():
+      apply_readings(readings)
+  except Exception:
+    logger.exception("Failed to update rollups for %d readings; refresh-rollups will rebuild them", len(readings))
+
+def refresh_entry_rollups(entry):
+  db.session.flush()
+  _, metrics = VITAL_METRICS[type(entry)]
+  row = {"patient_id": entry.patient_id, "recorded_at": entry.recorded_at}
+  row.update((metric, getattr(entry, metric)) for metric in metrics)
+  refresh_rollups_on_write([(type(entry), row)])
+
+def refresh_rollups_from_watermark(chunk_size=5000, overlap=1000):
+  # Ids are assigned at insert but become visible at commit, so a row can
+  # appear below the watermark after it has moved past. Each run rescans the
+  # last `overlap` ids before the watermark to pick such rows up; rebuilding
+  # a bucket is idempotent, so rescanning is safe.
+  refreshed = 0
+  for model, (vital_type, _) in VITAL_METRICS.items():
+    watermark = db.session.get(VitalRollupWatermark, vital_type)
+    if watermark is None:
+      watermark = VitalRollupWatermark(vital_type=vital_type, last_id=0)
+      db.session.add(watermark)
+
+    after = max(watermark.last_id - overlap, 0)
+    while True:
+      rows = db.session.execute(
+        select(model.id, model.patient_id, model.recorded_at)
+        .where(model.id > after)
+        .order_by(model.id)
+        .limit(chunk_size)
+      ).all()
+      if not rows:
+        break
+
+      refresh_rollups((model, row.patient_id, row.recorded_at) for row in rows)
+      after = rows[-1].id
+      watermark.last_id = max(watermark.last_id, after)
+      db.session.commit()
+      refreshed += len(rows)
+
+  db.session.commit()
+  return refreshed
+
+def rollup_series(model, patient_id, resolution, start=None, end=None):
+  vital_type, metrics = VITAL_METRICS[model]
+  # Serve from the coarsest rollup whose buckets tile the requested resolution.
+  source, step = ("day", DAY) if resolution % DAY == timedelta(0) else ("hour", HOUR)
+
+  query = select(*ROLLUP_COLUMNS).where(
+    VitalRollup.patient_id == patient_id,
+    VitalRollup.vital_type == vital_type,
+    VitalRollup.resolution == source
+  )
+  if start is not None:
+    query = query.where(VitalRollup.bucket_start >= _floor(_utc_naive(start), step))
+  if end is not None:
+    query = query.where(VitalRollup.bucket_start < _utc_naive(end))
+
+  merged = {}
+  for rollup in db.session.execute(query.order_by(VitalRollup.bucket_start)):
+    key = (rollup.metric, _floor(_utc_naive(rollup.bucket_start), resolution))
+    _merge(merged, key, rollup.count, rollup.total, rollup.minimum, rollup.maximum)
+
+  series = {metric: [] for metric in metrics}
+  for (metric, bucket_start), values in merged.items():
+    series[metric].append({
+      "bucket_start": bucket_start.isoformat(),
+      "count": values["count"],
+      "min": values["minimum"],
+      "max": values["maximum"],
+      "avg": values["total"] / values["count"]
+    })
+
+  return source, series
@@ -1,9 +1,61 @@
-from flask import request, jsonify
+import math
+import re
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app, request, jsonify
 from marshmallow import ValidationError
-from sql.models import BloodPressure, HeartRate, Weight, Glucose, Temperature, User, db
+from sql.models import BloodPressure, HeartRate, Weight, Glucose, Temperature, User, UserRole, db
 from sql.blueprints.vitals.schemas import bloodpressure_schema, heartrate_schema, weight_schema, glucose_schema, temperature_schema
-from sql.blueprints.vitals import blood_pressure_bp, heart_rate_bp, weight_bp, glucose_bp, temperature_bp
-from sql.utils.auth import token_required
+from sql.blueprints.vitals.schemas import bloodpressures_schema, heartrates_schema, weights_schema, glucose_readings_schema, temperatures_schema
+from sql.blueprints.vitals import blood_pressure_bp, heart_rate_bp, weight_bp, glucose_bp, temperature_bp, vitals_bp
+from sql.blueprints.vitals.anomalies import detect_anomalies, send_vital_alerts
+from sql.blueprints.vitals.cohort import COHORT_STATISTICS, cohort_query
+from sql.blueprints.vitals.glucose import fetch_glucose, glucose_metrics
+from sql.blueprints.vitals.ingest import IngestAborted, validate_reading, existing_patient_ids, insert_readings, ingest_ndjson
+from sql.blueprints.vitals.rollups import VITAL_METRICS, VITAL_MODELS, refresh_entry_rollups, refresh_rollups_from_watermark, rollup_series
+from sql.blueprints.vitals.stats import summarize_patient
+from sql.blueprints.vitals.writer import entry_row, get_vitals_writer, write_behind_enabled
+from sql.utils.auth import role_required, token_required
+from sql.utils.cache import invalidate_patient
+from sql.utils.pagination import InvalidCursor, keyset_page, parse_count, parse_datetime
+from sql.utils.serializers import dump_list, json_response, list_query
+
+def list_vital_entries(model, schema, patient_id):
+  try:
+    start = parse_datetime(request.args.get("from"))
+    end = parse_datetime(request.args.get("to"))
+  except ValueError:
+    return jsonify({"message": "'from' and 'to' must be ISO 8601 datetimes"}), 400
+  
+  max_limit = current_app.config.get("VITALS_PAGE_MAX_SIZE", 1000)
+  limit = request.args.get("limit", 100, type=int)
+  if limit < 1:
+    return jsonify({"message": "'limit' must be a positive integer"}), 400
+  limit = min(limit, max_limit)
+  
+  query = list_query(schema).filter(model.patient_id == patient_id)
+  if start is not None:
+    query = query.filter(model.recorded_at >= start)
+  if end is not None:
+    query = query.filter(model.recorded_at < end)
+  
+  try:
+    entries, next_cursor = keyset_page(query, (model.recorded_at, model.id), request.args.get("cursor"), limit)
+  except InvalidCursor as e:
+    return jsonify({"message": str(e)}), 400
+  
+  return json_response({
+    "items": dump_list(schema, entries),
+    "next_cursor": next_cursor
+  }), 200
+
+def enqueue_readings(readings, body=None, status=202):
+  timeout = current_app.config.get("VITALS_WRITE_BEHIND_ENQUEUE_TIMEOUT", 0.05)
+  if not get_vitals_writer().submit(readings, timeout=timeout):
+    response = jsonify({"message": "Vitals write queue is full, retry later"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+  return jsonify(body or {"accepted": len(readings)}), status
 
 @blood_pressure_bp.route("/<int:patient_id>", methods=["POST"])
 @token_required
@@ -22,17 +74,31 @@ def create_bp_entry(patient_id):
     return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
   
   bp_entry.patient_id = patient_id
+  if write_behind_enabled():
+    return enqueue_readings([entry_row(bp_entry)])
+  
+  reading = entry_row(bp_entry)
   db.session.add(bp_entry)
   
   try:
+    refresh_entry_rollups(bp_entry)
     db.session.commit()
   except Exception as e:
     db.session.rollback()
     return jsonify({"message": str(e)}), 500
   
+  invalidate_patient(patient_id, "vitals")
+  send_vital_alerts(detect_anomalies([reading]))
+  
   return bloodpressure_schema.jsonify(bp_entry), 201
 
 
+@blood_pressure_bp.route("/<int:patient_id>", methods=["GET"])
+@token_required
+def get_bp_entries(patient_id):
+  return list_vital_entries(BloodPressure, bloodpressures_schema, patient_id)
+
+
 @heart_rate_bp.route("/<int:patient_id>", methods=["POST"])
 @token_required
 def create_heartrate_entry(patient_id):
@@ -50,17 +116,31 @@ def create_heartrate_entry(patient_id):
     return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
   
   heartrate_entry.patient_id = patient_id
+  if write_behind_enabled():
+    return enqueue_readings([entry_row(heartrate_entry)])
+  
+  reading = entry_row(heartrate_entry)
   db.session.add(heartrate_entry)
   
   try:
+    refresh_entry_rollups(heartrate_entry)
     db.session.commit()
   except Exception as e:
     db.session.rollback()
     return jsonify({"message": str(e)}), 500
   
+  invalidate_patient(patient_id, "vitals")
+  send_vital_alerts(detect_anomalies([reading]))
+  
   return heartrate_schema.jsonify(heartrate_entry), 201
 
 
+@heart_rate_bp.route("/<int:patient_id>", methods=["GET"])
+@token_required
+def get_heartrate_entries(patient_id):
+  return list_vital_entries(HeartRate, heartrates_schema, patient_id)
+
+
 @weight_bp.route("/<int:patient_id>", methods=["POST"])
 @token_required
 def create_weight_entry(patient_id):
@@ -78,17 +158,31 @@ def create_weight_entry(patient_id):
     return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
   
   weight_entry.patient_id = patient_id
+  if write_behind_enabled():
+    return enqueue_readings([entry_row(weight_entry)])
+  
+  reading = entry_row(weight_entry)
   db.session.add(weight_entry)
   
   try:
+    refresh_entry_rollups(weight_entry)
     db.session.commit()
   except Exception as e:
     db.session.rollback()
     return jsonify({"message": str(e)}), 500
   
+  invalidate_patient(patient_id, "vitals")
+  send_vital_alerts(detect_anomalies([reading]))
+  
   return weight_schema.jsonify(weight_entry), 201
 
 
+@weight_bp.route("/<int:patient_id>", methods=["GET"])
+@token_required
+def get_weight_entries(patient_id):
+  return list_vital_entries(Weight, weights_schema, patient_id)
+
+
 @glucose_bp.route("/<int:patient_id>", methods=["POST"])
 @token_required
 def create_glucose_entry(patient_id):
@@ -106,17 +200,31 @@ def create_glucose_entry(patient_id):
     return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
   
   glucose_entry.patient_id = patient_id
+  if write_behind_enabled():
+    return enqueue_readings([entry_row(glucose_entry)])
+  
+  reading = entry_row(glucose_entry)
   db.session.add(glucose_entry)
   
   try:
+    refresh_entry_rollups(glucose_entry)
     db.session.commit()
   except Exception as e:
     db.session.rollback()
     return jsonify({"message": str(e)}), 500
   
+  invalidate_patient(patient_id, "vitals")
+  send_vital_alerts(detect_anomalies([reading]))
+  
   return glucose_schema.jsonify(glucose_entry), 201
 
 
+@glucose_bp.route("/<int:patient_id>", methods=["GET"])
+@token_required
+def get_glucose_entries(patient_id):
+  return list_vital_entries(Glucose, glucose_readings_schema, patient_id)
+
+
 @temperature_bp.route("/<int:patient_id>", methods=["POST"])
 @token_required
 def create_temp_entry(patient_id):
@@ -134,12 +242,276 @@ def create_temp_entry(patient_id):
     return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
   
   temp_entry.patient_id = patient_id
+  if write_behind_enabled():
+    return enqueue_readings([entry_row(temp_entry)])
+  
+  reading = entry_row(temp_entry)
   db.session.add(temp_entry)
   
   try:
+    refresh_entry_rollups(temp_entry)
     db.session.commit()
   except Exception as e:
     db.session.rollback()
     return jsonify({"message": str(e)}), 500
   
-  return temperature_schema.jsonify(temp_entry), 201
\ No newline at end of file
+  invalidate_patient(patient_id, "vitals")
+  send_vital_alerts(detect_anomalies([reading]))
+  
+  return temperature_schema.jsonify(temp_entry), 201
+
+
+@temperature_bp.route("/<int:patient_id>", methods=["GET"])
+@token_required
+def get_temp_entries(patient_id):
+  return list_vital_entries(Temperature, temperatures_schema, patient_id)
+
+
+@vitals_bp.route("/batch", methods=["POST"])
+@token_required
+def create_vitals_batch():
+  json_data = request.get_json()
+  if not json_data or not isinstance(json_data, list):
+    return jsonify({"message": "Expected a non-empty list of readings"}), 400
+  
+  max_size = current_app.config.get("VITALS_BATCH_MAX_SIZE", 1000)
+  if len(json_data) > max_size:
+    return jsonify({"message": f"Batch cannot contain more than {max_size} readings"}), 413
+  
+  results = []
+  valid = []
+  for index, item in enumerate(json_data):
+    try:
+      model, reading = validate_reading(item)
+    except ValidationError as e:
+      results.append({"index": index, "status": "invalid", "errors": e.messages})
+      continue
+    
+    results.append({"index": index, "status": "created", "type": item["type"]})
+    valid.append((index, model, reading))
+  
+  found_ids = existing_patient_ids({reading["patient_id"] for _, _, reading in valid})
+  accepted = []
+  for index, model, reading in valid:
+    if reading["patient_id"] not in found_ids:
+      results[index] = {
+        "index": index,
+        "status": "invalid",
+        "errors": {"patient_id": [f"Patient with ID {reading['patient_id']} not found"]}
+      }
+      continue
+    accepted.append((model, reading))
+  
+  failed = len(json_data) - len(accepted)
+  if not accepted:
+    # Nothing to store: 404 when every reading named a missing patient,
+    # otherwise 422 for readings that did not validate.
+    status = 404 if valid and len(valid) == len(json_data) else 422
+    return jsonify({"created": 0, "failed": failed, "results": results}), status
+  if write_behind_enabled() and accepted:
+    for result in results:
+      if result["status"] == "created":
+        result["status"] = "accepted"
+    return enqueue_readings(accepted, {"accepted": len(accepted), "failed": failed, "results": results}, 207 if failed else 202)
+  
+  try:
+    insert_readings(accepted)
+    db.session.commit()
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"message": str(e)}), 500
+  
+  for patient_id in {reading["patient_id"] for _, reading in accepted}:
+    invalidate_patient(patient_id, "vitals")
+  send_vital_alerts(detect_anomalies(accepted))
+  
+  return jsonify({
+    "created": len(accepted),
+    "failed": failed,
+    "results": results
+  }), 207 if failed else 201
+
+
+@vitals_bp.route("/stream", methods=["POST"])
+@token_required
+def create_vitals_stream():
+  if request.mimetype != "application/x-ndjson":
+    return jsonify({"message": "Content-Type must be application/x-ndjson"}), 415
+  
+  try:
+    summary = ingest_ndjson(
+      request.stream,
+      chunk_size=current_app.config.get("VITALS_STREAM_CHUNK_SIZE", 500),
+      max_errors=current_app.config.get("VITALS_STREAM_MAX_ERRORS", 100)
+    )
+  except IngestAborted as e:
+    return jsonify(e.summary), 500
+  
+  return jsonify(summary), 207 if summary["failed"] else 201
+
+
+RESOLUTION_UNITS = {"h": timedelta(hours=1), "d": timedelta(days=1), "w": timedelta(weeks=1)}
+
+@vitals_bp.route("/<int:patient_id>/trends", methods=["GET"])
+@token_required
+def get_vital_trends(patient_id):
+  vital_type = request.args.get("type")
+  model = VITAL_MODELS.get(vital_type)
+  if model is None:
+    return jsonify({"message": f"'type' must be one of: {list(VITAL_MODELS)}"}), 400
+  
+  match = re.fullmatch(r"(\d+)([hdw])", request.args.get("resolution", "1h"))
+  if not match or int(match.group(1)) < 1:
+    return jsonify({"message": "'resolution' must look like 1h, 6h, 1d or 1w"}), 400
+  resolution = int(match.group(1)) * RESOLUTION_UNITS[match.group(2)]
+  
+  try:
+    start = parse_datetime(request.args.get("from"))
+    end = parse_datetime(request.args.get("to"))
+  except ValueError:
+    return jsonify({"message": "'from' and 'to' must be ISO 8601 datetimes"}), 400
+  
+  source, series = rollup_series(model, patient_id, resolution, start, end)
+  
+  return jsonify({
+    "type": vital_type,
+    "resolution": request.args.get("resolution", "1h"),
+    "source": source,
+    "series": series
+  }), 200
+
+
+@vitals_bp.route("/<int:patient_id>/summary", methods=["GET"])
+@token_required
+def get_vitals_summary(patient_id):
+  vital_type = request.args.get("type")
+  if vital_type is not None and vital_type not in VITAL_MODELS:
+    return jsonify({"message": f"'type' must be one of: {list(VITAL_MODELS)}"}), 400
+  
+  try:
+    start = parse_datetime(request.args.get("from"))
+    end = parse_datetime(request.args.get("to"))
+  except ValueError:
+    return jsonify({"message": "'from' and 'to' must be ISO 8601 datetimes"}), 400
+  
+  patient = db.session.get(User, patient_id)
+  if not patient:
+    return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
+  
+  models = [VITAL_MODELS[vital_type]] if vital_type else None
+  return jsonify(summarize_patient(patient_id, start, end, models)), 200
+
+
+@vitals_bp.route("/<int:patient_id>/glucose-metrics", methods=["GET"])
+@token_required
+def get_glucose_metrics(patient_id):
+  try:
+    start = parse_datetime(request.args.get("from"))
+    end = parse_datetime(request.args.get("to"))
+  except ValueError:
+    return jsonify({"message": "'from' and 'to' must be ISO 8601 datetimes"}), 400
+  
+  try:
+    utc_offset = int(request.args.get("utc_offset", 0))
+  except ValueError:
+    utc_offset = None
+  if utc_offset is None or not -840 <= utc_offset <= 840:
+    return jsonify({"message": "'utc_offset' must be minutes between -840 and 840"}), 400
+  
+  # Naive bounds are taken as UTC; the window defaults to the last 14 days,
+  # the usual span for a CGM report.
+  end = end or datetime.now(timezone.utc)
+  end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+  start = start or end - timedelta(days=14)
+  start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+  max_days = current_app.config.get("GLUCOSE_METRICS_MAX_DAYS", 90)
+  if start >= end or end - start > timedelta(days=max_days):
+    return jsonify({"message": f"'from' must be before 'to' and at most {max_days} days earlier"}), 400
+  
+  patient = db.session.get(User, patient_id)
+  if not patient:
+    return jsonify({"message": f"Patient with ID {patient_id} not found"}), 404
+  
+  values, recorded_at = fetch_glucose(patient_id, start, end)
+  metrics = glucose_metrics(
+    values, recorded_at, start, end, utc_offset,
+    current_app.config.get("GLUCOSE_CGM_INTERVAL_MINUTES", 5)
+  )
+  return jsonify({"from": start.isoformat(), "to": end.isoformat(), "utc_offset": utc_offset, **metrics}), 200
+
+
+@vitals_bp.route("/cohort", methods=["GET"])
+@role_required(UserRole.DOCTOR)
+def get_vitals_cohort(user_id):
+  vital_type = request.args.get("type")
+  model = VITAL_MODELS.get(vital_type)
+  if model is None:
+    return jsonify({"message": f"'type' must be one of: {list(VITAL_MODELS)}"}), 400
+  
+  metrics = VITAL_METRICS[model][1]
+  metric = request.args.get("metric", metrics[0])
+  if metric not in metrics:
+    return jsonify({"message": f"'metric' must be one of: {list(metrics)}"}), 400
+  
+  statistic = request.args.get("statistic", "mean")
+  if statistic not in COHORT_STATISTICS:
+    return jsonify({"message": f"'statistic' must be one of: {list(COHORT_STATISTICS)}"}), 400
+  
+  max_days = current_app.config.get("COHORT_MAX_DAYS", 365)
+  days = parse_count(request.args.get("days"), 7)
+  if days is None or not 1 <= days <= max_days:
+    return jsonify({"message": f"'days' must be between 1 and {max_days}"}), 400
+  
+  order = request.args.get("order", "desc")
+  if order not in ("asc", "desc"):
+    return jsonify({"message": "'order' must be 'asc' or 'desc'"}), 400
+  
+  max_limit = current_app.config.get("COHORT_PAGE_MAX_SIZE", 200)
+  limit = parse_count(request.args.get("limit"), 50)
+  if limit is None or limit < 1:
+    return jsonify({"message": "'limit' must be a positive integer"}), 400
+  limit = min(limit, max_limit)
+  
+  # A bound that does not parse is an error, not a filter quietly left off.
+  bounds = {}
+  for name in ("above", "below"):
+    value = request.args.get(name)
+    try:
+      bounds[name] = None if value is None else float(value)
+    except ValueError:
+      bounds[name] = math.nan
+    if bounds[name] is not None and not math.isfinite(bounds[name]):
+      return jsonify({"message": f"'{name}' must be a number"}), 400
+  
+  since = datetime.now(timezone.utc) - timedelta(days=days)
+  query, columns = cohort_query(
+    int(user_id), model, metric, statistic, since,
+    above=bounds["above"],
+    below=bounds["below"],
+    descending=order == "desc"
+  )
+  
+  try:
+    rows, next_cursor = keyset_page(query, columns, request.args.get("cursor"), limit, descending=False)
+  except InvalidCursor as e:
+    return jsonify({"message": str(e)}), 400
+  
+  return jsonify({
+    "type": vital_type,
+    "metric": metric,
+    "statistic": statistic,
+    "days": days,
+    "items": [
+      {"rank": row.rank, "patient_id": row.patient_id, "name": row.name, "value": row.value, "readings": row.readings}
+      for row in rows
+    ],
+    "next_cursor": next_cursor
+  }), 200
+
+
+@vitals_bp.cli.command("refresh-rollups")
+@click.option("--chunk-size", default=5000, show_default=True)
+@click.option("--overlap", default=1000, show_default=True, help="Ids before the watermark to rescan for late commits")
+def refresh_rollups_command(chunk_size, overlap):
+  refreshed = refresh_rollups_from_watermark(chunk_size, overlap)
+  click.echo(f"Refreshed rollups for {refreshed} readings")
\ No newline at end of file
@@ -51,4 +51,59 @@ bloodpressure_schema = BloodPressureSchema()
 heartrate_schema = HeartRateSchema()
 weight_schema = WeightSchema()
 glucose_schema = GlucoseSchema()
-temperature_schema = TemperatureSchema()
\ No newline at end of file
+temperature_schema = TemperatureSchema()
+bloodpressures_schema = BloodPressureSchema(many=True)
+heartrates_schema = HeartRateSchema(many=True)
+weights_schema = WeightSchema(many=True)
+glucose_readings_schema = GlucoseSchema(many=True)
+temperatures_schema = TemperatureSchema(many=True)
+
+class BloodPressureReadingSchema(ma.SQLAlchemyAutoSchema):
+  class Meta:
+    model = BloodPressure
+    include_fk = True
+    unknown = EXCLUDE
+    exclude = ("id",)
+
+
+class HeartRateReadingSchema(ma.SQLAlchemyAutoSchema):
+  class Meta:
+    model = HeartRate
+    include_fk = True
+    unknown = EXCLUDE
+    exclude = ("id",)
+
+
+class WeightReadingSchema(ma.SQLAlchemyAutoSchema):
+  class Meta:
+    model = Weight
+    include_fk = True
+    unknown = EXCLUDE
+    exclude = ("id",)
+
+
+class GlucoseReadingSchema(ma.SQLAlchemyAutoSchema):
+  class Meta:
+    model = Glucose
+    include_fk = True
+    unknown = EXCLUDE
+    exclude = ("id",)
+
+
+class TemperatureReadingSchema(ma.SQLAlchemyAutoSchema):
+  class Meta:
+    model = Temperature
+    include_fk = True
+    unknown = EXCLUDE
+    exclude = ("id",)
+
+
+# Readings submitted in bulk carry their own patient_id and recorded_at and
+# load to plain dicts so they can be inserted with a single executemany.
+reading_schemas = {
+  "blood_pressure": BloodPressureReadingSchema(),
+  "heart_rate": HeartRateReadingSchema(),
+  "weight": WeightReadingSchema(),
+  "glucose": GlucoseReadingSchema(),
+  "temperature": TemperatureReadingSchema(),
+}
@@ -0,0 +1,46 @@
+import numpy as np
+from sqlalchemy import select
+from sql.models import db
+from sql.blueprints.vitals.rollups import VITAL_METRICS
+
+PERCENTILES = (5, 50, 95)
+
+def _describe(values):
+  if values.size == 0:
+    return {"count": 0, "mean": None, "min": None, "max": None, "stddev": None,
+            **{f"p{p}": None for p in PERCENTILES}}
+
+  percentiles = np.percentile(values, PERCENTILES)
+  return {
+    "count": int(values.size),
+    "mean": float(values.mean()),
+    "min": float(values.min()),
+    "max": float(values.max()),
+    "stddev": float(values.std(ddof=1)) if values.size > 1 else None,
+    **{f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)}
+  }
+
+def summarize_vital(model, patient_id, start=None, end=None):
+  _, metrics = VITAL_METRICS[model]
+  query = select(*(getattr(model, metric) for metric in metrics)).where(model.patient_id == patient_id)
+  if start is not None:
+    query = query.where(model.recorded_at >= start)
+  if end is not None:
+    query = query.where(model.recorded_at < end)
+
+  # Integer and Float columns have no result processor, so the DBAPI rows are
+  # already the final values; read them off the cursor as glucose does and
+  # hand NumPy one (rows, metrics) array.
+  result = db.session.connection().execute(query)
+  try:
+    rows = result.cursor.fetchall()
+  finally:
+    result.close()
+  values = np.array(rows, dtype=float).reshape(len(rows), len(metrics))
+  return {metric: _describe(values[:, i]) for i, metric in enumerate(metrics)}
+
+def summarize_patient(patient_id, start=None, end=None, models=None):
+  return {
+    VITAL_METRICS[model][0]: summarize_vital(model, patient_id, start, end)
+    for model in (models or VITAL_METRICS)
+  }
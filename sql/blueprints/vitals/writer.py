@@ -0,0 +1,180 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from flask import current_app
+from sql.models import db
+from sql.blueprints.vitals.anomalies import detect_anomalies, send_vital_alerts
+from sql.blueprints.vitals.ingest import insert_readings
+from sql.utils.cache import invalidate_patient
+
+logger = logging.getLogger(__name__)
+
+# Durability: a 202 means the reading passed validation and sits in this
+# process's memory, not that it is committed. Readings are committed within
+# roughly VITALS_WRITE_BEHIND_INTERVAL seconds and only then become visible to
+# reads. close() (registered with atexit) drains everything still pending on a
+# clean shutdown; a crash or SIGKILL loses whatever was pending, up to
+# VITALS_WRITE_BEHIND_MAX_PENDING readings. A batch the database rejects is
+# retried row by row, and rows that still fail are logged and dropped. Alerts
+# for a batch are sent by the writer once its rows are committed.
+
+_writer_lock = threading.Lock()
+
+def write_behind_enabled():
+  return current_app.config.get("VITALS_WRITE_BEHIND", False)
+
+def entry_row(entry):
+  row = {column.key: getattr(entry, column.key) for column in entry.__table__.columns if column.key != "id"}
+  recorded_at = row.get("recorded_at")
+  # Stamped at acceptance, so a reading's time does not depend on when its batch flushes.
+  if recorded_at is None:
+    row["recorded_at"] = datetime.now(timezone.utc)
+  elif recorded_at.tzinfo is not None:
+    row["recorded_at"] = recorded_at.astimezone(timezone.utc)
+  return type(entry), row
+
+
+class VitalsWriter():
+  def __init__(self, app, max_pending=10000, batch_size=500, flush_interval=0.5):
+    self.app = app
+    self.max_pending = max_pending
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.accepted = 0
+    self.rejected = 0
+    self.written = 0
+    self.failed = 0
+    self.batches = 0
+    self._pending = deque()
+    self._in_flight = 0
+    self._closed = False
+    self._cond = threading.Condition()
+    self._thread = threading.Thread(target=self._run, name="vitals-writer", daemon=True)
+
+  def start(self):
+    self._thread.start()
+    atexit.register(self.close)
+
+  def submit(self, readings, timeout=0.0):
+    # All readings of a request are queued or none are, so a client retrying
+    # after a 503 never duplicates part of its payload.
+    deadline = time.monotonic() + timeout
+    with self._cond:
+      while not self._closed and len(self._pending) + len(readings) > self.max_pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or len(readings) > self.max_pending:
+          self.rejected += len(readings)
+          return False
+        self._cond.wait(remaining)
+
+      if self._closed:
+        self.rejected += len(readings)
+        return False
+
+      self._pending.extend(readings)
+      self.accepted += len(readings)
+      if len(self._pending) >= self.batch_size:
+        self._cond.notify_all()
+    return True
+
+  def flush(self, timeout=None):
+    with self._cond:
+      self._cond.notify_all()
+      return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+  def close(self, timeout=30):
+    with self._cond:
+      if self._closed:
+        return
+      self._closed = True
+      self._cond.notify_all()
+    if self._thread.is_alive():
+      self._thread.join(timeout)
+    if self._pending:
+      logger.error("Vitals writer closed with %d readings unwritten", len(self._pending))
+
+  def stats(self):
+    with self._cond:
+      return {
+        "pending": len(self._pending),
+        "in_flight": self._in_flight,
+        "max_pending": self.max_pending,
+        "accepted": self.accepted,
+        "rejected": self.rejected,
+        "written": self.written,
+        "failed": self.failed,
+        "batches": self.batches
+      }
+
+  def _run(self):
+    while True:
+      with self._cond:
+        deadline = time.monotonic() + self.flush_interval
+        while len(self._pending) < self.batch_size and not self._closed:
+          remaining = deadline - time.monotonic()
+          if remaining <= 0:
+            break
+          self._cond.wait(remaining)
+
+        if not self._pending:
+          if self._closed:
+            return
+          continue
+
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        self._in_flight = len(batch)
+        self._cond.notify_all()
+
+      written, failed = self._write(batch)
+      with self._cond:
+        self.written += written
+        self.failed += failed
+        self.batches += 1
+        self._in_flight = 0
+        self._cond.notify_all()
+
+  def _write(self, batch):
+    with self.app.app_context():
+      try:
+        insert_readings(batch)
+        db.session.commit()
+        written = batch
+      except Exception:
+        db.session.rollback()
+        logger.exception("Vitals batch of %d failed, retrying row by row", len(batch))
+        written = []
+        for reading in batch:
+          try:
+            insert_readings([reading])
+            db.session.commit()
+            written.append(reading)
+          except Exception:
+            db.session.rollback()
+            logger.exception("Dropping vitals reading %r", reading)
+
+      for patient_id in {row["patient_id"] for _, row in written}:
+        invalidate_patient(patient_id, "vitals")
+      # Only readings that made it into the database are scored, so a dropped
+      # row never raises an alert.
+      send_vital_alerts(detect_anomalies(written))
+    return len(written), len(batch) - len(written)
+
+
+def get_vitals_writer():
+  writer = current_app.extensions.get("vitals_writer")
+  if writer is None:
+    with _writer_lock:
+      writer = current_app.extensions.get("vitals_writer")
+      if writer is None:
+        writer = VitalsWriter(
+          current_app._get_current_object(),
+          max_pending=current_app.config.get("VITALS_WRITE_BEHIND_MAX_PENDING", 10000),
+          batch_size=current_app.config.get("VITALS_WRITE_BEHIND_BATCH_SIZE", 500),
+          flush_interval=current_app.config.get("VITALS_WRITE_BEHIND_INTERVAL", 0.5)
+        )
+        writer.start()
+        current_app.extensions["vitals_writer"] = writer
+  return writer
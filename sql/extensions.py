@@ -1,5 +1,7 @@
+from flask_caching import Cache
 from flask_marshmallow import Marshmallow
 from flask_migrate import Migrate
 
 ma = Marshmallow()
-migrate = Migrate()
\ No newline at end of file
+migrate = Migrate()
+cache = Cache()
\ No newline at end of file
@@ -1,6 +1,6 @@
 from typing import Optional
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, validates
 from sqlalchemy import Enum, Date, DateTime
 from marshmallow import fields, ValidationError
 from datetime import date, datetime, timezone
@@ -41,8 +41,16 @@ class EnumField(fields.Field):
       raise ValidationError(f"Invalid value '{value}' for enum {self.enum.__name__}")
 
 
+def normalize_diagnosis_name(name):
+  return " ".join(name.split()).lower()
+
+
 class User(db.Model):
   __tablename__ = "users"
+  __table_args__ = (
+    db.Index("ix_users_role_is_active_id", "role", "is_active", "id"),
+    db.Index("ix_users_is_active_id", "is_active", "id"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   name: Mapped[str] = mapped_column(db.String(100), nullable=False)
@@ -57,6 +65,7 @@ class User(db.Model):
   
   is_active: Mapped[bool] = mapped_column(db.Boolean, default=True, nullable=False)
   archived_at: Mapped[datetime] = mapped_column(db.DateTime, nullable=True)
+  unread_notifications: Mapped[int] = mapped_column(db.Integer, default=0, server_default="0", nullable=False)
   
   def archive(self):
     self.is_active = False
@@ -69,6 +78,10 @@ class User(db.Model):
 
 class Diagnosis(db.Model):
   __tablename__ = "diagnosis"
+  __table_args__ = (
+    db.Index("ix_diagnosis_doctor_name_patient", "doctor_id", "diagnosis_name_normalized", "patient_id"),
+    db.Index("ix_diagnosis_notes_fulltext", "notes", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   
@@ -76,6 +89,7 @@ class Diagnosis(db.Model):
   doctor_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
   
   diagnosis_name: Mapped[str] = mapped_column(db.String(150), nullable=False)
+  diagnosis_name_normalized: Mapped[str] = mapped_column(db.String(150), nullable=False)
   diagnosis_code: Mapped[str] = mapped_column(db.String(50))
   
   diagnosis_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -88,6 +102,11 @@ class Diagnosis(db.Model):
   
   doctor = db.relationship("User", backref="diagnoses_made", foreign_keys=[doctor_id])
   patient = db.relationship("User", backref="diagnoses", foreign_keys=[patient_id])
+  
+  @validates("diagnosis_name")
+  def _normalize_name(self, key, value):
+    self.diagnosis_name_normalized = normalize_diagnosis_name(value)
+    return value
 
 
 class Medication(db.Model):
@@ -112,12 +131,15 @@ class Medication(db.Model):
 
 class Notifications(db.Model):
   __tablename__ = "notifications"
+  __table_args__ = (
+    db.Index("ix_notifications_user_id_is_read_created_at", "user_id", "is_read", "created_at"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   user_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
   
   message: Mapped[str] = mapped_column(db.String(1000), nullable=False)
-  is_read: Mapped[bool] = mapped_column(db.Boolean(), nullable=False)
+  is_read: Mapped[bool] = mapped_column(db.Boolean(), default=False, nullable=False)
   created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True),
                                               nullable=False,
                                               default=lambda: datetime.now(timezone.utc)
@@ -128,12 +150,18 @@ class Notifications(db.Model):
 
 class Appointment(db.Model):
   __tablename__ = "appointments"
+  __table_args__ = (
+    db.Index("ix_appointments_doctor_id_appointment_time", "doctor_id", "appointment_time"),
+    db.Index("ix_appointments_patient_id_appointment_time", "patient_id", "appointment_time"),
+    db.Index("ix_appointments_status_appointment_time", "status", "appointment_time"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   doctor_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
   patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
   
   appointment_time: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+  duration_minutes: Mapped[int] = mapped_column(db.Integer, nullable=False, default=30, server_default="30")
   notes: Mapped[str] = mapped_column(db.String(1000), nullable=False)
   status: Mapped[AppointmentStatus] = mapped_column(
                                               Enum(AppointmentStatus),
@@ -146,6 +174,18 @@ class Appointment(db.Model):
   doctor = db.relationship("User", foreign_keys=[doctor_id], backref="doctor_appointments")
 
 
+class AppointmentReminder(db.Model):
+  __tablename__ = "appointment_reminders"
+  __table_args__ = (
+    db.UniqueConstraint("appointment_id", "offset_minutes", name="uq_appointment_reminders_offset"),
+  )
+  
+  id: Mapped[int] = mapped_column(primary_key=True)
+  appointment_id: Mapped[int] = mapped_column(db.ForeignKey("appointments.id"), nullable=False)
+  offset_minutes: Mapped[int] = mapped_column(db.Integer, nullable=False)
+  sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class Goal(db.Model):
   __tablename__ = "goals"
   
@@ -171,6 +211,9 @@ class Goal(db.Model):
 
 class BloodPressure(db.Model):
   __tablename__ = "blood_pressures"
+  __table_args__ = (
+    db.Index("ix_blood_pressures_patient_id_recorded_at", "patient_id", "recorded_at"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
@@ -188,6 +231,9 @@ class BloodPressure(db.Model):
 
 class HeartRate(db.Model):
   __tablename__ = "heart_rates"
+  __table_args__ = (
+    db.Index("ix_heart_rates_patient_id_recorded_at", "patient_id", "recorded_at"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
@@ -204,6 +250,9 @@ class HeartRate(db.Model):
 
 class Weight(db.Model):
   __tablename__ = "weights"
+  __table_args__ = (
+    db.Index("ix_weights_patient_id_recorded_at", "patient_id", "recorded_at"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
@@ -220,6 +269,9 @@ class Weight(db.Model):
 
 class Glucose(db.Model):
   __tablename__ = "glucose"
+  __table_args__ = (
+    db.Index("ix_glucose_patient_id_recorded_at", "patient_id", "recorded_at"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
@@ -236,6 +288,9 @@ class Glucose(db.Model):
 
 class Temperature(db.Model):
   __tablename__ = "temperatures"
+  __table_args__ = (
+    db.Index("ix_temperatures_patient_id_recorded_at", "patient_id", "recorded_at"),
+  )
   
   id: Mapped[int] = mapped_column(primary_key=True)
   patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
@@ -247,4 +302,30 @@ class Temperature(db.Model):
                                             default=lambda: datetime.now(timezone.utc)
                                             )
   
-  patient = db.relationship("User", backref="temperature_readings", foreign_keys=[patient_id])
\ No newline at end of file
+  patient = db.relationship("User", backref="temperature_readings", foreign_keys=[patient_id])
+
+class VitalRollup(db.Model):
+  __tablename__ = "vital_rollups"
+  __table_args__ = (
+    db.UniqueConstraint("patient_id", "vital_type", "resolution", "bucket_start", "metric", name="uq_vital_rollups_bucket"),
+  )
+  
+  id: Mapped[int] = mapped_column(primary_key=True)
+  patient_id: Mapped[int] = mapped_column(db.ForeignKey("users.id"), nullable=False)
+  
+  vital_type: Mapped[str] = mapped_column(db.String(30), nullable=False)
+  metric: Mapped[str] = mapped_column(db.String(30), nullable=False)
+  resolution: Mapped[str] = mapped_column(db.String(10), nullable=False)
+  bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+  
+  count: Mapped[int] = mapped_column(db.Integer(), nullable=False)
+  total: Mapped[float] = mapped_column(db.Float(), nullable=False)
+  minimum: Mapped[float] = mapped_column(db.Float(), nullable=False)
+  maximum: Mapped[float] = mapped_column(db.Float(), nullable=False)
+
+
+class VitalRollupWatermark(db.Model):
+  __tablename__ = "vital_rollup_watermarks"
+  
+  vital_type: Mapped[str] = mapped_column(db.String(30), primary_key=True)
+  last_id: Mapped[int] = mapped_column(db.Integer(), nullable=False, default=0)
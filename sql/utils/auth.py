@@ -1,17 +1,118 @@
-from flask_bcrypt import Bcrypt
+from collections import OrderedDict
+from contextlib import nullcontext
 from functools import wraps
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from flask import current_app, jsonify, request
+import bcrypt as bcrypt_lib
+import inspect
 import jose
+import os
+import threading
+import time
 
-bcrypt = Bcrypt()
+class TokenCache():
+  def __init__(self, maxsize=10000, ttl=300):
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.hits = 0
+    self.misses = 0
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    
+  def get(self, token):
+    now = time.time()
+    with self._lock:
+      entry = self._entries.get(token)
+      if entry is not None:
+        claims, expires_at = entry
+        if expires_at > now:
+          self._entries.move_to_end(token)
+          self.hits += 1
+          return claims
+        del self._entries[token]
+      self.misses += 1
+      return None
+  
+  def put(self, token, claims):
+    exp = claims[2]
+    if self.maxsize <= 0 or exp is None:
+      return
+    
+    expires_at = min(exp, time.time() + self.ttl)
+    with self._lock:
+      self._entries[token] = (claims, expires_at)
+      self._entries.move_to_end(token)
+      while len(self._entries) > self.maxsize:
+        self._entries.popitem(last=False)
+  
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+  
+  def stats(self):
+    with self._lock:
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "size": len(self._entries),
+        "maxsize": self.maxsize
+      }
+
+def get_token_cache():
+  cache = current_app.extensions.get("token_cache")
+  if cache is None:
+    cache = TokenCache(
+      maxsize=current_app.config.get("TOKEN_CACHE_SIZE", 10000),
+      ttl=current_app.config.get("TOKEN_CACHE_TTL", 300)
+    )
+    current_app.extensions["token_cache"] = cache
+  return cache
+
+def verify_token(token):
+  cache = get_token_cache()
+  claims = cache.get(token)
+  if claims is None:
+    payload = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
+    claims = (payload.get("sub"), payload.get("role"), payload.get("exp"))
+    cache.put(token, claims)
+  return claims
+
+def _hash_password(plain_password: str, rounds: int) -> str:
+  return bcrypt_lib.hashpw(plain_password.encode("utf-8"), bcrypt_lib.gensalt(rounds)).decode("utf-8")
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+  try:
+    return bcrypt_lib.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+  except ValueError:
+    return False
+
+def get_hash_limiter():
+  # bcrypt releases the GIL, so request threads already hash in parallel;
+  # the semaphore only caps how many run at once so a burst of logins cannot
+  # take every core from the rest of the app.
+  limiter = current_app.extensions.get("hash_limiter")
+  if limiter is None:
+    limit = current_app.config.get("PASSWORD_HASH_CONCURRENCY", os.cpu_count())
+    limiter = current_app.extensions.setdefault("hash_limiter", threading.BoundedSemaphore(limit) if limit else nullcontext())
+  return limiter
+
+def _run_hash_task(fn, *args):
+  with get_hash_limiter():
+    return fn(*args)
 
 def hash_password(plain_password: str) -> str:
-  return bcrypt.generate_password_hash(plain_password).decode("utf-8")
+  return _run_hash_task(_hash_password, plain_password, current_app.config.get("BCRYPT_LOG_ROUNDS", 12))
 
 def check_password(plain_password: str, hashed_password: str) -> bool:
-  return bcrypt.check_password_hash(hashed_password, plain_password)
+  return _run_hash_task(_check_password, plain_password, hashed_password)
+
+def password_needs_rehash(hashed_password: str) -> bool:
+  try:
+    rounds = int(hashed_password.split("$")[2])
+  except (IndexError, ValueError):
+    return True
+  return rounds != current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
 
 def generate_token(user):
   payload = {
@@ -24,6 +125,9 @@ def generate_token(user):
   return token
 
 def role_required(*allowed_roles):
+  allowed_values = frozenset(r.value for r in allowed_roles)
+  forbidden_message = f"{' or '.join(r.value for r in allowed_roles)} role required"
+  
   def decorator(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
@@ -33,14 +137,12 @@ def role_required(*allowed_roles):
       
       try:
         token = auth_header.split(" ")[1]
-        payload = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
-        role = payload.get("role")
-        if role not in [r.value for r in allowed_roles]:
-          return jsonify({"message": f"{' or '.join(r.value for r in allowed_roles)} role required"}), 403
-        user_id = payload.get("sub")
+        user_id, role, _ = verify_token(token)
+        if role not in allowed_values:
+          return jsonify({"message": forbidden_message}), 403
       except jose.exceptions.ExpiredSignatureError:
         return jsonify({"message": "Token has expired"}), 401
-      except JWTError:
+      except (JWTError, IndexError):
         return jsonify({"message": "Invalid token"}), 401
       
       return f(*args, user_id=user_id, **kwargs)
@@ -48,6 +150,8 @@ def role_required(*allowed_roles):
   return decorator
 
 def token_required(f):
+  wants_user_id = "user_id" in inspect.signature(f).parameters
+  
   @wraps(f)
   def decorated(*args, **kwargs):
     token = None
@@ -62,9 +166,9 @@ def token_required(f):
       return jsonify({"message": "Token is missing"}), 401
     
     try:
-      data = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
-      user_id = data["sub"]
-      role = data.get("role")
+      user_id, role, _ = verify_token(token)
+      if user_id is None:
+        raise JWTError("Token has no subject")
       
     except jose.exceptions.ExpiredSignatureError:
       return jsonify({"message": "Token has expired!"}), 401
@@ -72,5 +176,7 @@ def token_required(f):
     except jose.exceptions.JWTError:
       return jsonify({"message": "Invalid token!"}), 401
     
+    if wants_user_id:
+      kwargs["user_id"] = user_id
     return f(*args, **kwargs)
   return decorated
\ No newline at end of file
@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, make_response, request
+from sql.extensions import cache
+
+USERS_SCOPE = "users"
+PER_PROCESS_BACKENDS = ("simple", "simplecache")
+
+class CacheStats():
+  def __init__(self, max_tracked_keys=10000):
+    self.hits = 0
+    self.misses = 0
+    self.sets = 0
+    self.invalidations = 0
+    self.evictions = 0
+    self._live_keys = OrderedDict()
+    self._max_tracked_keys = max_tracked_keys
+    self._lock = threading.Lock()
+
+  def record_hit(self):
+    with self._lock:
+      self.hits += 1
+
+  def record_miss(self, key):
+    with self._lock:
+      self.misses += 1
+      # A miss on a key this process stored and never invalidated means the
+      # backend dropped it (expiry or eviction under memory pressure).
+      if self._live_keys.pop(key, None) is not None:
+        self.evictions += 1
+
+  def record_set(self, key):
+    with self._lock:
+      self.sets += 1
+      self._live_keys[key] = True
+      self._live_keys.move_to_end(key)
+      while len(self._live_keys) > self._max_tracked_keys:
+        self._live_keys.popitem(last=False)
+
+  def record_invalidation(self, count=1):
+    with self._lock:
+      self.invalidations += count
+
+  def as_dict(self):
+    with self._lock:
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "sets": self.sets,
+        "invalidations": self.invalidations,
+        "evictions": self.evictions
+      }
+
+def get_cache_stats():
+  stats = current_app.extensions.get("response_cache_stats")
+  if stats is None:
+    stats = CacheStats()
+    current_app.extensions["response_cache_stats"] = stats
+  return stats
+
+def init_response_cache(app):
+  # Version tokens live in the cache itself and back both cached bodies and
+  # ETags. With a per-process backend each worker keeps its own, so a write
+  # handled by one worker never reaches another: it would serve stale entries
+  # and answer 304 for data that has changed.
+  backend = str(app.config.get("CACHE_TYPE", "")).rsplit(".", 1)[-1].lower()
+  if app.config.get("CACHE_REQUIRE_SHARED") and backend in PER_PROCESS_BACKENDS:
+    raise RuntimeError(
+      f"CACHE_TYPE={app.config['CACHE_TYPE']} is local to each worker; set CACHE_TYPE to a shared backend "
+      "such as RedisCache or MemcachedCache, or to NullCache to turn response caching and ETags off"
+    )
+
+def patient_scope(patient_id, resource):
+  return f"patient:{patient_id}:{resource}"
+
+def _new_version():
+  return uuid.uuid4().hex[:12]
+
+def scope_version(scope):
+  # Versions are random tokens rather than counters, so a version key that the
+  # backend evicts comes back as a new token instead of resurrecting old entries.
+  version_key = f"version:{scope}"
+  version = cache.get(version_key)
+  if version is None:
+    version = _new_version()
+    if not cache.add(version_key, version, timeout=0):
+      version = cache.get(version_key) or version
+  return version
+
+def invalidate(*scopes):
+  if not scopes:
+    return
+  # One round trip however many scopes, so a fan-out to a whole cohort stays cheap.
+  cache.set_many({f"version:{scope}": _new_version() for scope in scopes}, timeout=0)
+  get_cache_stats().record_invalidation(len(scopes))
+
+def invalidate_patient(patient_id, *resources):
+  invalidate(*(patient_scope(patient_id, resource) for resource in resources))
+
+def _with_etag(response, etag):
+  response.set_etag(etag)
+  response.headers["Cache-Control"] = "private, no-cache"
+  return response
+
+def _not_modified(etag):
+  return _with_etag(current_app.response_class(status=304), etag)
+
+def cached_patient_resource(resource, id_arg="patient_id", depends_on=()):
+  def decorator(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+      scopes = (patient_scope(kwargs[id_arg], resource),) + tuple(depends_on)
+      # The versions are read before the handler queries the database, so a
+      # write that lands mid-request bumps them and strands this entry. They
+      # also name the ETag, so a revalidation is answered from the versions
+      # alone, before the view runs.
+      versions = ":".join(scope_version(scope) for scope in scopes)
+      key = f"response:{f.__name__}:{kwargs[id_arg]}:{versions}"
+      etag = hashlib.sha1(key.encode()).hexdigest()[:20]
+      if request.if_none_match.contains_weak(etag):
+        return _not_modified(etag)
+
+      if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+        response = make_response(f(*args, **kwargs))
+        return _with_etag(response, etag) if response.status_code == 200 else response
+
+      stats = get_cache_stats()
+      cached = cache.get(key)
+      if cached is not None:
+        stats.record_hit()
+        body, status = cached
+        return _with_etag(current_app.response_class(body, status=status, mimetype="application/json"), etag)
+
+      stats.record_miss(key)
+      response = make_response(f(*args, **kwargs))
+      if response.status_code == 200:
+        cache.set(key, (response.get_data(), response.status_code))
+        stats.record_set(key)
+        return _with_etag(response, etag)
+      return response
+    return wrapper
+  return decorator
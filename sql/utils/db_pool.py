@@ -0,0 +1,72 @@
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self._stats_lock = threading.Lock()
+    self._checkouts = 0
+    self._timeouts = 0
+    self._total_wait = 0.0
+    self._max_wait = 0.0
+
+  def _do_get(self):
+    start = time.perf_counter()
+    try:
+      return super()._do_get()
+    except PoolTimeoutError:
+      with self._stats_lock:
+        self._timeouts += 1
+      raise
+    finally:
+      waited = time.perf_counter() - start
+      with self._stats_lock:
+        self._checkouts += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+  def recreate(self):
+    # Keep the counters across engine.dispose() so stats cover the whole process.
+    pool = super().recreate()
+    pool._checkouts = self._checkouts
+    pool._timeouts = self._timeouts
+    pool._total_wait = self._total_wait
+    pool._max_wait = self._max_wait
+    return pool
+
+  def wait_stats(self):
+    with self._stats_lock:
+      return {
+        "checkouts": self._checkouts,
+        "timeouts": self._timeouts,
+        "total_wait_ms": round(self._total_wait * 1000, 3),
+        "avg_wait_ms": round(self._total_wait * 1000 / self._checkouts, 3) if self._checkouts else 0.0,
+        "max_wait_ms": round(self._max_wait * 1000, 3)
+      }
+
+def pool_stats(engine):
+  pool = engine.pool
+  stats = {"pool_class": type(pool).__name__}
+
+  if isinstance(pool, QueuePool):
+    stats.update({
+      "size": pool.size(),
+      "checked_in": pool.checkedin(),
+      "checked_out": pool.checkedout(),
+      "overflow": max(pool.overflow(), 0),
+      "timeout": pool.timeout()
+    })
+
+  if isinstance(pool, InstrumentedQueuePool):
+    stats.update(pool.wait_stats())
+
+  return stats
+
+def init_db_pool(app):
+  # Runs before db.init_app, which builds the engine from these options.
+  if app.config.get("DB_POOL_INSTRUMENTED"):
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+    options.setdefault("poolclass", InstrumentedQueuePool)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
@@ -0,0 +1,67 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from sqlalchemy import and_, or_
+
+class InvalidCursor(ValueError):
+  pass
+
+def parse_datetime(value):
+  if value is None:
+    return None
+  parsed = datetime.fromisoformat(value)
+  if parsed.tzinfo is not None:
+    parsed = parsed.astimezone(timezone.utc)
+  return parsed
+
+def parse_count(value, default):
+  # Stricter than int(): no sign, whitespace, underscores or non-ASCII digits.
+  if value is None:
+    return default
+  if not (value.isascii() and value.isdigit()):
+    return None
+  return int(value)
+
+def encode_cursor(values):
+  raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+  return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor, columns):
+  try:
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+  except (ValueError, binascii.Error):
+    raise InvalidCursor("Invalid cursor")
+
+  if not isinstance(values, list) or len(values) != len(columns):
+    raise InvalidCursor("Invalid cursor")
+
+  try:
+    return [
+      parse_datetime(v) if column.type.python_type is datetime else column.type.python_type(v)
+      for column, v in zip(columns, values)
+    ]
+  except (TypeError, ValueError):
+    raise InvalidCursor("Invalid cursor")
+
+def _after(columns, values, descending):
+  column, value = columns[0], values[0]
+  beyond = column < value if descending else column > value
+  if len(columns) == 1:
+    return beyond
+  return or_(beyond, and_(column == value, _after(columns[1:], values[1:], descending)))
+
+def keyset_page(query, columns, cursor=None, limit=100, descending=True):
+  if cursor:
+    query = query.where(_after(columns, decode_cursor(cursor, columns), descending))
+
+  order = [c.desc() if descending else c.asc() for c in columns]
+  rows = query.order_by(*order).limit(limit + 1).all()
+
+  next_cursor = None
+  if len(rows) > limit:
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+
+  return rows, next_cursor
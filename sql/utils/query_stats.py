@@ -0,0 +1,71 @@
+import time
+import traceback
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sql.models import db
+
+def _query_location():
+  # First frame in the app's own code, skipping SQLAlchemy and this module.
+  for frame, lineno in traceback.walk_stack(None):
+    module = frame.f_globals.get("__name__", "")
+    if module.startswith("sql.") and module != __name__:
+      return f"{module}:{lineno} ({frame.f_code.co_name})"
+  return "<unknown>"
+
+def init_query_stats(app):
+  # Times queries with our own engine listeners rather than Flask-SQLAlchemy's
+  # SQLALCHEMY_RECORD_QUERIES, which would also keep every query of every
+  # request in memory. DB_QUERY_STATS_ENABLED counts each request's queries
+  # and reports them in X-DB-Queries/X-DB-Time; SLOW_QUERY_LOG_ENABLED logs
+  # the slow ones. Either can be on without the other.
+  count_queries = app.config.get("DB_QUERY_STATS_ENABLED")
+  log_slow = app.config.get("SLOW_QUERY_LOG_ENABLED")
+  if not count_queries and not log_slow:
+    return
+  
+  threshold = app.config.get("SLOW_QUERY_THRESHOLD_MS", 200) / 1000 if log_slow else float("inf")
+  
+  def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+  
+  def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_stats_start"].pop()
+    if not has_request_context():
+      return
+    g.query_count = g.get("query_count", 0) + 1
+    g.query_time = g.get("query_time", 0.0) + duration
+    if duration >= threshold:
+      app.logger.warning(
+        "Slow query (%.1f ms) on %s %s [%s] at %s: %s",
+        duration * 1000, request.method, request.path, request.endpoint, _query_location(), statement
+      )
+  
+  with app.app_context():
+    for engine in db.engines.values():
+      event.listen(engine, "before_cursor_execute", before_cursor_execute)
+      event.listen(engine, "after_cursor_execute", after_cursor_execute)
+  
+  # Requests made while an outer app context is pushed (as in tests) share g,
+  # so the counters are reset as each request starts.
+  @app.before_request
+  def reset_query_stats():
+    g.query_count = 0
+    g.query_time = 0.0
+  
+  @app.after_request
+  def report_query_stats(response):
+    if count_queries:
+      response.headers["X-DB-Queries"] = str(g.get("query_count", 0))
+      response.headers["X-DB-Time"] = f"{g.get('query_time', 0.0) * 1000:.2f}ms"
+    return response
+
+def assert_max_queries(client, max_queries, method, path, **kwargs):
+  response = client.open(path, method=method, **kwargs)
+  
+  if "X-DB-Queries" not in response.headers:
+    raise AssertionError("X-DB-Queries header missing; enable DB_QUERY_STATS_ENABLED")
+  
+  count = int(response.headers["X-DB-Queries"])
+  if count > max_queries:
+    raise AssertionError(f"{method} {path} issued {count} queries, expected at most {max_queries}")
+  return response
@@ -0,0 +1,163 @@
+import re
+from functools import lru_cache
+from flask import current_app, jsonify
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import fields
+from sqlalchemy.orm import aliased
+from sql.models import db
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+# Dates, times and dataclasses go through the app provider's default(), so
+# they render exactly as jsonify renders them rather than as orjson's RFC 3339.
+_ORJSON_OPTIONS = (
+  orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+  if orjson is not None else 0
+)
+
+# repr writes floats outside [1e-4, 1e16) in exponent form (1e+16, 1e-05,
+# 5e-06); orjson writes 1e16, 0.00001, 5e-6. Either shape otherwise only
+# occurs inside strings, where a match just costs the slower path. The
+# substring checks are far cheaper than the regex on large bodies.
+_EXPONENT_HINTS = (b"e-", b"e1", b"e2", b"e3", b"0.0000")
+_EXPONENT_FLOAT = re.compile(rb"\de[-\d]|0\.0000\d")
+
+def _has_exponent_float(body):
+  return any(hint in body for hint in _EXPONENT_HINTS) and _EXPONENT_FLOAT.search(body) is not None
+
+_NUMBERS = {fields.Integer: int, fields.Float: float}
+# SQLite hands back whatever was stored in an INTEGER column, so integers are
+# always coerced; text, boolean and float columns come back as the right type.
+_PASSTHROUGH = {fields.Float: float, fields.String: str, fields.Boolean: bool}
+
+def _isoformat(value):
+  return value.isoformat()
+
+def fast_serialization_enabled():
+  return current_app.config.get("FAST_SERIALIZATION_ENABLED", True)
+
+def _converter(field, column):
+  field_type = type(field)
+  python_type = column.type.python_type
+
+  if field_type in _PASSTHROUGH and _PASSTHROUGH[field_type] is python_type and not getattr(field, "as_string", False):
+    return None
+
+  if field_type in _NUMBERS and not field.as_string:
+    return _NUMBERS[field_type]
+
+  if field_type in (fields.DateTime, fields.Date) and field.format in (None, "iso", "iso8601"):
+    return _isoformat
+
+  return lambda value, field=field: field._serialize(value, None, None)
+
+
+class RowSerializer():
+  def __init__(self, schema, entity=None, prefix=""):
+    self.model = schema.opts.model
+    entity = entity if entity is not None else self.model
+    self.columns = []
+    self.keys = []
+    self.converted = []
+    self.nested = []
+    self.joins = []
+
+    for name, field in schema.dump_fields.items():
+      if isinstance(field, fields.Nested):
+        continue
+      column = getattr(entity, field.attribute or name)
+      self.keys.append(field.data_key or name)
+      self.columns.append(column.label(f"{prefix}{column.key}"))
+      convert = _converter(field, column)
+      if convert is not None:
+        self.converted.append((len(self.keys) - 1, field.data_key or name, convert))
+
+    for name, field in schema.dump_fields.items():
+      if not isinstance(field, fields.Nested):
+        continue
+      relationship = getattr(self.model, field.attribute or name)
+      if relationship.property.uselist:
+        raise ValueError(f"RowSerializer cannot flatten to-many relationship '{name}'")
+
+      target = aliased(relationship.property.mapper.class_)
+      child = RowSerializer(field.schema, entity=target, prefix=f"{prefix}{name}__")
+      if child.nested:
+        raise ValueError(f"RowSerializer supports one level of nesting, '{name}' nests further")
+
+      self.nested.append((field.data_key or name, len(self.columns), child))
+      self.columns += child.columns
+      self.joins.append(getattr(entity, relationship.key).of_type(target))
+
+    self.width = len(self.keys)
+
+  def query(self):
+    query = db.session.query(*self.columns).select_from(self.model)
+    for onclause in self.joins:
+      query = query.outerjoin(onclause)
+    return query
+
+  def _dump_row(self, row, offset=0):
+    item = dict(zip(self.keys, row[offset:offset + self.width]))
+    for index, key, convert in self.converted:
+      value = item[key]
+      if value is not None:
+        item[key] = convert(value)
+    for key, position, child in self.nested:
+      # An outer join with no match yields all-null columns, which marshmallow
+      # dumps as a null nested object.
+      start = offset + position
+      if all(value is None for value in row[start:start + child.width]):
+        item[key] = None
+      else:
+        item[key] = child._dump_row(row, start)
+    return item
+
+  def dump(self, rows):
+    return [self._dump_row(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def row_serializer(schema):
+  return RowSerializer(schema)
+
+def list_query(schema):
+  if fast_serialization_enabled():
+    return row_serializer(schema).query()
+  return schema.opts.model.query
+
+def dump_list(schema, rows):
+  if fast_serialization_enabled():
+    return row_serializer(schema).dump(rows)
+  return schema.dump(rows)
+
+def json_response(payload):
+  app = current_app
+  provider = app.json
+  if (
+    orjson is None
+    or not fast_serialization_enabled()
+    or type(provider) is not DefaultJSONProvider
+    or not provider.sort_keys
+    or not provider.ensure_ascii
+  ):
+    return jsonify(payload)
+
+  option = _ORJSON_OPTIONS
+  if (provider.compact is None and app.debug) or provider.compact is False:
+    # Same layout as the provider's indent=2 output.
+    option |= orjson.OPT_INDENT_2
+
+  try:
+    body = orjson.dumps(payload, default=provider.default, option=option)
+  except orjson.JSONEncodeError:
+    return jsonify(payload)
+
+  # orjson has no ensure_ascii, so bodies it leaves unescaped (non-ASCII text,
+  # U+007F) go through the provider, as do exponent floats.
+  if not body.isascii() or b"\x7f" in body or _has_exponent_float(body):
+    return jsonify(payload)
+
+  return app.response_class(body + b"\n", mimetype=provider.mimetype)
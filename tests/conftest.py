@@ -0,0 +1,49 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import pytest
+import config
+from sql import create_app
+from sql.models import User, UserRole, db
+from sql.utils.auth import generate_token
+
+@pytest.fixture
+def query_counting(monkeypatch):
+  # Request before `app` (usefixtures does) so create_app sees it.
+  monkeypatch.setattr(config.DevelopmentConfig, "DB_QUERY_STATS_ENABLED", True, raising=False)
+
+@pytest.fixture
+def app():
+  app = create_app("DevelopmentConfig")
+  app.config.update(TESTING=True, DEBUG=False, BCRYPT_LOG_ROUNDS=4)
+  with app.app_context():
+    db.create_all()
+    yield app
+    db.session.remove()
+    db.drop_all()
+
+@pytest.fixture
+def client(app):
+  return app.test_client()
+
+def make_user(role, name, email, **fields):
+  user = User(name=name, email=email, password="x", role=role, **fields)
+  db.session.add(user)
+  db.session.commit()
+  return user
+
+def auth(user):
+  return {"Authorization": f"Bearer {generate_token(user)}"}
+
+@pytest.fixture
+def doctor(app):
+  return make_user(UserRole.DOCTOR, "Dr. Jane Smith", "doctor@test.com")
+
+@pytest.fixture
+def patient(app):
+  return make_user(UserRole.PATIENT, "John Doe", "patient@test.com")
@@ -0,0 +1,38 @@
+import statistics
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from sqlalchemy import insert
+from sql.blueprints.vitals import anomalies
+from sql.blueprints.vitals.anomalies import AnomalyDetector, get_anomaly_detector
+from sql.models import HeartRate, Weight, db
+from tests.conftest import auth
+
+def seed(model, patient, values):
+  start = datetime.now(timezone.utc) - timedelta(days=1)
+  db.session.execute(insert(model), [
+    {"patient_id": patient.id, "value": value, "recorded_at": start + timedelta(minutes=i)}
+    for i, value in enumerate(values)
+  ])
+  db.session.commit()
+
+def test_cold_start_variance_is_exact_for_large_values(app, patient):
+  values = [1e8 + i * 0.1 for i in range(10)]
+  seed(Weight, patient, values)
+  state, = AnomalyDetector()._cold_start(Weight, [{"patient_id": patient.id, "value": 1e8}])[(patient.id, Weight)]
+  assert state.count == 10
+  assert abs(state.stddev() - statistics.stdev(values)) < 1e-6
+
+def test_committed_reading_is_counted_once(client, patient):
+  seed(HeartRate, patient, [70 + i % 5 for i in range(20)])
+  response = client.post(f"/heartrate/{patient.id}", headers=auth(patient), json={"value": 72})
+  assert response.status_code == 201
+
+  state, = get_anomaly_detector()._states[(patient.id, HeartRate)]
+  assert state.count == 21
+  assert abs(state.mean - statistics.mean([70 + i % 5 for i in range(20)] + [72])) < 1e-9
+
+def test_detection_failure_does_not_fail_the_request(client, patient):
+  with mock.patch.object(anomalies.AnomalyDetector, "observe", side_effect=RuntimeError("boom")):
+    response = client.post(f"/heartrate/{patient.id}", headers=auth(patient), json={"value": 72})
+  assert response.status_code == 201
+  assert db.session.query(HeartRate).count() == 1
@@ -0,0 +1,64 @@
+import threading
+from unittest import mock
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+from sql.blueprints.appointment.reminders import ReminderScheduler, reminder_backlog
+from sql.blueprints.notifications.hub import NotificationHub
+from sql.models import Appointment, AppointmentReminder, Notifications, UserRole, db
+from tests.conftest import auth, make_user
+
+def book(doctor, patient, starts):
+  appointment = Appointment(doctor_id=doctor.id, patient_id=patient.id, appointment_time=starts, notes="Checkup", reason="Follow-up")
+  db.session.add(appointment)
+  db.session.commit()
+  return appointment
+
+def test_create_app_starts_no_scheduler(app):
+  assert not any(thread.name == "appointment-reminders" for thread in threading.enumerate())
+
+def test_backlog_counts_due_unsent_reminders(app, doctor, patient):
+  now = datetime.now(timezone.utc)
+  # Due 5 minutes ago (60 minute offset), and one not due for an hour.
+  book(doctor, patient, now + timedelta(minutes=55))
+  book(doctor, patient, now + timedelta(minutes=120))
+  backlog = reminder_backlog()
+  assert backlog == {"overdue": 1, "last_sent_at": None}
+
+  admin = make_user(UserRole.ADMIN, "Admin", "admin@test.com")
+  response = app.test_client().get("/monitoring/appointment-reminders", headers=auth(admin))
+  assert response.status_code == 200
+  assert response.get_json()["overdue"] == 1
+
+def test_reload_does_not_requeue_handled_reminders(app, doctor, patient):
+  now = datetime.now(timezone.utc)
+  book(doctor, patient, now + timedelta(minutes=55))
+  scheduler = ReminderScheduler(app, offsets=(60,))
+  scheduler._load(now + scheduler.horizon, now)
+  scheduler._send(scheduler._pop_due(now + timedelta(seconds=1)))
+  assert scheduler.stats()["sent"] == 1
+
+  scheduler._load(now + scheduler.horizon, now)
+  assert scheduler.stats()["queued"] == 0
+  assert db.session.scalar(select(func.count()).select_from(AppointmentReminder)) == 1
+  assert db.session.scalar(select(func.count()).select_from(Notifications)) == 1
+  assert reminder_backlog()["overdue"] == 0
+
+def test_reminder_reaches_a_stream_opened_on_another_process(app, client, doctor, patient):
+  app.config["NOTIFICATIONS_STREAM_HEARTBEAT"] = 0.01
+  now = datetime.now(timezone.utc)
+  book(doctor, patient, now + timedelta(minutes=55))
+  response = client.get("/notifications/stream", headers=auth(patient), buffered=False)
+  stream = iter(response.response)
+  try:
+    assert next(stream).startswith(b"retry:")
+    assert next(stream) == b": keep-alive\n\n"
+    # The scheduler's hub is its own, as in the send-reminders process.
+    scheduler = ReminderScheduler(app, offsets=(60,))
+    with mock.patch("sql.blueprints.notifications.fanout.get_notification_hub", return_value=NotificationHub()):
+      scheduler._load(now + scheduler.horizon, now)
+      scheduler._send(scheduler._pop_due(now + timedelta(seconds=1)))
+    chunk = next(stream).decode()
+    assert "event: notification" in chunk
+    assert "Reminder: appointment with Dr. Jane Smith" in chunk
+  finally:
+    response.close()
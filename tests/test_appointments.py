@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+from sql.blueprints.appointment.scheduling import find_conflicts, free_slots
+from sql.models import Appointment, AppointmentStatus, UserRole, db
+from tests.conftest import auth, make_user
+
+def next_monday(hour, minute=0):
+  today = datetime.now(timezone.utc).date()
+  day = today + timedelta(days=7 - today.weekday())
+  return datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc)
+
+def book(doctor, patient, starts, minutes=30, status=AppointmentStatus.SCHEDULED):
+  appointment = Appointment(doctor_id=doctor.id, patient_id=patient.id, appointment_time=starts,
+                            duration_minutes=minutes, reason="Checkup", notes="", status=status)
+  db.session.add(appointment)
+  db.session.commit()
+  return appointment
+
+def request_booking(client, user, doctor, starts, minutes=30):
+  return client.post("/appointments/", headers=auth(user), json={
+    "doctor_id": doctor.id, "appointment_time": starts.isoformat(), "duration_minutes": minutes, "reason": "Checkup"
+  })
+
+def test_conflicts_are_reported_per_participant(app, doctor, patient):
+  other_patient = make_user(UserRole.PATIENT, "Ann Lee", "ann@test.com")
+  start = next_monday(10)
+  existing = book(doctor, other_patient, start, 60)
+  assert find_conflicts(doctor.id, patient.id, start + timedelta(minutes=30), start + timedelta(minutes=90)) == {"doctor": [existing.id]}
+  assert find_conflicts(doctor.id, other_patient.id, start - timedelta(minutes=15), start + timedelta(minutes=15)) == {
+    "doctor": [existing.id], "patient": [existing.id]
+  }
+
+def test_appointments_that_only_touch_do_not_conflict(app, doctor, patient):
+  start = next_monday(10)
+  book(doctor, patient, start, 60)
+  assert find_conflicts(doctor.id, patient.id, start + timedelta(minutes=60), start + timedelta(minutes=90)) == {}
+  assert find_conflicts(doctor.id, patient.id, start - timedelta(minutes=30), start) == {}
+
+def test_cancelled_appointments_free_their_time(app, doctor, patient):
+  start = next_monday(10)
+  book(doctor, patient, start, 60, status=AppointmentStatus.CANCELLED)
+  assert find_conflicts(doctor.id, patient.id, start, start + timedelta(minutes=30)) == {}
+
+def test_free_slots_skip_busy_time(app, doctor, patient):
+  app.config.update(APPOINTMENT_DAY_START="09:00", APPOINTMENT_DAY_END="12:00")
+  day = next_monday(9)
+  book(doctor, patient, day + timedelta(minutes=30), 45)
+  book(doctor, patient, day + timedelta(minutes=70), 30)
+  slots = free_slots(doctor.id, day, day + timedelta(hours=3), timedelta(minutes=30), timedelta(minutes=15))
+  starts = [f"{begins:%H:%M}" for begins, _ in slots]
+  assert starts == ["09:00", "10:45", "11:00", "11:15", "11:30"]
+
+def test_booking_enforces_the_configured_max_duration(app, client, doctor, patient):
+  app.config["APPOINTMENT_MAX_DURATION_MINUTES"] = 60
+  response = request_booking(client, patient, doctor, next_monday(10), 90)
+  assert response.status_code == 400
+  assert "duration_minutes" in response.get_json()["message"]
+  assert request_booking(client, patient, doctor, next_monday(10), 60).status_code == 201
+
+def test_overlapping_booking_is_rejected(client, doctor, patient):
+  assert request_booking(client, patient, doctor, next_monday(10)).status_code == 201
+  response = request_booking(client, patient, doctor, next_monday(10, 15))
+  assert response.status_code == 409
+  assert set(response.get_json()["conflicts"]) == {"doctor", "patient"}
+
+def test_status_transitions(client, doctor, patient):
+  appointment = book(doctor, patient, next_monday(10))
+  url = f"/appointments/{appointment.id}/status"
+  assert client.patch(url, headers=auth(patient), json={"status": "completed"}).status_code == 403
+  assert client.patch(url, headers=auth(patient), json={"status": "cancelled"}).status_code == 200
+  assert client.patch(url, headers=auth(doctor), json={"status": "completed"}).status_code == 409
+  stranger = make_user(UserRole.DOCTOR, "Dr. Other", "other@test.com")
+  assert client.patch(url, headers=auth(stranger), json={"status": "cancelled"}).status_code == 404
+
+def test_bulk_no_show_only_marks_started_appointments(client, doctor, patient):
+  now = datetime.now(timezone.utc)
+  past = book(doctor, patient, now - timedelta(hours=2))
+  done = book(doctor, patient, now - timedelta(hours=1), status=AppointmentStatus.COMPLETED)
+  future = book(doctor, patient, now + timedelta(hours=2))
+  response = client.post("/appointments/status", headers=auth(doctor), json={
+    "status": "no_show", "ids": [past.id, done.id, future.id]
+  })
+  assert response.get_json() == {"updated": 1, "status": "no_show"}
+  db.session.expire_all()
+  assert [db.session.get(Appointment, a.id).status for a in (past, done, future)] == [
+    AppointmentStatus.NO_SHOW, AppointmentStatus.COMPLETED, AppointmentStatus.SCHEDULED
+  ]
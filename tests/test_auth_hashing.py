@@ -0,0 +1,56 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sql.models import db
+from sql.utils.auth import _run_hash_task, check_password, hash_password
+
+def test_hash_round_trip(app):
+  hashed = hash_password("hunter2")
+  assert check_password("hunter2", hashed)
+  assert not check_password("hunter3", hashed)
+
+def test_concurrent_hashes_are_capped(app):
+  app.config["PASSWORD_HASH_CONCURRENCY"] = 2
+  lock = threading.Lock()
+  running = peak = 0
+
+  def fake_hash():
+    nonlocal running, peak
+    with lock:
+      running += 1
+      peak = max(peak, running)
+    time.sleep(0.02)
+    with lock:
+      running -= 1
+
+  def task(_):
+    with app.app_context():
+      _run_hash_task(fake_hash)
+
+  with ThreadPoolExecutor(max_workers=8) as pool:
+    list(pool.map(task, range(16)))
+  assert peak == 2
+
+def login(client, password):
+  return client.post("/users/login", json={"email": "patient@test.com", "password": password})
+
+def test_login_upgrades_a_low_cost_hash(app, client, patient):
+  patient.password = hash_password("hunter2")
+  db.session.commit()
+  app.config["BCRYPT_LOG_ROUNDS"] = 5
+
+  assert login(client, "hunter3").status_code == 401
+  assert patient.password.split("$")[2] == "04"
+
+  assert login(client, "hunter2").status_code == 200
+  db.session.refresh(patient)
+  assert patient.password.split("$")[2] == "05"
+  assert check_password("hunter2", patient.password)
+
+def test_login_keeps_a_current_hash(app, client, patient):
+  patient.password = stored = hash_password("hunter2")
+  db.session.commit()
+
+  assert login(client, "hunter2").status_code == 200
+  db.session.refresh(patient)
+  assert patient.password == stored
@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+SUITE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "run_suite.py")
+TINY = ["--doctors=2", "--patients=4", "--years=1", "--readings-per-day=1", "--iterations=2",
+        "--login-iterations=1", "--batch-size=5", "--bcrypt-rounds=4"]
+
+def run_suite(*args):
+  return subprocess.run([sys.executable, SUITE, *TINY, *args], capture_output=True, text=True, timeout=300)
+
+def test_suite_runs_on_a_tiny_population(tmp_path):
+  output = tmp_path / "results.json"
+  run = run_suite(f"--output={output}")
+  assert run.returncode == 0, run.stderr
+
+  results = json.loads(output.read_text())
+  assert set(results["backends"]) == {"memory", "file"}
+  for backend in results["backends"].values():
+    assert backend["population"]["doctors"] == 2 and backend["population"]["patients"] == 4
+    assert backend["population"]["heart_rates"] == 4 * 365
+    assert set(backend["benchmarks"]) == {
+      "login", "ingest_batch", "ingest_row", "list_blood_pressure", "list_users", "list_goals",
+      "list_medications", "cohort_lookup"
+    }
+    assert all(stats["p50_ms"] > 0 for stats in backend["benchmarks"].values())
+
+  rerun = run_suite("--backend=memory", f"--output={tmp_path / 'again.json'}", f"--compare={output}", "--threshold=1000")
+  assert rerun.returncode == 0, rerun.stderr
+  assert "list_users" in rerun.stdout and "REGRESSION" not in rerun.stdout
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+import config
+from sql import create_app
+from sql.models import db
+from sql.utils.db_pool import InstrumentedQueuePool
+
+def test_config_module_does_not_import_the_app():
+  root = os.path.join(os.path.dirname(__file__), "..")
+  code = "import sys, config; print(any(name == 'sql' or name.startswith('sql.') for name in sys.modules))"
+  result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+  assert result.stdout.strip() == "False"
+
+def test_production_uses_the_instrumented_pool(tmp_path, monkeypatch):
+  monkeypatch.setattr(config.ProductionConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'prod.db'}")
+  monkeypatch.setattr(config.ProductionConfig, "CACHE_TYPE", "NullCache", raising=False)
+  app = create_app("ProductionConfig")
+  with app.app_context():
+    assert isinstance(db.engine.pool, InstrumentedQueuePool)
@@ -0,0 +1,31 @@
+from datetime import date, datetime, timedelta
+import pytest
+from sql.models import BloodPressure, Diagnosis, Goal, HeartRate, Medication, UserRole, db, normalize_diagnosis_name
+from sql.utils.query_stats import assert_max_queries
+from tests.conftest import auth, make_user
+
+def seed(patient, doctors):
+  start = datetime(2025, 1, 1)
+  for i, doctor in enumerate(doctors * 3):
+    db.session.add(Medication(patient_id=patient.id, name=f"Med {i}", dosage="10mg", frequency="daily", prescribed_by_id=doctor.id))
+    db.session.add(Goal(patient_id=patient.id, created_by=doctor.id, title=f"Goal {i}", description="d", target_date=date(2026, 1, 1)))
+    db.session.add(Diagnosis(patient_id=patient.id, doctor_id=doctor.id, diagnosis_name=f"Condition {i}",
+                             diagnosis_name_normalized=normalize_diagnosis_name(f"Condition {i}"), diagnosis_code="X00",
+                             diagnosis_date=date(2024, 1, 1 + i), notes="n"))
+    db.session.add(HeartRate(patient_id=patient.id, value=60 + i, recorded_at=start + timedelta(hours=i)))
+    db.session.add(BloodPressure(patient_id=patient.id, systolic=120 + i, diastolic=80, recorded_at=start + timedelta(hours=i)))
+  db.session.commit()
+
+@pytest.mark.usefixtures("query_counting")
+def test_dashboard_query_count_does_not_grow_with_the_data(client, doctor, patient):
+  doctors = [doctor] + [make_user(UserRole.DOCTOR, f"Dr. {i}", f"doctor{i}@test.com") for i in range(3)]
+  seed(patient, doctors)
+
+  body = assert_max_queries(client, 5, "GET", f"/dashboard/{patient.id}", headers=auth(doctor)).get_json()
+  assert len(body["active_medications"]) == 12
+  assert len(body["recent_diagnoses"]) == 5
+  assert body["latest_vitals"]["heart_rate"]["value"] == 71
+  assert body["latest_vitals"]["weight"] is None
+
+  mine = assert_max_queries(client, 5, "GET", "/dashboard/me", headers=auth(patient)).get_json()
+  assert mine == body
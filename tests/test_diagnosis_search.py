@@ -0,0 +1,105 @@
+from datetime import date
+from unittest import mock
+import pytest
+from sql.blueprints.diagnosis.search import DiagnosisSearchIndex, get_diagnosis_index
+from sql.models import Diagnosis, UserRole, db, normalize_diagnosis_name
+from sql.utils.query_stats import assert_max_queries
+from tests.conftest import auth, make_user
+
+def add_diagnosis(patient, doctor, name, notes, **fields):
+  diagnosis = Diagnosis(patient_id=patient.id, doctor_id=doctor.id, diagnosis_name=name,
+                        diagnosis_name_normalized=normalize_diagnosis_name(name), diagnosis_code="I10",
+                        diagnosis_date=date(2024, 1, 1), notes=notes, **fields)
+  db.session.add(diagnosis)
+  db.session.commit()
+  return diagnosis
+
+def test_autocomplete_only_suggests_the_callers_diagnoses(client, doctor, patient):
+  other = make_user(UserRole.DOCTOR, "Dr. Other", "other@test.com")
+  add_diagnosis(patient, other, "Hyperthyroidism", "private")
+  add_diagnosis(patient, doctor, "Hypertension", "stable")
+
+  response = client.get("/diagnoses/autocomplete?q=hyper", headers=auth(doctor))
+  assert [item["value"] for item in response.get_json()["names"]] == ["Hypertension"]
+
+def test_search_only_returns_the_callers_notes(client, doctor, patient):
+  other = make_user(UserRole.DOCTOR, "Dr. Other", "other@test.com")
+  add_diagnosis(patient, other, "Asthma", "started inhaler")
+  mine = add_diagnosis(patient, doctor, "Asthma", "started inhaler today")
+
+  response = client.get("/diagnoses/search?q=started inhaler", headers=auth(doctor))
+  body = response.get_json()
+  assert [item["id"] for item in body] == [mine.id]
+  assert body[0]["patient"]["name"] == "John Doe"
+  assert body[0]["doctor"]["id"] == doctor.id
+
+def test_catch_up_rescans_ids_committed_out_of_order(app, doctor, patient):
+  index = get_diagnosis_index()
+  add_diagnosis(patient, doctor, "Asthma", "wheeze", id=10)
+  index.catch_up(force=True)
+  add_diagnosis(patient, doctor, "Anemia", "wheeze", id=5)
+  index.catch_up(force=True)
+  index.catch_up(force=True)
+
+  assert index.matching_note_ids("wheeze", doctor.id) == [10, 5]
+  assert index.autocomplete("a", doctor.id)["names"] == [
+    {"value": "Anemia", "count": 1}, {"value": "Asthma", "count": 1}
+  ]
+
+def test_lookups_before_the_build_match_the_index(app, doctor, patient):
+  add_diagnosis(patient, doctor, "Asthma", "wheeze at night")
+  add_diagnosis(patient, doctor, "Asthma", "night cough")
+  add_diagnosis(patient, doctor, "Anemia", "tired, wheeze")
+  index = DiagnosisSearchIndex(index_notes=True)
+  before = (index.autocomplete("a", doctor.id), index.autocomplete("i1", doctor.id), index.matching_note_ids("night wheeze", doctor.id))
+
+  index._build(app)
+  assert index.ready.is_set()
+  assert (index.autocomplete("a", doctor.id), index.autocomplete("i1", doctor.id), index.matching_note_ids("night wheeze", doctor.id)) == before
+  assert before[0]["names"] == [{"value": "Anemia", "count": 1}, {"value": "Asthma", "count": 2}]
+
+def test_create_survives_an_index_failure(client, app, doctor, patient):
+  index = get_diagnosis_index()
+  index.ready.wait(5)
+  with mock.patch.object(DiagnosisSearchIndex, "catch_up", side_effect=RuntimeError("index broke")):
+    response = client.post(f"/diagnoses/{patient.id}", headers=auth(doctor), json={
+      "diagnosis_name": "Asthma", "diagnosis_code": "J45", "diagnosis_date": "2024-01-01", "notes": "inhaler"
+    })
+  assert response.status_code == 201
+  assert db.session.query(Diagnosis).count() == 1
+
+def test_cohort_pages_with_its_own_cap(app, client, doctor):
+  app.config["DIAGNOSIS_PATIENTS_PAGE_MAX_SIZE"] = 2
+  app.config["USERS_PAGE_MAX_SIZE"] = 1
+  other = make_user(UserRole.DOCTOR, "Dr. Other", "other@test.com")
+  patients = [make_user(UserRole.PATIENT, f"Patient {i}", f"p{i}@test.com") for i in range(5)]
+  for patient in patients[:4]:
+    add_diagnosis(patient, doctor, "Type 2 Diabetes", "n")
+  add_diagnosis(patients[4], other, "Type 2 Diabetes", "n")
+  patients[3].is_active = False
+  db.session.commit()
+
+  seen, cursor = [], ""
+  while True:
+    body = client.get(f"/diagnoses/patients/type 2 diabetes?limit=50&cursor={cursor}", headers=auth(doctor)).get_json()
+    assert len(body["items"]) <= 2
+    seen += [item["id"] for item in body["items"]]
+    cursor = body["next_cursor"]
+    if cursor is None:
+      break
+  assert seen == [p.id for p in patients[:3]]
+
+def test_cohort_rejects_bad_limit_and_cursor(client, doctor, patient):
+  add_diagnosis(patient, doctor, "Asthma", "n")
+  for query in ("limit=abc", "limit=0", "cursor=nope"):
+    assert client.get(f"/diagnoses/patients/asthma?{query}", headers=auth(doctor)).status_code == 400, query
+
+@pytest.mark.usefixtures("query_counting")
+def test_cohort_page_is_one_query(client, doctor):
+  for i in range(6):
+    add_diagnosis(make_user(UserRole.PATIENT, f"Patient {i}", f"p{i}@test.com"), doctor, "Asthma", "n")
+
+  # Auth is token-only, so the page is the only query however many patients it holds.
+  for limit in (2, 50):
+    response = assert_max_queries(client, 1, "GET", f"/diagnoses/patients/asthma?limit={limit}", headers=auth(doctor))
+    assert len(response.get_json()["items"]) == min(limit, 6)
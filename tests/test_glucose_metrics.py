@@ -0,0 +1,24 @@
+from datetime import datetime, timedelta, timezone
+from sql.models import Glucose, db
+from tests.conftest import auth
+
+def test_utc_offset_is_echoed(client, patient):
+  db.session.add(Glucose(patient_id=patient.id, value=110, recorded_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+  db.session.commit()
+  response = client.get(f"/vitals/{patient.id}/glucose-metrics?utc_offset=-300", headers=auth(patient))
+  assert response.status_code == 200
+  assert response.get_json()["utc_offset"] == -300
+
+def test_unparseable_utc_offset_is_rejected(client, patient):
+  for value in ("abc", "5.5", "", "900"):
+    response = client.get(f"/vitals/{patient.id}/glucose-metrics?utc_offset={value}", headers=auth(patient))
+    assert response.status_code == 400, value
+    assert "utc_offset" in response.get_json()["message"]
+
+def test_zero_mean_has_no_cv(client, patient):
+  db.session.add(Glucose(patient_id=patient.id, value=0, recorded_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+  db.session.commit()
+  response = client.get(f"/vitals/{patient.id}/glucose-metrics", headers=auth(patient))
+  assert response.status_code == 200
+  body = response.get_json()
+  assert (body["mean"], body["cv_percent"]) == (0.0, None)
@@ -0,0 +1,15 @@
+from sql.blueprints.notifications.hub import NotificationHub
+
+def test_overflow_is_counted_once_per_resync():
+  hub = NotificationHub(max_queue=2)
+  subscription = hub.subscribe(1)
+  hub.publish([(1, {"id": i}) for i in range(1, 6)])
+  assert hub.stats()["overflows"] == 1
+  assert hub.stats()["published"] == 2
+
+  events, overflowed = subscription.wait(0)
+  assert (events, overflowed) == ([], True)
+
+  hub.publish([(1, {"id": 6})])
+  assert subscription.wait(0) == ([{"id": 6}], False)
+  assert hub.stats()["overflows"] == 1
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from sql.models import Notifications, db
+from tests.conftest import auth
+
+def add_notification(user, message):
+  notification = Notifications(user_id=user.id, message=message, is_read=False, created_at=datetime.now(timezone.utc))
+  db.session.add(notification)
+  db.session.commit()
+  return notification.id
+
+def open_stream(client, user, **headers):
+  response = client.get("/notifications/stream", headers={**auth(user), **headers}, buffered=False)
+  assert response.status_code == 200
+  return response, iter(response.response)
+
+def event_ids(chunks):
+  return [int(chunk.split("\n", 1)[0][4:]) for chunk in chunks]
+
+def read(stream, n):
+  return [chunk.decode() if isinstance(chunk, bytes) else chunk for _, chunk in zip(range(n), stream)]
+
+def test_stream_resumes_after_last_event_id(app, client, patient):
+  ids = [add_notification(patient, f"Message {i}") for i in range(3)]
+  response, stream = open_stream(client, patient, **{"Last-Event-ID": str(ids[0])})
+  try:
+    retry, *events = read(stream, 3)
+    assert retry.startswith("retry:")
+    assert event_ids(events) == ids[1:]
+  finally:
+    response.close()
+
+def test_idle_heartbeat_delivers_notifications_committed_elsewhere(app, client, patient):
+  app.config["NOTIFICATIONS_STREAM_HEARTBEAT"] = 0.01
+  add_notification(patient, "Old")
+  response, stream = open_stream(client, patient)
+  try:
+    assert read(stream, 2)[1] == ": keep-alive\n\n"
+    # Written straight to the database, as another worker or process would.
+    new_id = add_notification(patient, "Reminder")
+    assert event_ids(read(stream, 1)) == [new_id]
+  finally:
+    response.close()
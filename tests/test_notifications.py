@@ -0,0 +1,66 @@
+from datetime import date
+from sql.models import Diagnosis, Notifications, UserRole, db, normalize_diagnosis_name
+from tests.conftest import auth, make_user
+
+def diagnose(patient, doctor):
+  db.session.add(Diagnosis(patient_id=patient.id, doctor_id=doctor.id, diagnosis_name="Asthma",
+                           diagnosis_name_normalized=normalize_diagnosis_name("Asthma"), diagnosis_code="J45",
+                           diagnosis_date=date(2024, 1, 1), notes=""))
+  db.session.commit()
+
+def send(client, user, user_ids):
+  return client.post("/notifications/", json={"user_ids": user_ids, "message": "Please book a follow-up"}, headers=auth(user))
+
+def test_doctor_can_notify_their_own_patients(client, doctor, patient):
+  diagnose(patient, doctor)
+  response = send(client, doctor, [patient.id])
+  assert response.status_code == 201
+  assert response.get_json() == {"sent": 1}
+
+def test_doctor_cannot_notify_someone_elses_patient(client, doctor, patient):
+  other = make_user(UserRole.DOCTOR, "Dr. Other", "other@test.com")
+  diagnose(patient, other)
+  response = send(client, doctor, [patient.id])
+  assert response.status_code == 403
+  assert db.session.query(Notifications).count() == 0
+
+def test_admin_can_notify_anyone(client, patient):
+  admin = make_user(UserRole.ADMIN, "Admin", "admin@test.com")
+  assert send(client, admin, [patient.id]).status_code == 201
+
+def unread(client, user):
+  return client.get("/notifications/unread-count", headers=auth(user)).get_json()["unread"]
+
+def notification_ids(user):
+  return [n.id for n in Notifications.query.filter_by(user_id=user.id).order_by(Notifications.id)]
+
+def test_fan_out_increments_each_recipients_count(client, doctor, patient):
+  other = make_user(UserRole.PATIENT, "Ann Lee", "ann@test.com")
+  admin = make_user(UserRole.ADMIN, "Admin", "admin@test.com")
+  send(client, admin, [patient.id, other.id])
+  send(client, admin, [patient.id])
+  db.session.expire_all()
+  assert (patient.unread_notifications, other.unread_notifications) == (2, 1)
+  assert (unread(client, patient), unread(client, other)) == (2, 1)
+
+def test_mark_read_decrements_only_for_rows_it_flips(client, patient):
+  admin = make_user(UserRole.ADMIN, "Admin", "admin@test.com")
+  other = make_user(UserRole.PATIENT, "Ann Lee", "ann@test.com")
+  for _ in range(3):
+    send(client, admin, [patient.id, other.id])
+  mine, theirs = notification_ids(patient), notification_ids(other)
+  assert unread(client, patient) == 3
+
+  # Partial, with someone else's id mixed in: only the caller's row counts.
+  response = client.post("/notifications/read", headers=auth(patient), json={"ids": [mine[0], theirs[0]]})
+  assert response.get_json() == {"updated": 1, "unread": 2}
+  # Already read: nothing changes.
+  response = client.post("/notifications/read", headers=auth(patient), json={"ids": [mine[0]]})
+  assert response.get_json() == {"updated": 0, "unread": 2}
+  # The cached count is invalidated by the mark-read.
+  assert unread(client, patient) == 2
+  assert unread(client, other) == 3
+
+  response = client.post("/notifications/read", headers=auth(patient), json={"all": True})
+  assert response.get_json()["unread"] == 0
+  assert unread(client, patient) == 0
@@ -0,0 +1,50 @@
+import pytest
+import config
+from sql import create_app
+from sql.models import UserRole, db
+from sql.utils.query_stats import assert_max_queries
+from tests.conftest import auth, make_user
+
+def make_app(monkeypatch, count=False, log_slow=False):
+  monkeypatch.setattr(config.DevelopmentConfig, "DB_QUERY_STATS_ENABLED", count, raising=False)
+  monkeypatch.setattr(config.DevelopmentConfig, "SLOW_QUERY_LOG_ENABLED", log_slow, raising=False)
+  app = create_app("DevelopmentConfig")
+  app.config.update(TESTING=True, DEBUG=False)
+  return app
+
+def get_me(app):
+  with app.app_context():
+    db.create_all()
+    patient = make_user(UserRole.PATIENT, "John Doe", "patient@test.com")
+    response = app.test_client().get("/users/me", headers=auth(patient))
+    db.drop_all()
+  return response
+
+def test_query_counting_works_without_the_slow_query_log(monkeypatch):
+  app = make_app(monkeypatch, count=True)
+  assert not app.config.get("SQLALCHEMY_RECORD_QUERIES")
+  response = get_me(app)
+  assert response.status_code == 200
+  assert int(response.headers["X-DB-Queries"]) >= 1
+  assert response.headers["X-DB-Time"].endswith("ms")
+
+def test_slow_query_log_alone_adds_no_headers(monkeypatch):
+  assert "X-DB-Queries" not in get_me(make_app(monkeypatch, log_slow=True)).headers
+  assert "X-DB-Queries" not in get_me(make_app(monkeypatch)).headers
+
+def test_slow_queries_are_logged_with_their_endpoint(monkeypatch, caplog):
+  monkeypatch.setattr(config.DevelopmentConfig, "SLOW_QUERY_THRESHOLD_MS", 0, raising=False)
+  get_me(make_app(monkeypatch, log_slow=True))
+  assert any("Slow query" in r.getMessage() and "/users/" in r.getMessage() for r in caplog.records)
+
+@pytest.mark.usefixtures("query_counting")
+def test_assert_max_queries(client, patient):
+  response = assert_max_queries(client, 10, "GET", "/notifications/", headers=auth(patient))
+  count = int(response.headers["X-DB-Queries"])
+  assert count >= 1
+  with pytest.raises(AssertionError, match=f"issued {count} queries, expected at most {count - 1}"):
+    assert_max_queries(client, count - 1, "GET", "/notifications/", headers=auth(patient))
+
+def test_assert_max_queries_needs_counting(client, patient):
+  with pytest.raises(AssertionError, match="DB_QUERY_STATS_ENABLED"):
+    assert_max_queries(client, 10, "GET", "/users/me", headers=auth(patient))
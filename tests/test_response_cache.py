@@ -0,0 +1,76 @@
+import pytest
+import config
+from sql import create_app
+from sql.models import UserRole, db
+from sql.utils.cache import cached_patient_resource, invalidate_patient
+from tests.conftest import auth, make_user
+
+def test_read_after_write_is_fresh(client, patient):
+  assert client.get("/users/me", headers=auth(patient)).get_json()["name"] == "John Doe"
+  client.patch("/users/me", json={"name": "Johnny Doe"}, headers=auth(patient))
+  assert client.get("/users/me", headers=auth(patient)).get_json()["name"] == "Johnny Doe"
+
+def test_write_on_one_worker_is_seen_by_another(tmp_path, monkeypatch):
+  # Two apps stand in for two workers: same database, same shared cache.
+  monkeypatch.setattr(config.DevelopmentConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}", raising=False)
+  monkeypatch.setattr(config.DevelopmentConfig, "CACHE_TYPE", "FileSystemCache", raising=False)
+  monkeypatch.setattr(config.DevelopmentConfig, "CACHE_DIR", str(tmp_path / "cache"), raising=False)
+  first, second = create_app("DevelopmentConfig"), create_app("DevelopmentConfig")
+  with first.app_context():
+    db.create_all()
+    headers = auth(make_user(UserRole.PATIENT, "John Doe", "patient@test.com"))
+
+  assert second.test_client().get("/users/me", headers=headers).get_json()["name"] == "John Doe"
+  assert first.test_client().patch("/users/me", json={"name": "Johnny Doe"}, headers=headers).status_code == 200
+  assert second.test_client().get("/users/me", headers=headers).get_json()["name"] == "Johnny Doe"
+
+def test_production_refuses_a_per_process_cache(monkeypatch):
+  monkeypatch.setattr(config.ProductionConfig, "CACHE_TYPE", "SimpleCache", raising=False)
+  with pytest.raises(RuntimeError, match="shared backend"):
+    create_app("ProductionConfig")
+
+def test_write_changes_the_etag_of_a_conditional_get(client, patient):
+  etag = client.get("/users/me", headers=auth(patient)).headers["ETag"]
+  assert client.get("/users/me", headers={**auth(patient), "If-None-Match": etag}).status_code == 304
+
+  client.patch("/users/me", json={"name": "Johnny Doe"}, headers=auth(patient))
+  response = client.get("/users/me", headers={**auth(patient), "If-None-Match": etag})
+  assert response.status_code == 200
+  assert response.get_json()["name"] == "Johnny Doe"
+  assert response.headers["ETag"] != etag
+
+def test_workers_agree_on_the_etag(tmp_path, monkeypatch):
+  # Two apps stand in for two workers: same database, same shared cache.
+  monkeypatch.setattr(config.DevelopmentConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'app.db'}", raising=False)
+  monkeypatch.setattr(config.DevelopmentConfig, "CACHE_TYPE", "FileSystemCache", raising=False)
+  monkeypatch.setattr(config.DevelopmentConfig, "CACHE_DIR", str(tmp_path / "cache"), raising=False)
+  first, second = create_app("DevelopmentConfig"), create_app("DevelopmentConfig")
+  with first.app_context():
+    db.create_all()
+    headers = auth(make_user(UserRole.PATIENT, "John Doe", "patient@test.com"))
+
+  etag = first.test_client().get("/users/me", headers=headers).headers["ETag"]
+  assert second.test_client().get("/users/me", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+  first.test_client().patch("/users/me", json={"name": "Johnny Doe"}, headers=headers)
+  assert second.test_client().get("/users/me", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+@pytest.mark.parametrize("enabled", [True, False])
+def test_revalidation_does_not_run_the_view(app, enabled):
+  app.config["RESPONSE_CACHE_ENABLED"] = enabled
+  calls = []
+
+  @cached_patient_resource("vitals")
+  def view(patient_id):
+    calls.append(patient_id)
+    return {"patient_id": patient_id}
+
+  app.add_url_rule("/cached/<int:patient_id>", view_func=view)
+  client = app.test_client()
+  etag = client.get("/cached/1").headers["ETag"]
+  assert client.get("/cached/1", headers={"If-None-Match": etag}).status_code == 304
+  assert calls == [1]
+
+  invalidate_patient(1, "vitals")
+  assert client.get("/cached/1", headers={"If-None-Match": etag}).status_code == 200
+  assert calls == [1, 1]
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from flask import jsonify
+from sql.models import Temperature, Weight, db
+from sql.utils.serializers import json_response
+from tests.conftest import auth
+
+PLAIN_FLOATS = [70.25, 0.1, 0.0001, 123456.789, 0.0, -0.0, 1e15]
+EXPONENT_FLOATS = [1e16, 1.2345678901234568e17, 1e-5, -1e-5, 9.99e-5, 2.5e-7, -3e-9]
+
+def both(payload):
+  return jsonify(payload).get_data(), json_response(payload).get_data()
+
+@pytest.mark.parametrize("payload", [
+  {"values": PLAIN_FLOATS},
+  {"zero": -0.0, "nested": {"z": -0.0}},
+  {"missing": None, "items": [None, {"a": None}]},
+  {"naive": datetime(2025, 1, 2, 3, 4, 5)},
+  {"aware": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-5)))},
+  {"utc": datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)},
+  {"name": "Zoë", "control": "tab\tdel\x7f"},
+])
+def test_fast_path_matches_the_provider_byte_for_byte(app, payload):
+  old, new = both(payload)
+  assert new == old
+
+@pytest.mark.parametrize("value", EXPONENT_FLOATS)
+def test_exponent_floats_match_the_provider(app, value):
+  old, new = both({"value": value, "nested": [{"v": value}]})
+  assert new == old
+
+def test_exponent_like_strings_render_the_same(app):
+  old, new = both({"code": "2e5", "name": "Type 1e", "dose": "0.00001"})
+  assert new == old
+
+def test_debug_output_is_indented_the_same_way(app):
+  app.debug = True
+  old, new = both({"b": [1, {"x": []}, {}], "a": {"k": -0.0, "n": None}})
+  assert new == old
+
+def test_list_endpoint_matches_the_marshmallow_path(app, client, patient):
+  start = datetime(2025, 1, 1)
+  values = PLAIN_FLOATS + [36.6, 38.25]
+  db.session.add_all(Temperature(patient_id=patient.id, value=v, recorded_at=start + timedelta(hours=i)) for i, v in enumerate(values))
+  db.session.add(Temperature(patient_id=patient.id, value=37.0, recorded_at=datetime(2025, 2, 1, tzinfo=timezone.utc)))
+  db.session.add_all(Weight(patient_id=patient.id, value=v, recorded_at=start + timedelta(hours=i)) for i, v in enumerate(EXPONENT_FLOATS))
+  db.session.commit()
+
+  for path in (f"/temperature/{patient.id}", f"/weight/{patient.id}"):
+    fast = client.get(path, headers=auth(patient)).get_data()
+    app.config["FAST_SERIALIZATION_ENABLED"] = False
+    slow = client.get(path, headers=auth(patient)).get_data()
+    app.config["FAST_SERIALIZATION_ENABLED"] = True
+    assert fast == slow
@@ -0,0 +1,65 @@
+from unittest import mock
+import pytest
+from sql.utils import auth as auth_module
+from sql.utils.auth import TokenCache, get_token_cache, verify_token
+from tests.conftest import auth
+
+NOW = 1_700_000_000
+
+@pytest.fixture
+def clock():
+  with mock.patch.object(auth_module.time, "time", return_value=NOW) as fake:
+    yield fake
+
+def claims(exp, sub="1"):
+  return (sub, "patient", exp)
+
+def test_hits_and_misses_are_counted(clock):
+  cache = TokenCache(maxsize=10, ttl=300)
+  assert cache.get("a") is None
+  cache.put("a", claims(NOW + 3600))
+  assert cache.get("a") == claims(NOW + 3600)
+  assert cache.get("a") == claims(NOW + 3600)
+  assert cache.stats() == {"hits": 2, "misses": 1, "size": 1, "maxsize": 10}
+
+def test_entries_expire_after_the_ttl(clock):
+  cache = TokenCache(ttl=300)
+  cache.put("a", claims(NOW + 3600))
+  clock.return_value = NOW + 299
+  assert cache.get("a") is not None
+  clock.return_value = NOW + 300
+  assert cache.get("a") is None
+  assert cache.stats()["size"] == 0
+
+def test_ttl_is_capped_at_the_token_exp(clock):
+  cache = TokenCache(ttl=300)
+  cache.put("a", claims(NOW + 60))
+  clock.return_value = NOW + 59
+  assert cache.get("a") is not None
+  clock.return_value = NOW + 60
+  assert cache.get("a") is None
+
+def test_tokens_without_exp_or_a_zero_size_are_not_cached(clock):
+  cache = TokenCache()
+  cache.put("a", claims(None))
+  disabled = TokenCache(maxsize=0)
+  disabled.put("a", claims(NOW + 60))
+  assert cache.get("a") is None and disabled.get("a") is None
+
+def test_least_recently_used_entry_is_evicted(clock):
+  cache = TokenCache(maxsize=2)
+  cache.put("a", claims(NOW + 3600, "1"))
+  cache.put("b", claims(NOW + 3600, "2"))
+  assert cache.get("a") is not None
+  cache.put("c", claims(NOW + 3600, "3"))
+  assert cache.get("b") is None
+  assert cache.get("a") is not None and cache.get("c") is not None
+  assert cache.stats()["size"] == 2
+
+def test_verify_token_decodes_once(app, patient):
+  token = auth(patient)["Authorization"].split()[1]
+  with mock.patch.object(auth_module.jwt, "decode", wraps=auth_module.jwt.decode) as decode:
+    first = verify_token(token)
+    assert verify_token(token) == first == (str(patient.id), "patient", first[2])
+  assert decode.call_count == 1
+  assert get_token_cache().stats()["hits"] == 1
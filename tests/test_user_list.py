@@ -0,0 +1,44 @@
+import pytest
+from sql.models import UserRole, db
+from tests.conftest import make_user
+
+@pytest.fixture
+def users(app, doctor, patient):
+  extra = [make_user(UserRole.PATIENT, f"Patient {i}", f"p{i}@test.com") for i in range(4)]
+  extra += [make_user(UserRole.ADMIN, "Admin", "admin@test.com")]
+  extra[1].is_active = False
+  db.session.commit()
+  return [doctor, patient] + extra
+
+def ids(client, query):
+  seen, cursor = [], ""
+  while True:
+    response = client.get(f"/users/?{query}&cursor={cursor}")
+    assert response.status_code == 200
+    body = response.get_json()
+    seen.append([item["id"] for item in body["items"]])
+    cursor = body["next_cursor"]
+    if cursor is None:
+      return seen
+
+def test_pages_are_keyed_by_id(client, users):
+  pages = ids(client, "limit=3")
+  assert pages == [[u.id for u in users[:3]], [u.id for u in users[3:6]], [users[6].id]]
+
+def test_page_size_is_capped(app, client, users):
+  app.config["USERS_PAGE_MAX_SIZE"] = 2
+  assert [len(page) for page in ids(client, "limit=50")] == [2, 2, 2, 1]
+
+def test_role_and_active_filters(client, users):
+  doctor, patient, p0, p1, p2, p3, admin = users
+  assert sum(ids(client, "role=PATIENT&limit=2"), []) == [patient.id, p0.id, p1.id, p2.id, p3.id]
+  assert sum(ids(client, "role=patient&is_active=true"), []) == [patient.id, p0.id, p2.id, p3.id]
+  assert sum(ids(client, "is_active=false"), []) == [p1.id]
+  assert sum(ids(client, "role=admin"), []) == [admin.id]
+
+@pytest.mark.parametrize("query", ["cursor=nope", "cursor=WzEsMl0=", "role=nurse", "is_active=yes", "limit=abc", "limit=0", "limit=-1"])
+def test_bad_arguments_are_rejected(client, users, query):
+  assert client.get(f"/users/?{query}").status_code == 400
+
+def test_no_match_is_not_found(client, users):
+  assert client.get("/users/?role=doctor&is_active=false").status_code == 404
@@ -0,0 +1,22 @@
+from sql.models import User, UserRole, db
+from tests.conftest import auth
+
+def test_patient_cannot_change_their_own_role(client, patient):
+  response = client.patch("/users/me", json={"role": "admin"}, headers=auth(patient))
+  assert response.status_code == 400
+  assert "role" in response.get_json()
+  db.session.expire_all()
+  assert db.session.get(User, patient.id).role == UserRole.PATIENT
+
+def test_protected_fields_are_rejected(client, patient):
+  for field, value in (("id", 999), ("is_active", False), ("archived_at", "2025-01-01T00:00:00")):
+    response = client.patch("/users/me", json={field: value}, headers=auth(patient))
+    assert response.status_code == 400, field
+  db.session.expire_all()
+  user = db.session.get(User, patient.id)
+  assert user.is_active and user.archived_at is None
+
+def test_profile_fields_can_be_updated(client, patient):
+  response = client.patch("/users/me", json={"name": "Johnny Doe"}, headers=auth(patient))
+  assert response.status_code == 200
+  assert response.get_json()["name"] == "Johnny Doe"
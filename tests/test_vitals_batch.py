@@ -0,0 +1,49 @@
+from sql.models import HeartRate, db
+from tests.conftest import auth
+
+def test_batch_stores_valid_readings(client, patient):
+  response = client.post("/vitals/batch", headers=auth(patient), json=[
+    {"type": "heart_rate", "patient_id": patient.id, "value": 72},
+    {"type": "blood_pressure", "patient_id": patient.id, "systolic": 120, "diastolic": 80}
+  ])
+  assert response.status_code == 201
+  assert response.get_json()["created"] == 2
+
+def test_batch_reports_mixed_results(client, patient):
+  response = client.post("/vitals/batch", headers=auth(patient), json=[
+    {"type": "heart_rate", "patient_id": patient.id, "value": 72},
+    {"type": "heart_rate", "patient_id": patient.id}
+  ])
+  assert response.status_code == 207
+  body = response.get_json()
+  assert (body["created"], body["failed"]) == (1, 1)
+  assert body["results"][1]["status"] == "invalid"
+
+def test_batch_for_missing_patients_is_not_found(client, patient):
+  response = client.post("/vitals/batch", headers=auth(patient), json=[
+    {"type": "heart_rate", "patient_id": 999, "value": 72},
+    {"type": "heart_rate", "patient_id": 998, "value": 70}
+  ])
+  assert response.status_code == 404
+  assert response.get_json()["created"] == 0
+  assert db.session.query(HeartRate).count() == 0
+
+def test_batch_with_nothing_valid_is_unprocessable(client, patient):
+  response = client.post("/vitals/batch", headers=auth(patient), json=[
+    {"type": "heart_rate", "patient_id": 999, "value": 72},
+    {"type": "unknown", "patient_id": patient.id}
+  ])
+  assert response.status_code == 422
+  assert response.get_json()["failed"] == 2
+
+def test_batch_rejects_a_non_string_type_per_item(client, patient):
+  response = client.post("/vitals/batch", headers=auth(patient), json=[
+    {"type": [1], "patient_id": patient.id, "value": 72},
+    {"type": {"heart_rate": 1}, "patient_id": patient.id, "value": 72},
+    {"type": "heart_rate", "patient_id": patient.id, "value": 72}
+  ])
+  assert response.status_code == 207
+  body = response.get_json()
+  assert (body["created"], body["failed"]) == (1, 2)
+  assert [result["status"] for result in body["results"]] == ["invalid", "invalid", "created"]
+  assert "type" in body["results"][0]["errors"]
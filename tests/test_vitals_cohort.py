@@ -0,0 +1,39 @@
+from datetime import date, datetime, timedelta, timezone
+from sql.models import Diagnosis, HeartRate, UserRole, db
+from tests.conftest import auth, make_user
+
+def diagnose(doctor, patient, rate):
+  db.session.add(Diagnosis(patient_id=patient.id, doctor_id=doctor.id, diagnosis_name="Hypertension",
+                           diagnosis_name_normalized="hypertension", diagnosis_code="I10",
+                           diagnosis_date=date(2024, 1, 1), notes=""))
+  db.session.add(HeartRate(patient_id=patient.id, value=rate, recorded_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+  db.session.commit()
+
+def test_bounds_filter_the_cohort(client, doctor, patient):
+  diagnose(doctor, patient, 60)
+  diagnose(doctor, make_user(UserRole.PATIENT, "Ann Lee", "ann@test.com"), 95)
+  response = client.get("/vitals/cohort?type=heart_rate&above=80", headers=auth(doctor))
+  assert response.status_code == 200
+  assert [item["value"] for item in response.get_json()["items"]] == [95]
+
+def test_unparseable_bounds_are_rejected(client, doctor):
+  for query in ("above=abc", "below=", "above=nan", "below=inf"):
+    response = client.get(f"/vitals/cohort?type=heart_rate&{query}", headers=auth(doctor))
+    assert response.status_code == 400, query
+    assert "must be a number" in response.get_json()["message"]
+
+def test_unparseable_days_and_limit_are_rejected(client, doctor):
+  for query, message in (
+    ("days=abc", "'days' must be between"), ("days=1.5", "'days' must be between"), ("days=-3", "'days' must be between"),
+    ("limit=abc", "'limit' must be a positive integer"), ("limit=", "'limit' must be a positive integer"),
+    ("limit=0", "'limit' must be a positive integer"),
+  ):
+    response = client.get(f"/vitals/cohort?type=heart_rate&{query}", headers=auth(doctor))
+    assert response.status_code == 400, query
+    assert message in response.get_json()["message"], query
+
+def test_days_and_limit_parse(client, doctor, patient):
+  diagnose(doctor, patient, 60)
+  response = client.get("/vitals/cohort?type=heart_rate&days=2&limit=5", headers=auth(doctor))
+  assert response.status_code == 200
+  assert len(response.get_json()["items"]) == 1
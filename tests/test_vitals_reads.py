@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+from sql.models import HeartRate, db
+from tests.conftest import auth
+
+def test_readings_page_newest_first_within_range(client, patient):
+  start = datetime(2025, 1, 1)
+  db.session.add_all(HeartRate(patient_id=patient.id, value=60 + i, recorded_at=start + timedelta(hours=i)) for i in range(5))
+  db.session.commit()
+
+  query = "from=2025-01-01T01:00:00&to=2025-01-01T05:00:00&limit=3"
+  first = client.get(f"/heartrate/{patient.id}?{query}", headers=auth(patient)).get_json()
+  assert [item["value"] for item in first["items"]] == [64, 63, 62]
+
+  second = client.get(f"/heartrate/{patient.id}?{query}&cursor={first['next_cursor']}", headers=auth(patient)).get_json()
+  assert [item["value"] for item in second["items"]] == [61]
+  assert second["next_cursor"] is None
+
+def test_invalid_cursor_is_rejected(client, patient):
+  response = client.get(f"/heartrate/{patient.id}?cursor=nope", headers=auth(patient))
+  assert response.status_code == 400
@@ -0,0 +1,65 @@
+from datetime import datetime
+from unittest import mock
+from sqlalchemy import select
+from sql.models import HeartRate, VitalRollup, VitalRollupWatermark, db
+from sql.blueprints.vitals import rollups
+from sql.blueprints.vitals.rollups import refresh_rollups_from_watermark
+from tests.conftest import auth
+
+def buckets(patient_id, resolution="hour"):
+  rows = db.session.execute(
+    select(VitalRollup.bucket_start, VitalRollup.count, VitalRollup.total, VitalRollup.minimum, VitalRollup.maximum)
+    .where(VitalRollup.patient_id == patient_id, VitalRollup.resolution == resolution)
+    .order_by(VitalRollup.bucket_start)
+  )
+  return [tuple(row) for row in rows]
+
+def post_heart_rate(client, patient, value, recorded_at):
+  return client.post("/vitals/batch", headers=auth(patient), json=[
+    {"type": "heart_rate", "patient_id": patient.id, "value": value, "recorded_at": recorded_at}
+  ])
+
+def test_writes_merge_into_existing_buckets(client, patient):
+  for value in (60, 80, 70):
+    assert post_heart_rate(client, patient, value, "2025-01-01T10:15:00Z").status_code == 201
+  assert post_heart_rate(client, patient, 90, "2025-01-01T11:05:00Z").status_code == 201
+
+  assert [row[1:] for row in buckets(patient.id)] == [(3, 210, 60, 80), (1, 90, 90, 90)]
+  assert [row[1:] for row in buckets(patient.id, "day")] == [(4, 300, 60, 90)]
+
+def test_incremental_buckets_match_a_rebuild(client, patient):
+  for minute, value in enumerate((61, 75, 58, 90, 66)):
+    post_heart_rate(client, patient, value, f"2025-01-01T{8 + minute % 3:02d}:{minute:02d}:00Z")
+  incremental = buckets(patient.id), buckets(patient.id, "day")
+
+  db.session.query(VitalRollup).delete()
+  db.session.commit()
+  refresh_rollups_from_watermark()
+  assert (buckets(patient.id), buckets(patient.id, "day")) == incremental
+
+def test_rollup_failure_does_not_fail_the_write(client, patient):
+  with mock.patch.object(rollups, "apply_readings", side_effect=RuntimeError("rollup broke")):
+    response = client.post(f"/heartrate/{patient.id}", headers=auth(patient), json={"value": 72})
+  assert response.status_code == 201
+  assert db.session.query(HeartRate).count() == 1
+  assert buckets(patient.id) == []
+
+  refresh_rollups_from_watermark()
+  assert [row[1:] for row in buckets(patient.id)] == [(1, 72, 72, 72)]
+
+def test_watermark_rescans_rows_committed_out_of_id_order(app, patient):
+  app.config["VITALS_ROLLUPS_ON_WRITE"] = False
+  recorded_at = datetime(2025, 1, 1, 9)
+  db.session.add_all([
+    HeartRate(id=1, patient_id=patient.id, value=60, recorded_at=recorded_at),
+    HeartRate(id=3, patient_id=patient.id, value=70, recorded_at=recorded_at)
+  ])
+  db.session.commit()
+  refresh_rollups_from_watermark()
+  assert db.session.get(VitalRollupWatermark, "heart_rate").last_id == 3
+
+  # Id 2 was allocated before 3 but its transaction committed after the job ran.
+  db.session.add(HeartRate(id=2, patient_id=patient.id, value=80, recorded_at=recorded_at))
+  db.session.commit()
+  refresh_rollups_from_watermark()
+  assert [row[1:] for row in buckets(patient.id)] == [(3, 210, 60, 80)]
@@ -0,0 +1,58 @@
+import json
+from unittest import mock
+from sql.models import HeartRate, db
+from tests.conftest import auth
+
+def ndjson(readings):
+  return "\n".join(json.dumps(reading) for reading in readings) + "\n"
+
+def post_stream(client, user, body):
+  return client.post("/vitals/stream", headers=auth(user), data=body, content_type="application/x-ndjson")
+
+def test_stream_stores_readings_and_reports_bad_lines(app, client, patient):
+  app.config["VITALS_STREAM_CHUNK_SIZE"] = 2
+  body = ndjson([{"type": "heart_rate", "patient_id": patient.id, "value": 60 + i} for i in range(5)]) + "not json\n"
+  response = post_stream(client, patient, body)
+  assert response.status_code == 207
+  summary = response.get_json()
+  assert (summary["created"], summary["failed"]) == (5, 1)
+  assert summary["errors"] == [{"line": 6, "errors": {"_schema": ["Invalid JSON"]}}]
+
+def test_stream_failure_reports_committed_lines(app, client, patient):
+  app.config["VITALS_STREAM_CHUNK_SIZE"] = 2
+  body = ndjson([{"type": "heart_rate", "patient_id": patient.id, "value": 60 + i} for i in range(6)])
+
+  from sql.blueprints.vitals import ingest
+  original = ingest.insert_readings
+  calls = []
+
+  def fail_on_second_chunk(readings):
+    calls.append(readings)
+    if len(calls) == 2:
+      raise RuntimeError("database went away")
+    original(readings)
+
+  with mock.patch.object(ingest, "insert_readings", fail_on_second_chunk):
+    response = post_stream(client, patient, body)
+
+  assert response.status_code == 500
+  summary = response.get_json()
+  assert summary["created"] == 2
+  assert summary["committed_through_line"] == 2
+  assert summary["failed_at_line"] == 3
+  assert summary["message"] == "database went away"
+  assert db.session.query(HeartRate).count() == 2
+
+def test_stream_reports_a_non_string_type_and_keeps_going(client, patient):
+  body = ndjson([
+    {"type": "heart_rate", "patient_id": patient.id, "value": 60},
+    {"type": [1], "patient_id": patient.id, "value": 61},
+    {"type": "heart_rate", "patient_id": patient.id, "value": 62}
+  ])
+  response = post_stream(client, patient, body)
+  assert response.status_code == 207
+  summary = response.get_json()
+  assert (summary["created"], summary["failed"]) == (2, 1)
+  assert summary["errors"][0]["line"] == 2
+  assert "type" in summary["errors"][0]["errors"]
+  assert sorted(value for value, in db.session.query(HeartRate.value)) == [60, 62]
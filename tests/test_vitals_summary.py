@@ -0,0 +1,51 @@
+import random
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from sql.models import BloodPressure, Temperature, db
+from tests.conftest import auth
+
+START = datetime(2025, 1, 1)
+
+def expected(values):
+  values = np.array(values, dtype=float)
+  p5, p50, p95 = np.percentile(values, (5, 50, 95))
+  return {"count": len(values), "mean": values.mean(), "min": values.min(), "max": values.max(),
+          "stddev": values.std(ddof=1), "p5": p5, "p50": p50, "p95": p95}
+
+def test_summary_matches_numpy(client, patient):
+  rng = random.Random(7)
+  pressures = [(rng.randint(95, 170), rng.randint(55, 110)) for _ in range(101)]
+  temperatures = [round(rng.uniform(35.5, 39.5), 2) for _ in range(37)]
+  db.session.add_all(BloodPressure(patient_id=patient.id, systolic=s, diastolic=d, recorded_at=START + timedelta(minutes=i))
+                     for i, (s, d) in enumerate(pressures))
+  db.session.add_all(Temperature(patient_id=patient.id, value=v, recorded_at=START + timedelta(minutes=i))
+                     for i, v in enumerate(temperatures))
+  db.session.commit()
+
+  response = client.get(f"/vitals/{patient.id}/summary", headers=auth(patient))
+  assert response.status_code == 200
+  summary = response.get_json()
+
+  checks = {
+    ("blood_pressure", "systolic"): [s for s, _ in pressures],
+    ("blood_pressure", "diastolic"): [d for _, d in pressures],
+    ("temperature", "value"): temperatures,
+  }
+  for (vital_type, metric), values in checks.items():
+    got = summary[vital_type][metric]
+    for key, value in expected(values).items():
+      assert got[key] == pytest.approx(value), (vital_type, metric, key)
+  assert summary["heart_rate"]["value"]["count"] == 0
+  assert summary["heart_rate"]["value"]["p50"] is None
+
+def test_summary_window_and_single_reading(client, patient):
+  db.session.add_all(Temperature(patient_id=patient.id, value=36.0 + i, recorded_at=START + timedelta(hours=i)) for i in range(3))
+  db.session.commit()
+
+  response = client.get(f"/vitals/{patient.id}/summary?type=temperature&from=2025-01-01T01:00:00&to=2025-01-01T02:00:00",
+                        headers=auth(patient))
+  assert response.status_code == 200
+  assert response.get_json() == {"temperature": {"value": {
+    "count": 1, "mean": 37.0, "min": 37.0, "max": 37.0, "stddev": None, "p5": 37.0, "p50": 37.0, "p95": 37.0
+  }}}
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+from unittest import mock
+from sqlalchemy import func, select
+from sql.blueprints.vitals import writer as writer_module
+from sql.blueprints.vitals.writer import VitalsWriter
+from sql.models import HeartRate, db
+from tests.conftest import auth
+
+def reading(patient, value, minutes=0):
+  return HeartRate, {"patient_id": patient.id, "value": value, "recorded_at": datetime(2025, 1, 1) + timedelta(minutes=minutes)}
+
+def stored_values():
+  db.session.expire_all()
+  return sorted(db.session.scalars(select(HeartRate.value)))
+
+def test_close_flushes_pending_readings(app, patient):
+  writer = VitalsWriter(app, batch_size=100, flush_interval=60)
+  writer.start()
+  assert writer.submit([reading(patient, 60 + i, i) for i in range(3)])
+  writer.close()
+
+  assert stored_values() == [60, 61, 62]
+  assert writer.stats()["pending"] == 0
+  assert writer.stats()["written"] == 3
+
+def test_failed_batch_keeps_good_rows_and_alerts_only_on_them(app, patient):
+  writer = VitalsWriter(app)
+  bad = (HeartRate, {"patient_id": patient.id, "value": None, "recorded_at": datetime(2025, 1, 1)})
+  good = reading(patient, 72)
+  with mock.patch.object(writer_module, "detect_anomalies", return_value=[]) as detect:
+    assert writer._write([bad, good]) == (1, 1)
+
+  assert stored_values() == [72]
+  detect.assert_called_once_with([good])
+
+def test_full_queue_rejects_whole_requests(app, patient):
+  writer = VitalsWriter(app, max_pending=2)
+  assert writer.submit([reading(patient, 60), reading(patient, 61)])
+  assert not writer.submit([reading(patient, 62)])
+  assert writer.stats()["rejected"] == 1
+  assert writer.stats()["pending"] == 2
+
+def test_full_queue_returns_503(app, client, patient):
+  app.config.update(VITALS_WRITE_BEHIND=True, VITALS_WRITE_BEHIND_ENQUEUE_TIMEOUT=0)
+  app.extensions["vitals_writer"] = VitalsWriter(app, max_pending=0)
+  response = client.post(f"/heartrate/{patient.id}", json={"value": 70}, headers=auth(patient))
+  assert response.status_code == 503
+  assert response.headers["Retry-After"] == "1"
+  assert db.session.scalar(select(func.count()).select_from(HeartRate)) == 0